@@ -1,90 +1,412 @@
 from __future__ import annotations
 
+import os
+import re
+import sys
 import typing as t
 
-import rich_click as click
+import click
 
-from .parsing import parse_input
+from .parsing import (
+    is_har,
+    iter_har,
+    load_har_index,
+    parse_batch,
+    parse_input,
+    parse_stream,
+    read_snippet,
+    select_har_entries,
+)
+from .sources import decompressed, iter_text, mapped_file
 
 if t.TYPE_CHECKING:
     import io
 
+    import rich.console
+
     from .request import Request
+    from .templates import URLTemplate
+
+# rich's markup tags (ex. "[red]", "[/#4bff9f]")
+_MARKUP = re.compile(r"\[[a-z#/@][^[]*?\]")
+
+
+class Command(click.Command):
+    """
+    A plain click command that shows its help with rich-click.
+    rich-click (and rich) are slow to import, so they're only imported when help is shown.
+    """
+
+    def get_help_option(self, ctx: click.Context) -> click.Option | None:
+        option = super().get_help_option(ctx)
+        if option is not None:
+            option.callback = _show_rich_help
+        return option
+
+
+class Group(Command, click.Group):
+    command_class = Command
+
+
+def _show_rich_help(ctx: click.Context, param: click.Parameter, value: bool) -> None:
+    """the `--help` callback, which renders the help of a rich-click copy of the command"""
+    if not value or ctx.resilient_parsing:
+        return
+    command = _rich_command(ctx.command)
+    rich_ctx = command.make_context(ctx.info_name, [], parent=ctx.parent, resilient_parsing=True)
+    click.echo(command.get_help(rich_ctx), color=ctx.color)
+    ctx.exit()
+
+
+def _rich_command(command: click.Command) -> click.Command:
+    """:returns: a rich-click copy of a command (and its subcommands)"""
+    import rich_click
+
+    rich_click.rich_click.STYLE_OPTION = "bold #4bff9f"
+    rich_click.rich_click.STYLE_SWITCH = "bold blue"
+    rich_click.rich_click.STYLE_METAVAR = "bold red"
+    rich_click.rich_click.MAX_WIDTH = 75
+
+    if isinstance(command, click.Group):
+        return rich_click.RichGroup(
+            name=command.name,
+            commands={name: _rich_command(subcommand) for name, subcommand in command.commands.items()},
+            invoke_without_command=command.invoke_without_command,
+            callback=command.callback,
+            params=command.params,
+            help=command.help,
+            context_settings=command.context_settings,
+        )
+    return rich_click.RichCommand(
+        name=command.name,
+        callback=command.callback,
+        params=command.params,
+        help=command.help,
+        context_settings=command.context_settings,
+    )
 
-click.rich_click.STYLE_OPTION = "bold #4bff9f"
-click.rich_click.STYLE_SWITCH = "bold blue"
-click.rich_click.STYLE_METAVAR = "bold red"
-click.rich_click.MAX_WIDTH = 75
+
+def echo(markup: str, plain: bool = False) -> None:
+    """prints a message with rich, or when `plain` is set, without its markup to stderr (so it's kept out of piped code)"""
+    if plain:
+        click.echo(_MARKUP.sub("", markup), err=True)
+        return
+
+    from rich.console import Console
+
+    Console(markup=True).print(markup)
 
 
 def get_input() -> Request | None:
     """
-    returns input from stdin
+    returns input typed or pasted into stdin, read until the snippet ends
+    """
+    return parse_input(read_snippet(sys.stdin))
+
+
+def read_requests(
+    file: io.BufferedReader, entries: tuple[int, ...] = (), url: str | None = None, jobs: int | None = None
+) -> t.Iterator[Request]:
+    """
+    yields every request in a file (gzip, bz2, and xz compressed files are decompressed as they're read)
     """
+    stream = decompressed(file)
+    if stream is not file:
+        yield from read_compressed_requests(t.cast("io.BufferedReader", stream), entries, url)
+        return
 
-    lines: list[str] = []
-    line = input()
+    if is_har(file.peek(1024).decode("utf-8", errors="ignore")):
+        if not entries and not url:
+            yield from iter_har(file)
+            return
+        if not isinstance(file.name, str) or not os.path.isfile(file.name):
+            # piped archives can't be indexed, so the selected entries are picked out as they stream by
+            yield from select_har_entries(file, entries, url)
+            return
+        # jump straight to the selected entries using the sidecar index
+        index = load_har_index(file.name)
+        out_of_range = [n for n in entries if not 0 <= n < len(index)]
+        if out_of_range:
+            raise click.BadParameter(
+                f"{', '.join(map(str, out_of_range))} (the archive has {len(index)} entries)", param_hint="'--entry'"
+            )
+        positions = list(entries) if entries else index.find(url=url)
+        if entries and url:
+            matching = set(index.find(url=url))
+            positions = [n for n in positions if n in matching]
+        yield from index.read_entries(positions)
+    else:
+        # files may hold many concatenated snippets (ex. "Copy all as fetch")
+        with mapped_file(file) as source:
+            for request in parse_batch(source, processes=jobs):
+                if request:
+                    yield request
 
-    while line and not line.isspace():
-        lines.append(line)
-        line = input()
 
-    return parse_input("\n".join(lines))
+def read_compressed_requests(
+    file: io.BufferedReader, entries: tuple[int, ...] = (), url: str | None = None
+) -> t.Iterator[Request]:
+    """
+    yields every request in a decompressing stream, without holding the decompressed input in memory
+    (compressed files can't be seeked into or mapped, so HAR entries are picked out, and snippets split off, as they're read)
+    """
+    if is_har(file.peek(1024).decode("utf-8", errors="ignore")):
+        yield from select_har_entries(file, entries, url)
+        return
+    for request in parse_stream(iter_text(file)):
+        if request:
+            yield request
+
 
+def generation_options(func: t.Callable[..., None]) -> t.Callable[..., None]:
+    """options shared by every command that generates code"""
+    options = [
+        click.option(
+            "-s/-a", "--sync/--async", is_flag=True, default=True, help="Generate synchronous or asynchronous code."
+        ),
+        click.option("-h", "--httpx", is_flag=True, default=False, help="Use httpx library to make requests."),
+        click.option(
+            "-nh", "--no-headers", is_flag=True, default=False, help="Don't include headers in the generated output."
+        ),
+        click.option(
+            "-nc", "--no-cookies", is_flag=True, default=False, help="Don't include cookies in the generated output."
+        ),
+        click.option(
+            "--spill-threshold",
+            type=click.IntRange(min=0),
+            metavar="BYTES",
+            help="Write bodies larger than this to a side file that the generated code reads.",
+        ),
+        click.option(
+            "--cache",
+            "cache_path",
+            type=click.Path(dir_okay=False),
+            metavar="FILE",
+            help="SQLite file that caches parsed requests and generated code between runs.",
+        ),
+    ]
+    for option in reversed(options):
+        func = option(func)
+    return func
 
-@click.command()
+
+@click.group(cls=Group, invoke_without_command=True)
+@click.pass_context
 # Meta Options
+@click.option("-f", "--file", type=click.File("rb"), help="Optional file to read input from. HAR archives are streamed.")
 @click.option(
-    "-f", "--file", type=click.File("r", encoding="utf-8", errors="replace"), help="Optional file to read input from."
+    "-e", "--entry", "entries", type=int, multiple=True, help="Only convert HAR entries at these positions (indexed)."
+)
+@click.option("-u", "--url", help="Only convert HAR entries whose URL matches this pattern (indexed).")
+@click.option(
+    "-j", "--jobs", type=click.IntRange(min=1), help="Processes used to parse files with many snippets (default: CPUs)."
 )
 @click.option("-c", "--copy", is_flag=True, default=False, help="Copy the output to the clipboard.")
+@click.option(
+    "--spill-dir",
+    type=click.Path(file_okay=False),
+    default=".",
+    show_default=True,
+    help="Directory to write spilled bodies to.",
+)
+@click.option("--dedup", is_flag=True, default=False, help="Skip requests that duplicate an earlier one.")
+@click.option(
+    "--ignore-header",
+    "ignore_headers",
+    multiple=True,
+    metavar="NAME",
+    help="Header to ignore when finding duplicates, on top of tracing headers.",
+)
+@click.option(
+    "--ignore-cookie", "ignore_cookies", multiple=True, metavar="NAME", help="Cookie to ignore when finding duplicates."
+)
+@click.option(
+    "--plain", is_flag=True, default=False, help="Write code as plain text, even to a terminal (the default when piped)."
+)
+@click.option(
+    "--templates",
+    is_flag=True,
+    default=False,
+    help="Generate one function per URL template (ex. /users/{user_id}) instead of one snippet per request.",
+)
 # Generation Options
-@click.option("-s/-a", "--sync/--async", is_flag=True, default=True, help="Generate synchronous or asynchronous code.")
-@click.option("-h", "--httpx", is_flag=True, default=False, help="Use httpx library to make requests.")
-@click.option("-nh", "--no-headers", is_flag=True, default=False, help="Don't include headers in the generated output.")
-@click.option("-nc", "--no-cookies", is_flag=True, default=False, help="Don't include cookies in the generated output.")
-def cli(file: io.TextIOWrapper, copy: bool, sync: bool, httpx: bool, no_headers: bool, no_cookies: bool) -> None:
+@generation_options
+def cli(
+    ctx: click.Context,
+    file: io.BufferedReader,
+    entries: tuple[int, ...],
+    url: str | None,
+    jobs: int | None,
+    copy: bool,
+    spill_dir: str,
+    dedup: bool,
+    ignore_headers: tuple[str, ...],
+    ignore_cookies: tuple[str, ...],
+    templates: bool,
+    plain: bool,
+    sync: bool,
+    httpx: bool,
+    no_headers: bool,
+    no_cookies: bool,
+    spill_threshold: int | None,
+    cache_path: str | None,
+) -> None:
     """
     Generate code to recreate a request from your browser.
     """
-    from rich.console import Console
-    from rich.syntax import Syntax
+    if ctx.invoked_subcommand:
+        return
 
-    console = Console(markup=True)
+    # output that's piped or redirected (ex. `> out.py`) isn't highlighted, and rich is never imported
+    plain = plain or not sys.stdout.isatty()
 
-    parsed_input: Request | None = None
+    requests: t.Iterable[Request]
 
     if file:
-        parsed_input = parse_input(file.read())
+        requests = read_requests(file, entries, url, jobs)
+    elif not sys.stdin.isatty():
+        # piped input is read like a file, in large chunks
+        requests = read_requests(t.cast("io.BufferedReader", sys.stdin.buffer), entries, url, jobs)
     else:
-        console.print(
-            """[#4bff9f][AutoRequests][/#4bff9f] Enter browser request data (and press enter when done)
-[grey27 italic]*use --file if input data is too long*[/grey27 italic]"""
+        echo(
+            """[#4bff9f][AutoRequests][/#4bff9f] Paste browser request data (it's read until the request ends)
+[grey27 italic]*press enter on an empty line to finish early*[/grey27 italic]""",
+            plain,
         )
         parsed_input = get_input()
+        requests = [parsed_input] if parsed_input else []
+
+    if dedup:
+        from .fingerprint import DEFAULT_IGNORED_HEADERS, dedup as dedup_requests
+
+        requests = dedup_requests(requests, DEFAULT_IGNORED_HEADERS.union(ignore_headers), ignore_cookies)
+
+    generators: t.Iterable[Request | URLTemplate] = requests
+    if templates:
+        from .templates import infer_templates
+
+        # every request has to be seen before templates can be inferred
+        generators = infer_templates(requests)
+
+    found = False
+    # only hold onto generated code when it needs to be copied
+    codes: list[str] = []
+    console: rich.console.Console | None = None
+    # plain output is written as it's generated, unless it has to be copied too (or looked up in the cache)
+    stream = plain and not copy and not cache_path
+    options: dict[str, t.Any] = dict(
+        sync=sync,
+        httpx=httpx,
+        no_headers=no_headers,
+        no_cookies=no_cookies,
+        spill_threshold=spill_threshold,
+        spill_dir=spill_dir,
+    )
+    if cache_path:
+        from .cache import Cache
 
-    if not parsed_input:
-        console.print(
+        cache = Cache(cache_path)
+        ctx.call_on_close(cache.close)
+        options["cache"] = cache
+
+    for generator in generators:
+        if found and plain:
+            sys.stdout.write("\n")
+        found = True
+        if stream:
+            generator.write_code(sys.stdout, **options)
+            continue
+        code = generator.generate_code(**options)
+        if plain:
+            sys.stdout.write(code)
+        else:
+            from .output import print_code
+
+            if console is None:
+                from rich.console import Console
+
+                console = Console(markup=True)
+            print_code(console, code)
+        if copy:
+            codes.append(code)
+
+    if not found:
+        echo(
             "[red]Invalid input. "
-            "If you believe this is a mistake please report at: https://github.com/Hexiro/autorequests.[/red]"
+            "If you believe this is a mistake please report at: https://github.com/Hexiro/autorequests.[/red]",
+            plain,
         )
         return
 
-    code = parsed_input.generate_code(sync=sync, httpx=httpx, no_headers=no_headers, no_cookies=no_cookies)
-
-    console.print(Syntax(code, "python"))
-
     if copy:
         import pyperclip  # type: ignore[import]
 
         try:
-            pyperclip.copy(code)
-            console.print("[#4bff9f]Copied to clipboard.[/#4bff9f]")
+            pyperclip.copy("\n\n".join(codes))
+            echo("[#4bff9f]Copied to clipboard.[/#4bff9f]", plain)
         except pyperclip.PyperclipException:
-            console.print(
-                "[red]Copy functionality unavailable. Please view pyperclip documentation to use the --copy option.[/red]"
+            echo(
+                "[red]Copy functionality unavailable. Please view pyperclip documentation to use the --copy option.[/red]",
+                plain,
             )
 
 
+@cli.command()
+@click.argument("patterns", nargs=-1, required=True)
+@click.option(
+    "-o",
+    "--output",
+    "output_dir",
+    required=True,
+    type=click.Path(file_okay=False),
+    help="Directory to write modules to.",
+)
+@click.option("-j", "--jobs", type=click.IntRange(min=1), help="Processes to convert files with (default: CPUs).")
+@click.option("--force", is_flag=True, default=False, help="Regenerate files even if they haven't changed.")
+@generation_options
+def convert(
+    patterns: tuple[str, ...],
+    output_dir: str,
+    jobs: int | None,
+    force: bool,
+    sync: bool,
+    httpx: bool,
+    no_headers: bool,
+    no_cookies: bool,
+    spill_threshold: int | None,
+    cache_path: str | None,
+) -> None:
+    """
+    Convert every file matching the glob patterns into a module inside the output directory.
+    Files that haven't changed since the last run are skipped, and spilled bodies are written to the output directory.
+    """
+    from .convert import convert_files, expand_patterns
+
+    plain = not sys.stdout.isatty()
+
+    paths = expand_patterns(patterns)
+    if not paths:
+        echo("[red]No files matched.[/red]", plain)
+        return
+
+    options = {
+        "sync": sync,
+        "httpx": httpx,
+        "no_headers": no_headers,
+        "no_cookies": no_cookies,
+        "spill_threshold": spill_threshold,
+        "spill_dir": output_dir,
+    }
+    result = convert_files(paths, output_dir, options, processes=jobs, force=force, cache_path=cache_path)
+
+    for path in result.failed:
+        echo(f"[red]Invalid input: {path}[/red]", plain)
+    echo(
+        f"[#4bff9f][AutoRequests][/#4bff9f] converted {len(result.converted)}, "
+        f"skipped {len(result.skipped)} unchanged, {len(result.failed)} failed, removed {len(result.removed)} stale.",
+        plain,
+    )
+
+
 if __name__ == "__main__":
     cli()
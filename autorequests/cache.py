@@ -0,0 +1,190 @@
+"""
+A persistent, content-addressed cache of parsed requests and generated code, kept in a single SQLite file.
+
+Entries are keyed by a hash of their input, the generation options, the autorequests version, and the cache's format,
+so an unchanged capture costs one hash and one lookup, and a new version never reuses old output.
+(code that changes without a version bump, ex. a development install, should clear the cache itself)
+The least recently used entries are evicted once the cache grows past its size limit.
+"""
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import pickle
+import sqlite3
+import threading
+import time
+import typing as t
+
+from . import __version__
+
+if t.TYPE_CHECKING:
+    from .request import Request
+    from .typings import Source
+
+__all__ = ("Cache", "input_key", "code_key", "DEFAULT_MAX_BYTES")
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+# bumped whenever what's stored (or how it's keyed) changes
+CACHE_FORMAT = 1
+
+REQUEST = "request"
+CODE = "code"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    used INTEGER NOT NULL
+)
+"""
+_USED_INDEX = "CREATE INDEX IF NOT EXISTS entries_used ON entries (used)"
+# the total size of the entries, kept up to date by triggers so it never has to be summed up
+_STATS = """
+CREATE TABLE IF NOT EXISTS stats (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    size INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO stats (id, size) SELECT 0, COALESCE(SUM(size), 0) FROM entries;
+CREATE TRIGGER IF NOT EXISTS entries_insert AFTER INSERT ON entries BEGIN
+    UPDATE stats SET size = size + new.size WHERE id = 0;
+END;
+CREATE TRIGGER IF NOT EXISTS entries_delete AFTER DELETE ON entries BEGIN
+    UPDATE stats SET size = size - old.size WHERE id = 0;
+END;
+"""
+
+
+def input_key(source: Source) -> str:
+    """:returns: the key of what `parse_input` returns for a source (ex. the text of a fetch snippet)"""
+    digest = hashlib.sha256(f"{REQUEST}\0{__version__}\0{CACHE_FORMAT}\0".encode())
+    if isinstance(source, str):
+        # lone surrogates stand in for undecodable bytes
+        digest.update(source.encode("utf-8", "surrogateescape"))
+    else:
+        digest.update(source)
+    return digest.hexdigest()
+
+
+def code_key(request: Request, sync: bool, httpx: bool, no_headers: bool, no_cookies: bool) -> str:
+    """:returns: the key of the code generated for a request with these options"""
+    fields = tuple(getattr(request, field.name) for field in dataclasses.fields(request))
+    options = f"{sync:d}{httpx:d}{no_headers:d}{no_cookies:d}"
+    digest = hashlib.sha256(f"{CODE}\0{__version__}\0{CACHE_FORMAT}\0{options}\0".encode())
+    digest.update(pickle.dumps(fields, protocol=4))
+    return digest.hexdigest()
+
+
+class Cache:
+    """
+    A size-bounded LRU cache in a SQLite file, shared between processes and runs.
+    (ex. `parse_input(text, cache=Cache("autorequests.sqlite"))`)
+
+    Requests are stored pickled, so only point it at files you'd trust to import code from.
+    """
+
+    def __init__(self, path: str, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # autocommit, so other processes see entries as soon as they're written
+        self._connection: sqlite3.Connection = sqlite3.connect(
+            path, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(_SCHEMA)
+        self._connection.execute(_USED_INDEX)
+        self._connection.executescript(_STATS)
+
+    def get(self, key: str) -> bytes | None:
+        """:returns: the value stored under a key, marking it as recently used"""
+        with self._lock:
+            row = self._connection.execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._connection.execute("UPDATE entries SET used = ? WHERE key = ?", (time.time_ns(), key))
+        value: bytes = row[0]
+        return value
+
+    def put(self, key: str, value: bytes) -> None:
+        """stores a value, then evicts the least recently used entries if the cache is over its size limit"""
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                # the row is deleted first (instead of replaced) so the delete trigger keeps the total size right
+                self._connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._connection.execute(
+                    "INSERT INTO entries (key, value, size, used) VALUES (?, ?, ?, ?)",
+                    (key, value, len(value), time.time_ns()),
+                )
+                self._evict()
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+            self._connection.execute("COMMIT")
+
+    def _total_size(self) -> int:
+        (total,) = self._connection.execute("SELECT size FROM stats WHERE id = 0").fetchone()
+        return int(total)
+
+    def _evict(self) -> None:
+        total = self._total_size()
+        if total <= self.max_bytes:
+            return
+        stale: list[tuple[str]] = []
+        for key, size in self._connection.execute("SELECT key, size FROM entries ORDER BY used"):
+            if total <= self.max_bytes:
+                break
+            stale.append((key,))
+            total -= size
+        self._connection.executemany("DELETE FROM entries WHERE key = ?", stale)
+
+    def get_request(self, key: str) -> tuple[bool, Request | None]:
+        """:returns: whether the key was found, and the request stored under it (None when the input wasn't valid)"""
+        value = self.get(key)
+        if value is None:
+            return False, None
+        request: Request | None = pickle.loads(value)
+        return True, request
+
+    def put_request(self, key: str, request: Request | None) -> None:
+        """stores a parsed request (lazy requests are stored fully decoded)"""
+        from .request import Request
+
+        if request is not None and type(request) is not Request:
+            request = Request(**{field.name: getattr(request, field.name) for field in dataclasses.fields(Request)})
+        self.put(key, pickle.dumps(request, protocol=4))
+
+    def get_code(self, key: str) -> str | None:
+        value = self.get(key)
+        return None if value is None else value.decode("utf-8", "surrogateescape")
+
+    def put_code(self, key: str, code: str) -> None:
+        self.put(key, code.encode("utf-8", "surrogateescape"))
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._connection.execute("SELECT COUNT(*) FROM entries").fetchone()
+        return int(count)
+
+    @property
+    def size(self) -> int:
+        """the total size of the stored values, in bytes"""
+        with self._lock:
+            return self._total_size()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM entries")
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def __enter__(self) -> Cache:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
@@ -1,16 +1,32 @@
 from __future__ import annotations
 
-import json
+import io
+import re
 import typing as t
 import urllib.parse
+from json.encoder import encode_basestring_ascii  # type: ignore[attr-defined]
 
 if t.TYPE_CHECKING:
     from .typings import JSON
 
 
 def extract_cookies(headers: dict[str, str]) -> dict[str, str]:
-    """:returns: a dict of cookies based off the 'cookie' header"""
-    cookie_header = headers.pop("cookie", None)
+    """
+    :returns: a dict of cookies based off the 'cookie' header
+    the header is removed from `headers` -- use `split_cookies` to leave it untouched
+    """
+    return parse_cookie_header(headers.pop("cookie", None))
+
+
+def split_cookies(headers: t.Mapping[str, str]) -> tuple[dict[str, str], dict[str, str]]:
+    """:returns: a copy of the headers without the 'cookie' header, and a dict of the cookies it held"""
+    cookie_header = headers.get("cookie")
+    without_cookie = {key: value for key, value in headers.items() if key != "cookie"}
+    return without_cookie, parse_cookie_header(cookie_header)
+
+
+def parse_cookie_header(cookie_header: str | None) -> dict[str, str]:
+    """(ex. "a=1; b=2" --> {"a": "1", "b": "2"})"""
     if not cookie_header:
         return {}
     cookie_dict = {}
@@ -24,38 +40,164 @@ def extract_cookies(headers: dict[str, str]) -> dict[str, str]:
 
 
 def parse_url(url: str) -> tuple[str, dict[str, str] | None]:
+    without_query, query = split_url(url)
+    return without_query, parse_url_encoded(query) or None
+
+
+def split_url(url: str) -> tuple[str, str]:
+    """
+    splits the query string off of a url, without decoding it
+    (ex. "https://httpbin.org/get?a=1" --> ("https://httpbin.org/get", "a=1"))
+    """
     parsed_url = urllib.parse.urlparse(url)
-    query = parse_url_encoded(parsed_url.query) or None
 
     without_query = urllib.parse.ParseResult(
         parsed_url.scheme, parsed_url.netloc, parsed_url.path, parsed_url.params, "", parsed_url.fragment
     )
 
-    return without_query.geturl(), query
+    return without_query.geturl(), parsed_url.query
 
 
-def format_json_like(data: JSON, indent: int | None = 4) -> str:
-    # I'm not sure it's possible to pretty-format this with something like
-    # pprint, but if it is possible LMK!
-    formatted = json.dumps(data, indent=indent)
-    # parse bools and none
-    # leading space allows us to only match literal false and not "false" string
-    formatted = formatted.replace(" null", " None")
-    formatted = formatted.replace(" true", " True")
-    formatted = formatted.replace(" false", " False")
-    # replace lists with tuples
-    # (json doesn't support tuples)
-    formatted = formatted.replace("[", "(")
-    formatted = formatted.replace("]", ")")
-    # replace binary with actual bytes of binary
-    formatted = formatted.replace('"(binary)"', 'b"(binary)"')
-    return formatted
+def format_json_like(data: JSON | bytes, indent: int | None = 4) -> str:
+    """
+    formats data as a python literal, laid out like `json.dumps` would
+    (ex. {"a": [True, None]} --> '{\n    "a": (\n        True,\n        None\n    )\n}')
+    """
+    buffer = io.StringIO()
+    write_literal(data, buffer.write, indent)
+    return buffer.getvalue()
+
+
+def write_literal(value: t.Any, write: t.Callable[[str], t.Any], indent: int | None = 4) -> None:
+    """
+    Writes `value` as a python literal in a single pass, a piece at a time (ex. to `list.append` or `io.StringIO.write`).
+
+    dicts (and other mappings) stay dicts, lists and tuples become tuples, bools and None become True/False/None,
+    and bytes become bytes. Objects with a `to_literal` method are written as whatever it returns.
+    """
+    layouts: list[tuple[str, str, str]] = []
+
+    def layout(level: int) -> tuple[str, str, str]:
+        """:returns: what's written after an opening bracket, between items, and before the closing bracket"""
+        while len(layouts) <= level:
+            if indent is None:
+                layouts.append(("", ", ", ""))
+            else:
+                inner = "\n" + " " * (indent * (len(layouts) + 1))
+                layouts.append((inner, "," + inner, "\n" + " " * (indent * len(layouts))))
+        return layouts[level]
+
+    def emit(value: t.Any, level: int, prefix: str = "") -> None:
+        # `prefix` is written along with the value, which saves a write for every item
+        format_scalar = _SCALARS.get(type(value))
+        if format_scalar is not None:
+            write(prefix + format_scalar(value))
+        elif isinstance(value, (dict, t.Mapping)):
+            if not value:
+                write(prefix + "{}")
+                return
+            opening, separator, closing = layout(level)
+            prefix += "{" + opening
+            for key, item in value.items():
+                prefix += _format_scalar(key) + ": "
+                format_scalar = _SCALARS.get(type(item))
+                if format_scalar is not None:
+                    write(prefix + format_scalar(item))
+                else:
+                    emit(item, level + 1, prefix)
+                prefix = separator
+            write(closing + "}")
+        elif isinstance(value, (list, tuple)):
+            if not value:
+                write(prefix + "()")
+                return
+            opening, separator, closing = layout(level)
+            prefix += "(" + opening
+            for item in value:
+                format_scalar = _SCALARS.get(type(item))
+                if format_scalar is not None:
+                    write(prefix + format_scalar(item))
+                else:
+                    emit(item, level + 1, prefix)
+                prefix = separator
+            # (x) isn't a tuple
+            write(("," if len(value) == 1 else "") + closing + ")")
+        elif hasattr(value, "to_literal"):
+            emit(value.to_literal(), level, prefix)
+        else:
+            # subclasses of scalars (ex. enums)
+            write(prefix + _format_scalar(value))
+
+    emit(value, 0)
+
+
+# lone surrogates, which stand in for undecodable bytes (ex. "\udcff" for b"\xff")
+SURROGATE = re.compile("[\ud800-\udfff]")
+_ASTRAL = re.compile("([\U00010000-\U0010ffff])")
+
+
+def _format_str(text: str) -> str:
+    # json escapes (\", \\, \n, \u00e9, ...) mean the same thing in python, and keep the code ascii like json.dumps did
+    # (lone surrogates, which stand in for undecodable bytes, are escaped the same way)
+    if text.isascii() or not _ASTRAL.search(text):
+        return t.cast(str, encode_basestring_ascii(text))
+    # json writes astral characters as surrogate pairs, which python reads as two separate characters
+    parts = _ASTRAL.split(text)
+    for n in range(1, len(parts), 2):
+        parts[n] = f"\\U{ord(parts[n]):08x}"
+    for n in range(0, len(parts), 2):
+        parts[n] = encode_basestring_ascii(parts[n])[1:-1]
+    return '"' + "".join(parts) + '"'
+
+
+def _format_float(number: float) -> str:
+    if number != number:
+        return 'float("nan")'
+    if number in (float("inf"), float("-inf")):
+        return 'float("inf")' if number > 0 else '-float("inf")'
+    return float.__repr__(number)
+
+
+def _format_bytes(data: bytes | bytearray) -> str:
+    """double quotes by default, like strings (ex. b"(binary)")"""
+    literal = repr(bytes(data))
+    if literal.startswith("b'") and b'"' not in data:
+        # there are no quotes inside to unescape
+        return f'b"{literal[2:-1]}"'
+    return literal
+
+
+def _format_scalar(value: t.Any) -> str:
+    if isinstance(value, str):
+        return _format_str(value)
+    if value is None:
+        return "None"
+    if isinstance(value, bool):
+        return "True" if value else "False"
+    if isinstance(value, int):
+        return int.__repr__(value)
+    if isinstance(value, float):
+        return _format_float(value)
+    if isinstance(value, (bytes, bytearray)):
+        return _format_bytes(value)
+    raise TypeError(f"Object of type {type(value).__name__} can't be written as a literal")
+
+
+# formatters for exact types, looked up before anything else since almost every value is one of these
+_SCALARS: dict[type, t.Callable[[t.Any], str]] = {
+    str: _format_str,
+    int: int.__repr__,
+    float: _format_float,
+    bool: lambda value: "True" if value else "False",
+    type(None): lambda value: "None",
+    bytes: _format_bytes,
+}
 
 
 def format_string(text: str) -> str:
     """formats a string"""
-    if "'" in text or '"' in text:
-        # text contains a quote, so let python escape it optimally
+    if "'" in text or '"' in text or (not text.isascii() and SURROGATE.search(text)):
+        # text contains a quote (or an undecodable byte), so let python escape it optimally
         return repr(text)
     # double quotes by default
     return f'"{text}"'
@@ -64,12 +206,3 @@ def format_string(text: str) -> str:
 def parse_url_encoded(x: str) -> dict[str, str]:
     """parses application/x-www-form-urlencoded and query string params"""
     return dict(urllib.parse.parse_qsl(x, keep_blank_values=True))
-
-
-def fix_escape_chars(body: str) -> str:
-    """
-    replaces escaped \\ followed by a letter to the appropriate char
-    (ex. "\\t" --> "\t")
-    (ex. "\\n" --> "\n")
-    """
-    return body.encode(encoding="utf8", errors="ignore").decode(encoding="unicode_escape", errors="ignore")
@@ -0,0 +1,136 @@
+"""A compact `Request` representation for holding many requests in memory at once"""
+from __future__ import annotations
+
+import dataclasses
+import types
+import typing as t
+
+from .request import Request
+
+if t.TYPE_CHECKING:
+    from .typings import JSON, Body, Files
+
+__all__ = ("CompactRequest", "RequestPool")
+
+# longer values (ex. tokens, bodies) are rarely shared, so they aren't interned
+MAX_INTERNED_LENGTH = 256
+
+# (name, value) pairs, shared between every request with the same headers (or cookies)
+Pairs = t.Tuple[t.Tuple[str, str], ...]
+
+
+class RequestPool:
+    """
+    Interns short strings and shares identical sets of short headers and cookies between requests.
+    Everything stays alive for as long as the pool does, so there's no default pool:
+    give each batch of requests its own, and use `clear` (or drop the pool) to let it go.
+    """
+
+    __slots__ = ("_strings", "_pairs")
+
+    def __init__(self) -> None:
+        self._strings: dict[str, str] = {}
+        self._pairs: dict[Pairs, Pairs] = {}
+
+    def __len__(self) -> int:
+        """the number of distinct header and cookie sets"""
+        return len(self._pairs)
+
+    def intern(self, text: str) -> str:
+        if len(text) > MAX_INTERNED_LENGTH:
+            return text
+        return self._strings.setdefault(text, text)
+
+    def pairs(self, mapping: t.Mapping[str, str] | None) -> Pairs | None:
+        """:returns: the shared pairs equal to `mapping` (pairs holding a long key or value aren't shared)"""
+        if mapping is None:
+            return None
+        pairs = tuple((self.intern(key), self.intern(value)) for key, value in mapping.items())
+        if any(len(key) > MAX_INTERNED_LENGTH or len(value) > MAX_INTERNED_LENGTH for key, value in pairs):
+            return pairs
+        return self._pairs.setdefault(pairs, pairs)
+
+    def clear(self) -> None:
+        self._strings.clear()
+        self._pairs.clear()
+
+
+class CompactRequest:
+    """
+    A `Request` stored in as little memory as possible, on every python version.
+
+    Headers and cookies are kept as pooled tuples shared by every request that has the same ones.
+    Reading them returns a read-only mapping, so changing one in place fails instead of being lost;
+    assign a new dict to change them, which pools it again.
+    """
+
+    __slots__ = ("method", "url", "_headers", "_cookies", "params", "data", "json", "files", "_pool")
+
+    def __init__(
+        self,
+        method: str,
+        url: str,
+        headers: dict[str, str] | None,
+        cookies: dict[str, str] | None,
+        params: dict[str, str] | None,
+        data: Body | None,
+        json: JSON | None,
+        files: Files | None,
+        pool: RequestPool,
+    ) -> None:
+        self._pool = pool
+        self.method = pool.intern(method)
+        self.url = url
+        self._headers = pool.pairs(headers)
+        self._cookies = pool.pairs(cookies)
+        self.params = params
+        self.data = data
+        self.json = json
+        self.files = files
+
+    @classmethod
+    def from_request(cls, request: Request, pool: RequestPool) -> CompactRequest:
+        return cls(**{field.name: getattr(request, field.name) for field in dataclasses.fields(Request)}, pool=pool)
+
+    def to_request(self) -> Request:
+        return Request(
+            method=self.method,
+            url=self.url,
+            headers=None if self._headers is None else dict(self._headers),
+            cookies=None if self._cookies is None else dict(self._cookies),
+            params=self.params,
+            data=self.data,
+            json=self.json,
+            files=self.files,
+        )
+
+    @property
+    def headers(self) -> t.Mapping[str, str] | None:
+        return None if self._headers is None else types.MappingProxyType(dict(self._headers))
+
+    @headers.setter
+    def headers(self, headers: t.Mapping[str, str] | None) -> None:
+        self._headers = self._pool.pairs(headers)
+
+    @property
+    def cookies(self) -> t.Mapping[str, str] | None:
+        return None if self._cookies is None else types.MappingProxyType(dict(self._cookies))
+
+    @cookies.setter
+    def cookies(self, cookies: t.Mapping[str, str] | None) -> None:
+        self._cookies = self._pool.pairs(cookies)
+
+    def generate_code(self, *args: t.Any, **kwargs: t.Any) -> str:
+        """see `Request.generate_code`"""
+        return self.to_request().generate_code(*args, **kwargs)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, (Request, CompactRequest)):
+            return NotImplemented
+        return all(getattr(self, field.name) == getattr(other, field.name) for field in dataclasses.fields(Request))
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{field.name}={getattr(self, field.name)!r}" for field in dataclasses.fields(Request))
+        return f"{type(self).__qualname__}({fields})"
@@ -0,0 +1,199 @@
+"""Converts many capture files at once, skipping the ones that haven't changed since the last run"""
+from __future__ import annotations
+
+import glob
+import hashlib
+import json
+import os
+import re
+import typing as t
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+from . import __version__
+
+__all__ = ("convert_files", "expand_patterns", "ConvertResult", "MANIFEST_NAME")
+
+MANIFEST_NAME = ".autorequests-manifest.json"
+MANIFEST_VERSION = 1
+
+CONVERTED = "converted"
+SKIPPED = "skipped"
+FAILED = "failed"
+
+COMPRESSED_EXTENSIONS = (".gz", ".bz2", ".xz")
+
+
+@dataclass
+class ConvertResult:
+    converted: list[str] = field(default_factory=list)
+    skipped: list[str] = field(default_factory=list)
+    failed: list[str] = field(default_factory=list)
+    # stale modules that were deleted
+    removed: list[str] = field(default_factory=list)
+
+
+def expand_patterns(patterns: t.Iterable[str]) -> list[str]:
+    """expands glob patterns (`**` included) into a sorted list of unique files"""
+    paths: set[str] = set()
+    for pattern in patterns:
+        paths.update(path for path in glob.glob(pattern, recursive=True) if os.path.isfile(path))
+    return sorted(paths)
+
+
+def convert_files(
+    paths: t.Iterable[str],
+    output_dir: str,
+    options: dict[str, t.Any],
+    processes: int | None = None,
+    force: bool = False,
+    cache_path: str | None = None,
+) -> ConvertResult:
+    """
+    Converts every file into a python module inside `output_dir`, fanning the work out across `processes`.
+
+    A manifest of input hashes is kept next to the generated modules,
+    and files whose input and generation options are unchanged since the last run are skipped.
+    Modules generated from inputs that have since failed to parse, or been deleted, are removed.
+    `cache_path` is a `Cache` file shared by every process, which outlives the output directory (ex. between CI runs).
+    """
+    os.makedirs(output_dir, exist_ok=True)
+
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    manifest = load_manifest(manifest_path)
+    options_digest = digest_options(options)
+
+    jobs: list[tuple[str, str, dict[str, t.Any], str | None, str | None]] = []
+    for path, module_name in zip_module_names(paths):
+        output_path = os.path.join(output_dir, module_name)
+        previous = manifest.get(os.path.abspath(path))
+        previous_digest: str | None = None
+        if not force and previous and previous["options"] == options_digest and previous["output"] == module_name:
+            previous_digest = previous["input"]
+        jobs.append((path, output_path, options, previous_digest, cache_path))
+
+    result = ConvertResult()
+    # modules generated by an earlier run whose input has since failed or been deleted
+    stale: list[str] = []
+
+    def record(outcomes: t.Iterable[tuple[str, str]]) -> None:
+        for (path, output_path, *_), (status, input_digest) in zip(jobs, outcomes):
+            getattr(result, status).append(path)
+            if status == FAILED:
+                previous = manifest.pop(os.path.abspath(path), None)
+                if previous:
+                    stale.append(previous["output"])
+                continue
+            manifest[os.path.abspath(path)] = {
+                "input": input_digest,
+                "options": options_digest,
+                "output": os.path.basename(output_path),
+            }
+
+    processes = processes or os.cpu_count() or 1
+    if processes == 1 or len(jobs) <= 1:
+        # a pool would only add its startup time
+        record(map(_convert_job, jobs))
+    else:
+        chunksize = max(1, len(jobs) // (processes * 4))
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            record(executor.map(_convert_job, jobs, chunksize=chunksize))
+
+    for input_path in [input_path for input_path in manifest if not os.path.exists(input_path)]:
+        stale.append(manifest.pop(input_path)["output"])
+    # a module name can be reused by another input in the meantime
+    kept = {entry["output"] for entry in manifest.values()}
+    for module_name in stale:
+        if module_name in kept:
+            continue
+        try:
+            os.remove(os.path.join(output_dir, module_name))
+        except FileNotFoundError:
+            continue
+        result.removed.append(os.path.join(output_dir, module_name))
+
+    save_manifest(manifest_path, manifest)
+    return result
+
+
+def zip_module_names(paths: t.Iterable[str]) -> t.Iterator[tuple[str, str]]:
+    """pairs each path with a unique, importable module file name"""
+    taken: set[str] = set()
+    for path in paths:
+        stem = os.path.basename(path)
+        # (ex. "capture.har.gz" -> "capture")
+        if stem.endswith(COMPRESSED_EXTENSIONS):
+            stem = os.path.splitext(stem)[0]
+        stem = os.path.splitext(stem)[0]
+        name = re.sub(r"\W", "_", stem) or "request"
+        if name[0].isdigit():
+            name = f"_{name}"
+
+        unique = name
+        n = 1
+        while unique in taken:
+            n += 1
+            unique = f"{name}_{n}"
+        taken.add(unique)
+
+        yield path, f"{unique}.py"
+
+
+def digest_options(options: dict[str, t.Any]) -> str:
+    # generated code may change between versions, so the version is part of the options
+    payload = json.dumps({"options": options, "version": __version__}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def load_manifest(path: str) -> dict[str, dict[str, str]]:
+    try:
+        with open(path, encoding="utf-8") as fp:
+            data = json.load(fp)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+        return {}
+    files: dict[str, dict[str, str]] = data.get("files", {})
+    return files
+
+
+def save_manifest(path: str, files: dict[str, dict[str, str]]) -> None:
+    # write then rename so an interrupted run never leaves a half written manifest behind
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as fp:
+        json.dump({"version": MANIFEST_VERSION, "files": files}, fp, indent=2, sort_keys=True)
+    os.replace(temp_path, path)
+
+
+def _convert_job(job: tuple[str, str, dict[str, t.Any], str | None, str | None]) -> tuple[str, str]:
+    """runs in a worker process; :returns: the outcome and the digest of the input"""
+    from .cache import Cache
+    from .parsing import iter_requests
+    from .sources import decompressed, source_text
+
+    path, output_path, options, previous_digest, cache_path = job
+
+    with open(path, "rb") as fp:
+        # gzip, bz2, and xz captures are decompressed as they're read, like --file does
+        raw = decompressed(fp).read()
+
+    input_digest = hashlib.sha256(raw).hexdigest()
+    if input_digest == previous_digest and os.path.exists(output_path):
+        return SKIPPED, input_digest
+
+    cache = Cache(cache_path) if cache_path else None
+    try:
+        # undecodable bytes are kept as lone surrogates, like `parse_input` does, so binary bodies survive
+        text = source_text(raw)
+        codes = [request.generate_code(**options, cache=cache) for request in iter_requests(text, cache=cache)]
+    finally:
+        if cache is not None:
+            cache.close()
+    if not codes:
+        return FAILED, input_digest
+
+    with open(output_path, "w", encoding="utf-8") as fp:
+        fp.write("\n\n".join(codes))
+        fp.write("\n")
+
+    return CONVERTED, input_digest
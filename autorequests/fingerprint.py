@@ -0,0 +1,129 @@
+"""Canonical fingerprints of requests, for spotting duplicates that only differ in ordering or volatile headers"""
+from __future__ import annotations
+
+import hashlib
+import json
+import typing as t
+import urllib.parse
+
+from .parsing.multipart import FilePart
+
+if t.TYPE_CHECKING:
+    from .request import Request
+
+__all__ = ("fingerprint", "canonicalize", "dedup", "DEFAULT_IGNORED_HEADERS", "DEFAULT_IGNORED_COOKIES")
+
+# headers that change on every request without changing what the request does
+DEFAULT_IGNORED_HEADERS = frozenset(
+    (
+        "b3",
+        "baggage",
+        "content-length",
+        "date",
+        "request-id",
+        "sentry-trace",
+        "traceparent",
+        "tracestate",
+        "x-amzn-trace-id",
+        "x-b3-parentspanid",
+        "x-b3-sampled",
+        "x-b3-spanid",
+        "x-b3-traceid",
+        "x-client-trace-id",
+        "x-cloud-trace-context",
+        "x-correlation-id",
+        "x-datadog-parent-id",
+        "x-datadog-trace-id",
+        "x-request-id",
+    )
+)
+DEFAULT_IGNORED_COOKIES: frozenset[str] = frozenset()
+
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def fingerprint(
+    request: Request,
+    ignore_headers: t.Iterable[str] = DEFAULT_IGNORED_HEADERS,
+    ignore_cookies: t.Iterable[str] = DEFAULT_IGNORED_COOKIES,
+) -> str:
+    """
+    :returns: a hash that's the same for requests that only differ in
+    header case and order, param order, or the headers and cookies that are ignored
+    """
+    return hashlib.sha256(canonicalize(request, ignore_headers, ignore_cookies)).hexdigest()
+
+
+def canonicalize(
+    request: Request,
+    ignore_headers: t.Iterable[str] = DEFAULT_IGNORED_HEADERS,
+    ignore_cookies: t.Iterable[str] = DEFAULT_IGNORED_COOKIES,
+) -> bytes:
+    """the canonical form of a request that `fingerprint` hashes"""
+    ignored_headers = {name.lower() for name in ignore_headers}
+    ignored_cookies = set(ignore_cookies)
+
+    url, query = _canonical_url(request.url)
+    params = sorted(query + list((request.params or {}).items()))
+    headers = sorted(
+        (name.lower(), value.strip())
+        for name, value in (request.headers or {}).items()
+        if name.lower() not in ignored_headers
+    )
+    cookies = sorted((name, value) for name, value in (request.cookies or {}).items() if name not in ignored_cookies)
+
+    canonical = {
+        "method": request.method.upper(),
+        "url": url,
+        "params": params,
+        "headers": headers,
+        "cookies": cookies,
+        "data": request.data,
+        "json": request.json,
+        "files": request.files,
+    }
+    return json.dumps(canonical, sort_keys=True, separators=(",", ":"), default=_canonical_value).encode("utf-8")
+
+
+def dedup(
+    requests: t.Iterable[Request],
+    ignore_headers: t.Iterable[str] = DEFAULT_IGNORED_HEADERS,
+    ignore_cookies: t.Iterable[str] = DEFAULT_IGNORED_COOKIES,
+) -> t.Iterator[Request]:
+    """yields the first of each set of requests with the same fingerprint, as they stream in"""
+    ignore_headers = frozenset(ignore_headers)
+    ignore_cookies = frozenset(ignore_cookies)
+    seen: set[str] = set()
+    for request in requests:
+        key = fingerprint(request, ignore_headers, ignore_cookies)
+        if key in seen:
+            continue
+        seen.add(key)
+        yield request
+
+
+def _canonical_url(url: str) -> tuple[str, list[tuple[str, str]]]:
+    """
+    lowercases the scheme and host, drops default ports and the fragment, and splits off the query
+    (ex. "HTTPS://HttpBin.org:443/get?b=2&a=1#top" --> ("https://httpbin.org/get", [("b", "2"), ("a", "1")]))
+    """
+    parts = urllib.parse.urlsplit(url)
+    scheme = parts.scheme.lower()
+    netloc = parts.netloc.lower()
+    default_port = _DEFAULT_PORTS.get(scheme)
+    if default_port and netloc.endswith(f":{default_port}"):
+        netloc = netloc[: -len(f":{default_port}")]
+    path = parts.path or "/"
+    query = urllib.parse.parse_qsl(parts.query, keep_blank_values=True)
+    return urllib.parse.urlunsplit((scheme, netloc, path, "", "")), query
+
+
+def _canonical_value(value: t.Any) -> t.Any:
+    # frozen and pooled requests hold mappings that aren't dicts
+    if isinstance(value, t.Mapping):
+        return dict(value)
+    if isinstance(value, FilePart):
+        return [value.filename, value.content_type, value.size, value.sha256]
+    if isinstance(value, (bytes, bytearray)):
+        return hashlib.sha256(value).hexdigest()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
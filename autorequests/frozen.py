@@ -0,0 +1,115 @@
+"""An immutable, hashable `Request` that can be shared between threads and used as a cache key"""
+from __future__ import annotations
+
+import dataclasses
+import typing as t
+
+from .request import Request
+
+__all__ = ("FrozenRequest", "FrozenDict", "FrozenList", "freeze", "thaw")
+
+_FIELDS = tuple(field.name for field in dataclasses.fields(Request))
+
+
+class FrozenDict(t.Mapping[str, t.Any]):
+    """An immutable dict. Its hash is computed once, the first time it's needed."""
+
+    __slots__ = ("_dict", "_hash")
+
+    def __init__(self, *args: t.Any, **kwargs: t.Any) -> None:
+        self._dict: dict[str, t.Any] = dict(*args, **kwargs)
+        self._hash: int | None = None
+
+    def __getitem__(self, key: str) -> t.Any:
+        return self._dict[key]
+
+    def __iter__(self) -> t.Iterator[str]:
+        return iter(self._dict)
+
+    def __len__(self) -> int:
+        return len(self._dict)
+
+    def __hash__(self) -> int:
+        if self._hash is None:
+            self._hash = hash(frozenset(self._dict.items()))
+        return self._hash
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, FrozenDict):
+            return hash(self) == hash(other) and self._dict == other._dict
+        if isinstance(other, dict):
+            return self._dict == other
+        return super().__eq__(other)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self._dict!r})"
+
+
+class FrozenList(tuple):  # type: ignore[type-arg]
+    """A list that was frozen. It's a tuple, but is thawed back into a list."""
+
+    __slots__ = ()
+
+
+def freeze(value: t.Any) -> t.Any:
+    """recursively turns dicts into `FrozenDict`s and lists into `FrozenList`s"""
+    if isinstance(value, dict):
+        return FrozenDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return FrozenList(freeze(item) for item in value)
+    return value
+
+
+def thaw(value: t.Any) -> t.Any:
+    """the inverse of `freeze`; :returns: new, mutable copies"""
+    if isinstance(value, FrozenDict):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, FrozenList):
+        return [thaw(item) for item in value]
+    return value
+
+
+@dataclasses.dataclass(frozen=True, eq=False)
+class FrozenRequest:
+    """
+    An immutable `Request`. Every mapping and list in it is frozen,
+    and its hash is computed once, up front.
+
+    Frozen requests compare equal to regular requests with the same fields.
+    """
+
+    method: str
+    url: str
+    headers: FrozenDict | None
+    cookies: FrozenDict | None
+    params: FrozenDict | None
+    data: FrozenDict | bytes | None
+    json: FrozenDict | FrozenList | None
+    files: FrozenDict | None
+    _hash: int = dataclasses.field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        for name in _FIELDS:
+            object.__setattr__(self, name, freeze(getattr(self, name)))
+        object.__setattr__(self, "_hash", hash(tuple(getattr(self, name) for name in _FIELDS)))
+
+    @classmethod
+    def from_request(cls, request: Request) -> FrozenRequest:
+        return cls(**{name: getattr(request, name) for name in _FIELDS})
+
+    def to_request(self) -> Request:
+        return Request(**{name: thaw(getattr(self, name)) for name in _FIELDS})
+
+    def generate_code(self, *args: t.Any, **kwargs: t.Any) -> str:
+        """see `Request.generate_code`"""
+        return self.to_request().generate_code(*args, **kwargs)
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, FrozenRequest):
+            return self._hash == other._hash and all(getattr(self, name) == getattr(other, name) for name in _FIELDS)
+        if isinstance(other, Request):
+            return self.to_request() == other
+        return NotImplemented
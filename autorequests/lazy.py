@@ -0,0 +1,87 @@
+"""A `Request` that only decodes the parts that are actually used"""
+from __future__ import annotations
+
+import dataclasses
+import typing as t
+
+from .request import Request
+
+if t.TYPE_CHECKING:
+    from .typings import ParsedBody
+
+__all__ = ("LazyRequest",)
+
+HEADERS = "headers"
+PARAMS = "params"
+BODY = "body"
+
+
+class _LazyField:
+    """A field that's loaded, along with the rest of its group, the first time it's accessed"""
+
+    def __init__(self, group: str, index: int) -> None:
+        self.group = group
+        self.index = index
+
+    def __get__(self, instance: LazyRequest | None, owner: type | None = None) -> t.Any:
+        if instance is None:
+            return self
+        return instance._load(self.group)[self.index]
+
+    def __set__(self, instance: LazyRequest, value: t.Any) -> None:
+        values = list(instance._load(self.group))
+        values[self.index] = value
+        instance._loaded[self.group] = tuple(values)
+
+
+class LazyRequest(Request):
+    """
+    A `Request` whose method and url are decoded up front,
+    while its headers and cookies, params, and body are decoded from the source the first time they're accessed.
+
+    Each loader runs at most once, and its result is cached.
+    Lazy requests compare equal to regular requests with the same fields.
+    """
+
+    headers = _LazyField(HEADERS, 0)  # type: ignore[assignment]
+    cookies = _LazyField(HEADERS, 1)  # type: ignore[assignment]
+    params = _LazyField(PARAMS, 0)  # type: ignore[assignment]
+    data = _LazyField(BODY, 0)  # type: ignore[assignment]
+    json = _LazyField(BODY, 1)  # type: ignore[assignment]
+    files = _LazyField(BODY, 2)  # type: ignore[assignment]
+
+    def __init__(
+        self,
+        method: str,
+        url: str,
+        load_headers: t.Callable[[], tuple[dict[str, str] | None, dict[str, str] | None]],
+        load_params: t.Callable[[], dict[str, str] | None],
+        load_body: t.Callable[[], ParsedBody],
+    ) -> None:
+        # the dataclass __init__ isn't used since it would set every field
+        self.method = method
+        self.url = url
+        self._loaders: dict[str, t.Callable[[], t.Any]] = {
+            HEADERS: load_headers,
+            PARAMS: lambda: (load_params(),),
+            BODY: load_body,
+        }
+        self._loaded: dict[str, tuple[t.Any, ...]] = {}
+
+    def _load(self, group: str) -> tuple[t.Any, ...]:
+        values = self._loaded.get(group)
+        if values is None:
+            values = self._loaded[group] = tuple(self._loaders.pop(group)())
+        return values
+
+    @property
+    def loaded(self) -> frozenset[str]:
+        """the groups that have been decoded so far (ex. {"headers", "body"})"""
+        return frozenset(self._loaded)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Request):
+            return NotImplemented
+        return all(getattr(self, field.name) == getattr(other, field.name) for field in dataclasses.fields(Request))
+
+    __hash__ = None  # type: ignore[assignment]
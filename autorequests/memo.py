@@ -0,0 +1,124 @@
+"""
+An in-memory LRU memo of parsed requests and generated code, for long-running processes that convert the same input
+over and over (ex. with different flags). It's passed as the `cache` of `parse_input` and `Request.generate_code`.
+"""
+from __future__ import annotations
+
+import collections
+import threading
+import typing as t
+
+from .frozen import FrozenRequest
+
+if t.TYPE_CHECKING:
+    from .request import Request
+
+__all__ = ("Memo", "MemoStats", "DEFAULT_MAX_ENTRIES", "DEFAULT_MAX_BYTES")
+
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+class MemoStats(t.NamedTuple):
+    hits: int
+    misses: int
+    entries: int
+    size: int
+
+
+class Memo:
+    """
+    A thread-safe LRU memo, bounded by its number of entries and the (approximate) size of what it holds.
+    Keys are the same as `Cache`'s: a digest of the input, or of the request's fields and the generation options.
+    (ex. `memo = Memo(); parse_input(text, cache=memo)`)
+
+    Requests are held frozen and handed out as new copies, so changing a request that's returned doesn't change the memo.
+    A disabled memo misses every lookup and stores nothing.
+    """
+
+    def __init__(
+        self, max_entries: int = DEFAULT_MAX_ENTRIES, max_bytes: int = DEFAULT_MAX_BYTES, enabled: bool = True
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.size = 0
+        self._entries: collections.OrderedDict[str, tuple[t.Any, int]] = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, key: str) -> tuple[bool, t.Any]:
+        if not self.enabled:
+            return False, None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return True, entry[0]
+
+    def _put(self, key: str, value: t.Any, size: int) -> None:
+        if not self.enabled or size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= previous[1]
+            self._entries[key] = (value, size)
+            self.size += size
+            while len(self._entries) > self.max_entries or self.size > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.size -= evicted_size
+
+    def get_request(self, key: str) -> tuple[bool, Request | None]:
+        """:returns: whether the key was found, and a copy of the request stored under it"""
+        found, frozen = self._get(key)
+        return found, frozen.to_request() if frozen is not None else None
+
+    def put_request(self, key: str, request: Request | None) -> None:
+        frozen = FrozenRequest.from_request(request) if request is not None else None
+        self._put(key, frozen, _estimate_size(request))
+
+    def get_code(self, key: str) -> str | None:
+        _, code = self._get(key)
+        return t.cast("str | None", code)
+
+    def put_code(self, key: str, code: str) -> None:
+        self._put(key, code, len(code))
+
+    @property
+    def stats(self) -> MemoStats:
+        with self._lock:
+            return MemoStats(self.hits, self.misses, len(self._entries), self.size)
+
+    def clear(self) -> None:
+        """drops every entry and resets the stats"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.size = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+def _estimate_size(value: t.Any) -> int:
+    """roughly how much memory a request's data takes up, counting the length of every string and a bit per item"""
+    if value is None or isinstance(value, (bool, int, float)):
+        return 8
+    if isinstance(value, (str, bytes)):
+        return len(value) + 8
+    if isinstance(value, t.Mapping):
+        return sum(_estimate_size(key) + _estimate_size(item) for key, item in value.items()) + 8
+    if isinstance(value, (list, tuple)):
+        return sum(_estimate_size(item) for item in value) + 8
+    if hasattr(value, "method") and hasattr(value, "url"):
+        # a request
+        return sum(
+            _estimate_size(getattr(value, name))
+            for name in ("method", "url", "headers", "cookies", "params", "data", "json", "files")
+        )
+    return 64
@@ -0,0 +1,65 @@
+"""Prints generated code to the terminal without highlighting more of it than anyone will look at"""
+from __future__ import annotations
+
+import sys
+import typing as t
+
+if t.TYPE_CHECKING:
+    from rich.console import Console
+
+__all__ = ("print_code", "iter_pages", "HIGHLIGHT_LIMIT")
+
+# code longer than this (in characters) is paged, so only the page that's on screen is highlighted
+HIGHLIGHT_LIMIT = 256 * 1024
+
+
+def print_code(console: Console, code: str, plain: bool = False, limit: int = HIGHLIGHT_LIMIT) -> None:
+    """
+    prints code highlighted, unless `plain` is set or the console isn't a terminal.
+    code over the limit is highlighted a page at a time, waiting for enter between pages when stdin is a terminal
+    """
+    if plain or not console.is_terminal:
+        console.file.write(code)
+        console.file.flush()
+        return
+
+    from rich.syntax import Syntax
+
+    if len(code) <= limit:
+        console.print(Syntax(code, "python"))
+        return
+
+    interactive = console.is_interactive and sys.stdin is not None and sys.stdin.isatty()
+    # leave a line for the prompt
+    for page, rest in iter_pages(code, max(console.size.height - 1, 1)):
+        # a trailing newline would be printed as a blank line
+        console.print(Syntax(page.rstrip("\n"), "python"))
+        if not rest:
+            return
+        if not interactive:
+            # there's no one to page for, so the rest is written as is
+            console.file.write(code[len(code) - rest :])
+            console.file.flush()
+            return
+        answer = console.input(f"[grey50]-- {rest:,} more characters (enter: next page, q: skip the rest) --[/grey50]")
+        if answer.strip().lower() == "q":
+            return
+
+
+def iter_pages(code: str, lines: int) -> t.Iterator[tuple[str, int]]:
+    """
+    yields pages of `lines` lines at a time, without splitting the whole code into lines up front
+    (ex. ("a\\nb\\n", 1) --> ("a\\n", 2), ("b\\n", 0))
+    :returns: each page and the number of characters after it
+    """
+    start = 0
+    end = len(code)
+    while start < end:
+        stop = start
+        for _ in range(lines):
+            stop = code.find("\n", stop, end) + 1
+            if not stop:
+                stop = end
+                break
+        yield code[start:stop], end - stop
+        start = stop
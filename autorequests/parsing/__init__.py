@@ -2,18 +2,82 @@ from __future__ import annotations
 
 import typing as t
 
+from ..sources import decompress, source_head, source_text
+from .batch import iter_snippets, parse_batch, parse_stream, split_snippets
+from .body import BodyKind, classify_body, parse_body, register_body_kind
 from .fetch import is_fetch, parse_fetch
+from .har import is_har, iter_har, parse_har
+from .har_index import HarIndex, build_har_index, load_har_index, select_har_entries
 from .powershell import is_powershell, parse_powershell
+from .terminal import read_snippet
 
 if t.TYPE_CHECKING:
     from ..request import Request
+    from ..typings import ResultCache, Source
 
-__all__ = ("parse_input", "parse_fetch", "parse_powershell", "is_fetch", "is_powershell")
+__all__ = (
+    "parse_input",
+    "iter_requests",
+    "parse_batch",
+    "parse_stream",
+    "split_snippets",
+    "iter_snippets",
+    "parse_fetch",
+    "parse_powershell",
+    "parse_har",
+    "iter_har",
+    "HarIndex",
+    "build_har_index",
+    "load_har_index",
+    "select_har_entries",
+    "is_fetch",
+    "is_powershell",
+    "is_har",
+    "read_snippet",
+    "parse_body",
+    "classify_body",
+    "register_body_kind",
+    "BodyKind",
+)
 
 
-def parse_input(text: str) -> Request | None:
+def parse_input(text: Source, lazy: bool = False, cache: ResultCache | None = None) -> Request | None:
+    """
+    Parses a single request.
+    For inputs holding many requests (ex. HAR archives) only the first one is returned.
+
+    `text` may also be bytes, a memoryview, or an mmap. fetch input is then scanned in place.
+    `lazy` returns a `LazyRequest` that only decodes its headers, params, and body when they're used.
+    gzip, bz2, and xz compressed bytes are decompressed first.
+    `cache` (a `Cache` or `Memo`) looks the request up by a hash of the input first (cached requests are fully decoded).
+    """
+    if cache is not None:
+        from ..cache import input_key
+
+        key = input_key(text)
+        found, request = cache.get_request(key)
+        if not found:
+            request = parse_input(text, lazy)
+            cache.put_request(key, request)
+        return request
+
+    text = decompress(text)
     if is_fetch(text):
-        return parse_fetch(text)
-    if is_powershell(text):
-        return parse_powershell(text)
+        return parse_fetch(text, lazy=lazy)
+    head = source_head(text)
+    if is_powershell(head):
+        return parse_powershell(source_text(text), lazy=lazy)
+    if is_har(head):
+        return next(parse_har(source_text(text), lazy=lazy), None)
     return None
+
+
+def iter_requests(text: str, lazy: bool = False, cache: ResultCache | None = None) -> t.Iterator[Request]:
+    """Parses every request in the input (`cache` is used for each snippet, see `parse_input`)"""
+    if is_har(text):
+        yield from parse_har(text, lazy=lazy)
+        return
+    for snippet in split_snippets(text):
+        request = parse_input(snippet, lazy=lazy, cache=cache)
+        if request:
+            yield request
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import os
+import re
+import typing as t
+
+from ..sources import source_text
+
+if t.TYPE_CHECKING:
+    from ..request import Request
+    from ..typings import Source
+
+__all__ = ("split_snippets", "iter_snippets", "parse_batch", "parse_stream")
+
+POWERSHELL_SESSION = "$session = New-Object Microsoft.PowerShell.Commands.WebRequestSession"
+
+# every snippet starts at the beginning of a line
+# (raw newlines can't appear inside fetch strings, and powershell encodes them as `$([char]10)`)
+_SNIPPET_START_PATTERN = (
+    r"^(?:(?P<fetch>fetch\()|(?P<session>" + re.escape(POWERSHELL_SESSION) + r")|(?P<invoke>Invoke-WebRequest\b))"
+)
+_SNIPPET_START = re.compile(_SNIPPET_START_PATTERN, re.MULTILINE)
+_SNIPPET_START_BYTES = re.compile(_SNIPPET_START_PATTERN.encode(), re.MULTILINE)
+_LONGEST_START = len(POWERSHELL_SESSION)
+
+# parsing takes about 0.2ms per KB, so a process pool only pays for its startup and pickling past a few MB
+PARALLEL_MIN_SIZE = 4 * 1024 * 1024
+
+
+def split_snippets(text: str) -> list[str]:
+    """
+    Splits input holding many concatenated snippets
+    (ex. Chrome's "Copy all as fetch" and "Copy all as PowerShell") in one linear scan.
+
+    `Invoke-WebRequest` commands that share one `$session` block each get their own copy of it.
+    """
+    return list(iter_snippets((text,)))
+
+
+def iter_snippets(chunks: t.Iterable[str]) -> t.Iterator[str]:
+    """
+    Like `split_snippets`, for text that arrives a chunk at a time (ex. while it's decompressed).
+    Each snippet is yielded once the next one starts, so only the snippet being read is held in memory.
+    """
+    pending = ""
+    # where the last scan ended, and the last snippet start that was handled
+    scanned = 0
+    handled = -1
+
+    start = -1
+    prefix = ""
+    # most recent `$session` block, and where it starts if no command has followed it yet
+    session = ""
+    session_start = -1
+
+    for chunk in chunks:
+        pending += chunk
+        # rescan a little before where the last scan ended, in case a snippet start was split between chunks
+        for match in _SNIPPET_START.finditer(pending, max(scanned - _LONGEST_START, 0)):
+            kind = match.lastgroup
+            position = match.start()
+            if position <= handled:
+                continue
+            handled = position
+
+            if kind == "invoke" and session_start >= 0:
+                # the command right below a session block belongs to the same snippet
+                session = pending[session_start:position]
+                session_start = -1
+                continue
+
+            if start >= 0:
+                yield prefix + _strip_snippet(pending[start:position])
+
+            start = position
+            prefix = session if kind == "invoke" else ""
+            session_start = position if kind == "session" else -1
+
+        # drop the snippets that were yielded
+        if start > 0:
+            pending = pending[start:]
+            handled -= start
+            if session_start >= 0:
+                session_start -= start
+            start = 0
+        scanned = len(pending)
+
+    if start >= 0:
+        yield prefix + _strip_snippet(pending[start:])
+
+
+def _strip_snippet(snippet: str) -> str:
+    """removes the `;` separators between snippets"""
+    return snippet.rstrip().rstrip(";").rstrip()
+
+
+def is_single_snippet(source: Source) -> bool:
+    """checks if the input holds one snippet starting right at the beginning, without decoding it"""
+    pattern = _SNIPPET_START if isinstance(source, str) else _SNIPPET_START_BYTES
+    kinds: list[str | None] = []
+    for match in pattern.finditer(source):  # type: ignore[arg-type]
+        if not kinds and match.start() != 0:
+            return False
+        kinds.append(match.lastgroup)
+        if len(kinds) > 2:
+            return False
+    return len(kinds) == 1 or kinds == ["session", "invoke"]
+
+
+def parse_batch(text: Source, processes: int | None = None) -> t.Iterator[Request | None]:
+    """
+    Parses every snippet in the input, yielding each one in input order as soon as it's parsed.
+
+    Inputs over `PARALLEL_MIN_SIZE` are parsed across a pool of `processes` worker processes
+    (defaults to the number of CPUs). Smaller ones parse faster than a pool starts, so they're parsed here.
+    Unparsable snippets are yielded as None.
+    """
+    from . import parse_input
+
+    if is_single_snippet(text):
+        # parse in place, without splitting (or decoding) the input
+        yield parse_input(text)
+        return
+
+    if processes == 1 or len(text) < PARALLEL_MIN_SIZE:
+        for snippet in iter_snippets((source_text(text),)):
+            yield parse_input(snippet)
+        return
+
+    snippets = split_snippets(source_text(text))
+    processes = processes or os.cpu_count() or 1
+    # large chunks keep the inter-process overhead low for hundreds of small snippets
+    chunksize = max(1, len(snippets) // (processes * 4))
+
+    # multiprocessing takes a while to import, and most inputs are a single snippet
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        yield from executor.map(parse_input, snippets, chunksize=chunksize)
+
+
+def parse_stream(chunks: t.Iterable[str]) -> t.Iterator[Request | None]:
+    """parses each snippet as soon as it's split off of text that arrives a chunk at a time (see `iter_snippets`)"""
+    from . import parse_input
+
+    for snippet in iter_snippets(chunks):
+        yield parse_input(snippet)
@@ -2,96 +2,247 @@ from __future__ import annotations
 
 import json
 import typing as t
+from dataclasses import dataclass
 
-from requests_toolbelt.multipart import decoder  # type: ignore[import]
-
-from ..commons import fix_escape_chars, parse_url_encoded
+from ..commons import SURROGATE, parse_url_encoded
+from .multipart import CHUNK_SIZE, get_boundary, iter_text_chunks, parse_multipart
 
 if t.TYPE_CHECKING:
-    from ..typings import JSON, Data, Files
+    from ..typings import JSON, ParsedBody
 
 
-def parse_body(body: str | None, content_type: str | None) -> tuple[Data | None, JSON | None, Files | None]:
-    data: Data | None = None
-    json_: JSON | None = None
-    files: Files | None = None
+# how much of a body is looked at when the content type doesn't say what it is
+SNIFF_SIZE = 4096
 
-    if not body:
-        return data, json_, files
-    else:
-        body = fix_escape_chars(body)
+_BINARY_PREFIXES = ("image/", "audio/", "video/", "font/", "application/grpc")
+_BINARY_TYPES = frozenset(
+    (
+        "application/octet-stream",
+        "application/pdf",
+        "application/zip",
+        "application/gzip",
+        "application/x-gzip",
+        "application/msgpack",
+        "application/x-msgpack",
+        "application/cbor",
+    )
+)
 
-    def is_multipart_form_data(body: str) -> bool:
-        return "------WebKitFormBoundary" in body
 
-    def is_urlencoded(body: str) -> bool:
-        if not body or "=" not in body:
-            return False
-        return all(item.count("=") > 0 for item in body.split("&"))
+@dataclass(frozen=True)
+class BodyKind:
+    """
+    A kind of body that can be recognized and decoded.
 
-    def is_json(body: str) -> bool:
-        if not body:
-            return False
-        try:
-            json.loads(body, strict=False)
-        except json.JSONDecodeError:
-            return False
-        else:
-            return True
-
-    if is_multipart_form_data(body) and content_type:
-        data, files = parse_multipart_form_data(body, content_type)
-    elif is_urlencoded(body):
-        data = parse_url_encoded(body)
-    elif is_json(body):
-        json_ = parse_json(body)
-    return data, json_, files
+    `media_types` are trusted first (entries starting with "+" match structured syntax suffixes, ex. "+json").
+    `sniff` gets the first `SNIFF_SIZE` characters of the body and whether the body was longer than that.
+    `decode` returns None if the body turns out not to be of this kind.
+    """
 
+    name: str
+    media_types: tuple[str, ...]
+    sniff: t.Callable[[str, bool], bool]
+    decode: t.Callable[[str, t.Optional[str]], t.Optional[ParsedBody]]
 
-def standardize_newlines(body: str) -> str:
+    def matches(self, media_type: str) -> bool:
+        return any(
+            media_type.endswith(pattern) if pattern.startswith("+") else media_type == pattern
+            for pattern in self.media_types
+        )
+
+
+BODY_KINDS: list[BodyKind] = []
+
+
+def register_body_kind(kind: BodyKind, first: bool = False) -> None:
+    """adds a kind of body; kinds are sniffed in the order they're registered in"""
+    if first:
+        BODY_KINDS.insert(0, kind)
+    else:
+        BODY_KINDS.append(kind)
+
+
+def media_type(content_type: str | None) -> str:
+    """(ex. "application/json; charset=utf-8" -> "application/json")"""
+    if not content_type:
+        return ""
+    return content_type.split(";", maxsplit=1)[0].strip().lower()
+
+
+def classify_body(body: str, content_type: str | None) -> BodyKind | None:
     """
-    standardize newlines to \n
-    (ex. "\r\n" --> "\n")
+    Decides what kind of body this is,
+    trusting the content type first and falling back to sniffing the start of the body.
     """
-    return "\n".join(body.splitlines())
+    trusted = _trusted_kind(content_type)
+    if trusted:
+        return trusted
+    return _sniff_kind(body)
 
 
-def parse_json(body: str) -> JSON | None:
-    return json.loads(body, strict=False)
-
+def parse_body(body: str | bytes | None, content_type: str | None) -> ParsedBody:
+    """
+    Bodies arrive already decoded by the parser of their source language, or as bytes when they weren't decoded.
+    Bodies that aren't recognized are kept as raw bytes if they're binary (ex. protobuf), and dropped otherwise.
+    """
+    if not body:
+        return None, None, None
 
-def parse_multipart_form_data(body: str, content_type: str) -> tuple[Data | None, Files | None]:
-    data: Data = {}
-    files: Files = {}
+    if isinstance(body, str):
+        text = body
+    else:
+        try:
+            text = str(body, "utf-8")
+        except UnicodeDecodeError:
+            return _parse_binary(bytes(body), content_type)
+
+    parsed = _parse_text(text, content_type)
+    if parsed:
+        return parsed
+
+    if isinstance(body, str):
+        if not is_binary(body, content_type):
+            return None, None, None
+        # undecodable bytes were escaped as lone surrogates, which turns them back into the original bytes
+        try:
+            return body.encode("utf-8", "surrogateescape"), None, None
+        except UnicodeEncodeError:
+            # surrogates that didn't come from undecodable bytes (ex. a "\ud800" escape)
+            return None, None, None
+    if is_binary_type(media_type(content_type)):
+        return bytes(body), None, None
+    return None, None, None
+
+
+def _parse_text(body: str, content_type: str | None) -> ParsedBody | None:
+    kind = _trusted_kind(content_type)
+    if kind:
+        parsed = kind.decode(body, content_type)
+        if parsed:
+            return parsed
+
+    # the content type is missing, unknown, or wrong
+    sniffed = _sniff_kind(body)
+    if sniffed and sniffed is not kind:
+        parsed = sniffed.decode(body, content_type)
+        if parsed:
+            return parsed
+
+    return None
+
+
+def _parse_binary(body: bytes, content_type: str | None) -> ParsedBody:
+    """bodies that aren't text are only parsed if they're multipart, straight from their bytes"""
+    boundary = get_boundary(content_type) if media_type(content_type) == "multipart/form-data" else None
+    if boundary:
+        data, files = parse_multipart(_iter_chunks(body), boundary)
+        if data or files:
+            return data, None, files
+    return body, None, None
+
+
+def _iter_chunks(body: bytes, chunk_size: int = CHUNK_SIZE) -> t.Iterator[memoryview]:
+    with memoryview(body) as view:
+        for start in range(0, len(body), chunk_size):
+            yield view[start : start + chunk_size]
+
+
+def is_binary_type(type_: str) -> bool:
+    """(ex. "application/x-protobuf" -> True, "text/plain" -> False)"""
+    if type_.startswith(_BINARY_PREFIXES):
+        return True
+    return type_ in _BINARY_TYPES or "protobuf" in type_
+
+
+def is_binary(body: str, content_type: str | None) -> bool:
+    """checks if a decoded body was (or is meant to be) binary"""
+    if is_binary_type(media_type(content_type)):
+        return True
+    return not body.isascii() and SURROGATE.search(body) is not None
+
+
+def _trusted_kind(content_type: str | None) -> BodyKind | None:
+    type_ = media_type(content_type)
+    if not type_:
+        return None
+    for kind in BODY_KINDS:
+        if kind.matches(type_):
+            return kind
+    return None
+
+
+def _sniff_kind(body: str) -> BodyKind | None:
+    head = body[:SNIFF_SIZE]
+    truncated = len(body) > SNIFF_SIZE
+    for kind in BODY_KINDS:
+        if kind.sniff(head, truncated):
+            return kind
+    return None
+
+
+def sniff_multipart(head: str, truncated: bool) -> bool:
+    # bodies start with the boundary delimiter, followed by the part's headers
+    return head.startswith("--") and "content-disposition:" in head.lower()
+
+
+def sniff_json(head: str, truncated: bool) -> bool:
+    return head.lstrip()[:1] in ("{", "[")
+
+
+def sniff_urlencoded(head: str, truncated: bool) -> bool:
+    if "=" not in head:
+        return False
+    items = head.split("&")
+    if truncated:
+        # the last item may have been cut off before its "="
+        items.pop()
+    return all("=" in item for item in items)
+
+
+def decode_multipart(body: str, content_type: str | None) -> ParsedBody | None:
+    boundary = get_boundary(content_type) if media_type(content_type) == "multipart/form-data" else None
+    if not boundary:
+        # take the boundary from the first line of the body
+        boundary = body[2 : body.find("\n")].rstrip("\r")
+        if not boundary:
+            return None
+    data, files = parse_multipart(iter_text_chunks(body), boundary)
+    if not data and not files:
+        return None
+    return data, None, files
 
-    decoded = decoder.MultipartDecoder(body.encode(), content_type=content_type)
 
-    data = {}
-    files = {}
+def decode_json(body: str, content_type: str | None) -> ParsedBody | None:
+    try:
+        json_ = parse_json(body)
+    except json.JSONDecodeError:
+        return None
+    # scalars can't be passed as json
+    if not isinstance(json_, (dict, list)):
+        return None
+    return None, json_, None
 
-    for part in decoded.parts:
-        disposition = part.headers.get(b"Content-Disposition")  # type: ignore
 
-        if not disposition:
-            continue
+def decode_urlencoded(body: str, content_type: str | None) -> ParsedBody | None:
+    data = parse_url_encoded(body)
+    if not data:
+        return None
+    return data, None, None
 
-        disposition = disposition.decode()
-        disposition = disposition.lstrip("form-data; ")
 
-        values: dict[str, str] = {}
+register_body_kind(BodyKind("multipart", ("multipart/form-data",), sniff_multipart, decode_multipart))
+register_body_kind(BodyKind("json", ("application/json", "text/json", "+json"), sniff_json, decode_json))
+register_body_kind(BodyKind("urlencoded", ("application/x-www-form-urlencoded",), sniff_urlencoded, decode_urlencoded))
 
-        for item in disposition.split("; "):
-            key, value = item.split("=", maxsplit=1)
-            values[key] = value.strip('"')
 
-        name = values.get("name")
-        filename = values.get("filename")
+def standardize_newlines(body: str) -> str:
+    """
+    standardize newlines to \n
+    (ex. "\r\n" --> "\n")
+    """
+    return "\n".join(body.splitlines())
 
-        if not name:
-            continue
-        elif filename:
-            files[name] = (filename, "(binary)")  # type: ignore
-        else:
-            data[name] = part.text
 
-    return data, files
+def parse_json(body: str) -> JSON | None:
+    json_: JSON | None = json.loads(body, strict=False)
+    return json_
@@ -0,0 +1,136 @@
+"""
+Single pass decoders that turn quoted string literals into their final text.
+
+Each decoder scans the literal once, so a body is only copied once no matter how many kinds of escapes it uses.
+"""
+from __future__ import annotations
+
+import json.decoder
+import re
+import sys
+import typing as t
+
+__all__ = ("decode_powershell_string", "decode_js_string")
+
+_POWERSHELL_ESCAPES = {
+    "0": "\0",
+    "a": "\a",
+    "b": "\b",
+    "e": "\x1b",
+    "f": "\f",
+    "n": "\n",
+    "r": "\r",
+    "t": "\t",
+    "v": "\v",
+}
+
+# `x escapes, `u{XXXX} code points, $([char]N) subexpressions, "" escaped quotes
+_POWERSHELL_ESCAPE = re.compile(r'`u\{([0-9a-fA-F]{1,6})\}|`([\s\S])|\$\(\[char\](\d+)\)|""')
+_VERBATIM_ESCAPE = re.compile(r"''")
+
+_JS_ESCAPES = {
+    "0": "\0",
+    "b": "\b",
+    "f": "\f",
+    "n": "\n",
+    "r": "\r",
+    "t": "\t",
+    "v": "\v",
+    # line continuations
+    "\n": "",
+    "\r": "",
+}
+
+# surrogate pairs, \uXXXX, \u{X...}, \xHH, \r\n line continuations and \x escapes
+_JS_ESCAPE = re.compile(
+    r"\\u([dD][89abAB][0-9a-fA-F]{2})\\u([dD][c-fC-F][0-9a-fA-F]{2})"
+    r"|\\u([0-9a-fA-F]{4})|\\u\{([0-9a-fA-F]{1,6})\}|\\x([0-9a-fA-F]{2})|\\\r\n|\\([\s\S])"
+)
+
+
+def decode_powershell_string(text: str, start: int = 0, end: int | None = None, verbatim: bool = False) -> str:
+    """
+    Decodes the contents of a powershell string literal found between `start` and `end`.
+    (ex. '`"hi`"' -> '"hi"')
+    (ex. 'a$([char]13)$([char]10)b' -> 'a\\r\\nb')
+    (ex. 'hi``123' -> 'hi`123')
+
+    `verbatim` decodes a single-quoted string, where only '' is an escape.
+    """
+    if verbatim:
+        return _decode(text, start, end, _VERBATIM_ESCAPE, lambda _: "'")
+    return _decode(text, start, end, _POWERSHELL_ESCAPE, _replace_powershell_escape)
+
+
+def decode_js_string(text: str, start: int = 0, end: int | None = None) -> str:
+    """
+    Decodes the contents of a javascript (or JSON) string literal found between `start` and `end`.
+    (ex. '\\"hi\\"' -> '"hi"')
+    (ex. '\\u00e9' -> 'é')
+    """
+    if end is not None and text[end : end + 1] == '"':
+        # most literals are valid JSON, which the C scanner decodes in place
+        # (JSON escapes are a subset of javascript's, with the same meaning)
+        try:
+            decoded, string_end = json.decoder.scanstring(text, start, False)  # type: ignore[attr-defined]
+        except ValueError:
+            pass
+        else:
+            if string_end == end + 1:
+                return t.cast(str, decoded)
+    return _decode(text, start, end, _JS_ESCAPE, _replace_js_escape)
+
+
+def _decode(
+    text: str, start: int, end: int | None, pattern: re.Pattern[str], replace: t.Callable[[re.Match[str]], str]
+) -> str:
+    if end is None:
+        end = len(text)
+
+    parts: list[str] = []
+    position = start
+    for match in pattern.finditer(text, start, end):
+        parts.append(text[position : match.start()])
+        parts.append(replace(match))
+        position = match.end()
+
+    if not parts:
+        # nothing to decode
+        return text[start:end]
+
+    parts.append(text[position:end])
+    return "".join(parts)
+
+
+def _replace_powershell_escape(match: re.Match[str]) -> str:
+    code_point, escaped, ordinal = match.groups()
+    if code_point:
+        return _chr(int(code_point, 16), match)
+    if escaped:
+        return _POWERSHELL_ESCAPES.get(escaped, escaped)
+    if ordinal:
+        # [char] is a single utf-16 code unit
+        return _chr(int(ordinal), match, limit=0xFFFF)
+    # ""
+    return '"'
+
+
+def _replace_js_escape(match: re.Match[str]) -> str:
+    high, low, code_unit, code_point, byte, escaped = match.groups()
+    if high:
+        return chr(0x10000 + ((int(high, 16) - 0xD800) << 10) + (int(low, 16) - 0xDC00))
+    if code_unit:
+        return chr(int(code_unit, 16))
+    if code_point:
+        return _chr(int(code_point, 16), match)
+    if byte:
+        return chr(int(byte, 16))
+    if escaped is None:
+        # \ followed by \r\n
+        return ""
+    return _JS_ESCAPES.get(escaped, escaped)
+
+
+def _chr(number: int, match: re.Match[str], limit: int = sys.maxunicode) -> str:
+    """escapes of characters that don't exist (ex. `u{FFFFFF}) are kept as the text they are"""
+    return chr(number) if number <= limit else match.group()
@@ -1,24 +1,29 @@
 from __future__ import annotations
 
 import json
+import re
 import typing as t
 
-from ..commons import extract_cookies, parse_url
+from ..commons import parse_url_encoded, split_cookies, split_url
+from ..lazy import LazyRequest
 from ..request import Request
 from .body import parse_body
+from .escapes import decode_js_string
 
 if t.TYPE_CHECKING:
-    from ..typings import JSON, Data, Files
+    from ..typings import JSON, Body, Files, Source
 
 
 __all__ = ("parse_fetch", "is_fetch")
 
 
-def is_fetch(text: str) -> bool:
-    return text.startswith("fetch(")
+def is_fetch(text: Source) -> bool:
+    if isinstance(text, str):
+        return text.startswith("fetch(")
+    return bytes(text[:6]) == b"fetch("
 
 
-def parse_fetch(text: str) -> Request | None:
+def parse_fetch(text: Source, lazy: bool = False) -> Request | None:
     """
     Parses a file that follows this format:
     (with some being optional)
@@ -31,60 +36,263 @@ def parse_fetch(text: str) -> Request | None:
       "method": <METHOD>,
       "mode": <MODE>
     });
+
+    `text` may also be bytes, a memoryview, or an mmap, in which case only the parts that are used get decoded.
+    `lazy` returns a `LazyRequest` that decodes the headers, params, and body when they're first accessed.
     """
+    if lazy and not isinstance(text, (str, bytes)):
+        # the source has to outlive parsing (ex. an mmap that's closed afterwards)
+        text = bytes(text)
+    scanner = _Scanner(text)
+    try:
+        return _parse_fetch(scanner, lazy)
+    finally:
+        if not lazy:
+            scanner.release()
+
+
+def _parse_fetch(scanner: _Scanner, lazy: bool) -> Request | None:
     method: str
     url: str
     headers: dict[str, str]
     cookies: dict[str, str]
-    params: dict[str, str] | None
-    data: Data | None
+    data: Body | None
     json_: JSON | None
     files: Files | None
 
-    signature_split = text.split('"')
-
-    if len(signature_split) < 3:
+    if not scanner.literal("fetch("):
         return None
 
-    if signature_split[0] != "fetch(":
+    url_span = scanner.string()
+    if url_span is None:
         return None
 
-    url, params = parse_url(signature_split[1])
+    url, query = split_url(scanner.decode_string(url_span))
 
-    if not signature_split[2].startswith(","):
+    if not scanner.literal(","):
         # no options specified -- should never be reached
         return None
 
-    left_brace = text.find("{")
-    right_brace = text.rfind("}") + 1
+    options = scanner.options()
+    if options is None:
+        return None
 
-    try:
-        options = json.loads(text[left_brace:right_brace])
-    except json.JSONDecodeError:
+    headers_span = options.get("headers")
+    if not headers_span or headers_span[2] != _OBJECT:
+        return None
+    # arrays are scanned as objects too, but headers are only ever a {...} object
+    if scanner.text((headers_span[0], headers_span[0] + 1, _OBJECT)) != "{":
         return None
 
-    headers = options["headers"]
-    # referer is spelled wrong in the HTTP header
-    # referrer policy is not
-    referrer = options.get("referrer")
-    referrer_policy = options.get("referrerPolicy")
-    if referrer:
-        headers["referer"] = referrer
-    if referrer_policy:
-        headers["referrer-policy"] = referrer_policy
+    method = scanner.value(options.get("method")) or "GET"
 
-    cookies = extract_cookies(headers)
+    if lazy:
+        request = LazyRequest(
+            method=method,
+            url=url,
+            load_headers=lambda: _decode_headers(scanner, options),
+            load_params=lambda: parse_url_encoded(query) or None,
+            # the body is only decoded once, straight from its position in the source
+            load_body=lambda: parse_body(scanner.body(options.get("body")), (request.headers or {}).get("content-type")),
+        )
+        return request
 
-    method = options.get("method", "GET")
-    data, json_, files = parse_body(options.get("body"), headers.get("content-type"))
+    try:
+        headers, cookies = _decode_headers(scanner, options)
+    except json.JSONDecodeError:
+        return None
+
+    # the body is only decoded once, straight from its position in the source
+    data, json_, files = parse_body(scanner.body(options.get("body")), headers.get("content-type"))
 
     return Request(
         method=method,
         url=url,
         headers=headers,
         cookies=cookies,
-        params=params,
+        params=parse_url_encoded(query) or None,
         data=data,
         json=json_,
         files=files,
     )
+
+
+def _decode_headers(scanner: _Scanner, options: dict[str, _Span]) -> tuple[dict[str, str], dict[str, str]]:
+    """:returns: the headers and the cookies taken out of them"""
+    decoded: dict[str, str] = json.loads(scanner.text(options["headers"]))
+    headers, cookies = split_cookies(decoded)
+
+    # referer is spelled wrong in the HTTP header
+    # referrer policy is not
+    referrer = scanner.value(options.get("referrer"))
+    referrer_policy = scanner.value(options.get("referrerPolicy"))
+    if referrer:
+        headers["referer"] = referrer
+    if referrer_policy:
+        headers["referrer-policy"] = referrer_policy
+
+    return headers, cookies
+
+
+# kinds of option values
+_STRING = 0
+_OBJECT = 1
+_OTHER = 2
+
+# (start, end, kind) -- strings exclude their quotes
+_Span = t.Tuple[int, int, int]
+
+
+class _Patterns(t.NamedTuple):
+    whitespace: re.Pattern[t.Any]
+    string: re.Pattern[t.Any]
+    structural: re.Pattern[t.Any]
+    literal: re.Pattern[t.Any]
+
+
+def _compile(encode: t.Callable[[str], t.Any]) -> _Patterns:
+    return _Patterns(
+        whitespace=re.compile(encode(r"\s*")),
+        string=re.compile(encode(r'"[^"\\]*(?:\\[\s\S][^"\\]*)*"')),
+        structural=re.compile(encode(r'[{}\[\]"]')),
+        literal=re.compile(encode(r"[\w.+-]+")),
+    )
+
+
+_TEXT_PATTERNS = _compile(str)
+_BYTES_PATTERNS = _compile(str.encode)
+
+
+class _Scanner:
+    """A cursor over the source that finds tokens by position without copying the text around them"""
+
+    def __init__(self, source: Source) -> None:
+        self.source: str | memoryview
+        self.patterns: _Patterns
+        self.encode: t.Callable[[str], t.Any]
+        if isinstance(source, str):
+            self.source = source
+            self.patterns = _TEXT_PATTERNS
+            self.encode = str
+        else:
+            # regular expressions and str() both work on the view directly
+            self.source = memoryview(source)
+            self.patterns = _BYTES_PATTERNS
+            self.encode = str.encode
+        self.position = 0
+
+    def release(self) -> None:
+        # lets the caller close an mmap once parsing is done
+        if isinstance(self.source, memoryview):
+            self.source.release()
+
+    def text(self, span: _Span) -> str:
+        start, end, _ = span
+        if isinstance(self.source, str):
+            return self.source[start:end]
+        return str(self.source[start:end], "utf-8", "replace")
+
+    def decode_string(self, span: _Span) -> str:
+        start, end, _ = span
+        if isinstance(self.source, str):
+            return decode_js_string(self.source, start, end)
+        # keep the closing quote so the literal can be decoded in place
+        literal = str(self.source[start : end + 1], "utf-8", "replace")
+        return decode_js_string(literal, 0, len(literal) - 1)
+
+    def body(self, span: _Span | None) -> str | bytes | None:
+        """
+        like `value`, except a body without escapes is taken from a binary source as bytes, without decoding it.
+        otherwise undecodable bytes are kept as lone surrogates (see `parse_body`)
+        """
+        if span is None or span[2] != _STRING:
+            return None
+        start, end, _ = span
+        if isinstance(self.source, str):
+            return decode_js_string(self.source, start, end)
+        raw = bytes(self.source[start:end])
+        if b"\\" not in raw:
+            return raw
+        literal = raw.decode("utf-8", "surrogateescape") + '"'
+        return decode_js_string(literal, 0, len(literal) - 1)
+
+    def value(self, span: _Span | None) -> str | None:
+        """decodes a string option (null and other literals are None)"""
+        if span is None or span[2] != _STRING:
+            return None
+        return self.decode_string(span)
+
+    def skip_whitespace(self) -> None:
+        match = self.patterns.whitespace.match(self.source, self.position)
+        assert match is not None
+        self.position = match.end()
+
+    def literal(self, literal: str) -> bool:
+        self.skip_whitespace()
+        end = self.position + len(literal)
+        if self.source[self.position : end] != self.encode(literal):
+            return False
+        self.position = end
+        return True
+
+    def string(self) -> _Span | None:
+        self.skip_whitespace()
+        match = self.patterns.string.match(self.source, self.position)
+        if match is None:
+            return None
+        self.position = match.end()
+        return match.start() + 1, match.end() - 1, _STRING
+
+    def skip_nested(self) -> _Span | None:
+        """skips over an object or array, including any strings inside of it"""
+        start = self.position
+        depth = 0
+        while True:
+            match = self.patterns.structural.search(self.source, self.position)
+            if match is None:
+                return None
+            char = self.source[match.start() : match.end()]
+            if char == self.encode('"'):
+                self.position = match.start()
+                if self.string() is None:
+                    return None
+                continue
+            self.position = match.end()
+            depth += 1 if char in (self.encode("{"), self.encode("[")) else -1
+            if depth == 0:
+                return start, self.position, _OBJECT
+
+    def options(self) -> dict[str, _Span] | None:
+        """finds where the value of each key in the options object sits"""
+        if not self.literal("{"):
+            return None
+
+        options: dict[str, _Span] = {}
+        while True:
+            if self.literal("}"):
+                return options
+
+            key_span = self.string()
+            if key_span is None or not self.literal(":"):
+                return None
+
+            self.skip_whitespace()
+            head = self.source[self.position : self.position + 1]
+            value_span: _Span | None
+            if head == self.encode('"'):
+                value_span = self.string()
+            elif head in (self.encode("{"), self.encode("[")):
+                value_span = self.skip_nested()
+            else:
+                match = self.patterns.literal.match(self.source, self.position)
+                value_span = None
+                if match is not None:
+                    self.position = match.end()
+                    value_span = match.start(), match.end(), _OTHER
+
+            if value_span is None:
+                return None
+
+            options[self.text(key_span)] = value_span
+            # trailing commas are allowed in javascript
+            self.literal(",")
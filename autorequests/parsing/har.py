@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import io
+import json
+import re
+import typing as t
+
+from ..commons import parse_url_encoded, split_cookies, split_url
+from ..lazy import LazyRequest
+from ..request import Request
+from .body import parse_body
+
+if t.TYPE_CHECKING:
+    from ..typings import Data, Files, ParsedBody
+
+__all__ = ("parse_har", "iter_har", "iter_har_entry_spans", "decode_har_entry", "parse_har_entry", "is_har")
+
+# how many bytes are read from the archive at a time
+CHUNK_SIZE = 1 << 16
+
+_STRUCTURAL = re.compile(rb'[{}\[\]"]')
+_QUOTE = ord('"')
+_BACKSLASH = ord("\\")
+_OPEN_BRACE = ord("{")
+_CLOSE_BRACE = ord("}")
+_OPEN_BRACKET = ord("[")
+_CLOSE_BRACKET = ord("]")
+
+# depth of the `log` object, the `entries` array, and each entry
+_LOG_DEPTH = 2
+_ENTRIES_DEPTH = 3
+_ENTRY_DEPTH = 4
+
+
+def is_har(text: str) -> bool:
+    """HAR archives are JSON documents with a top level `log` object"""
+    head = text[:1024].lstrip()
+    return head.startswith("{") and '"log"' in head
+
+
+def parse_har(text: str, lazy: bool = False) -> t.Iterator[Request]:
+    """
+    Parses every entry of an HTTP Archive (HAR) document.
+
+    Requests are yielded one at a time. Use `iter_har` with a binary file object to
+    avoid reading the whole archive into memory.
+    """
+    # lone surrogates stand in for bytes that weren't utf-8 (see `source_text`)
+    return iter_har(io.BytesIO(text.encode("utf-8", "surrogateescape")), lazy=lazy)
+
+
+def iter_har(fp: t.BinaryIO, chunk_size: int = CHUNK_SIZE, lazy: bool = False) -> t.Iterator[Request]:
+    """
+    Streams `log.entries` out of a HAR file object.
+
+    Only one entry is held in memory at a time, so memory usage stays flat no matter how large the archive is.
+    Malformed entries are skipped.
+    """
+    for _, raw in iter_har_entry_spans(fp, chunk_size):
+        entry = decode_har_entry(raw)
+        if entry is not None:
+            yield parse_har_entry(entry, lazy=lazy)
+
+
+def iter_har_entry_spans(fp: t.BinaryIO, chunk_size: int = CHUNK_SIZE) -> t.Iterator[tuple[int, bytes]]:
+    """
+    Scans a HAR file object and yields the byte offset and raw bytes of each entry in `log.entries`.
+
+    The scanner only looks at structural characters (braces, brackets, and quotes),
+    so it runs in a single pass without decoding anything outside the entries.
+    """
+    buf = bytearray()
+    base = 0  # file offset of buf[0]
+    pos = 0  # where scanning resumes in buf
+    eof = False
+
+    depth = 0
+    key = b""  # last string seen directly inside the `log` object
+    in_entries = False
+    entry_start = -1  # file offset of the current entry, if inside one
+    string_start = -1  # buf offset of the opening quote, if inside a string
+
+    while True:
+        if string_start >= 0:
+            end = buf.find(b'"', pos)
+            if end == -1:
+                pos = len(buf)
+            else:
+                # the quote is escaped if it's preceded by an odd number of backslashes
+                backslashes = 0
+                while buf[end - 1 - backslashes] == _BACKSLASH:
+                    backslashes += 1
+                if backslashes % 2:
+                    pos = end + 1
+                    continue
+                if depth == _LOG_DEPTH:
+                    key = bytes(buf[string_start + 1 : end])
+                string_start = -1
+                pos = end + 1
+                continue
+        else:
+            match = _STRUCTURAL.search(buf, pos)
+            if match is None:
+                pos = len(buf)
+            else:
+                index = match.start()
+                char = buf[index]
+                pos = index + 1
+
+                if char == _QUOTE:
+                    string_start = index
+                elif char == _OPEN_BRACE or char == _OPEN_BRACKET:
+                    depth += 1
+                    if char == _OPEN_BRACKET and depth == _ENTRIES_DEPTH and key == b"entries":
+                        in_entries = True
+                    elif char == _OPEN_BRACE and in_entries and depth == _ENTRY_DEPTH:
+                        entry_start = base + index
+                else:
+                    if char == _CLOSE_BRACE and in_entries and depth == _ENTRY_DEPTH:
+                        yield entry_start, bytes(buf[entry_start - base : pos])
+                        entry_start = -1
+                    elif char == _CLOSE_BRACKET and in_entries and depth == _ENTRIES_DEPTH:
+                        return
+                    depth -= 1
+                continue
+
+        # everything in the buffer has been scanned
+        if eof:
+            return
+
+        # drop whatever is no longer needed
+        keep = len(buf)
+        if entry_start >= 0:
+            keep = entry_start - base
+        elif string_start >= 0:
+            keep = string_start
+        if keep:
+            del buf[:keep]
+            base += keep
+            pos -= keep
+            if string_start >= 0:
+                string_start -= keep
+
+        chunk = fp.read(chunk_size)
+        if not chunk:
+            eof = True
+        buf += chunk
+
+
+def decode_har_entry(raw: bytes) -> dict[str, t.Any] | None:
+    """
+    Decodes the raw bytes of an entry (bytes that aren't utf-8 are kept as lone surrogates, like `source_text`)
+    :returns: None if the entry isn't valid JSON, or doesn't hold a request with a url
+    """
+    try:
+        entry = json.loads(raw.decode("utf-8", "surrogateescape"))
+    except ValueError:
+        return None
+    request = entry.get("request") if isinstance(entry, dict) else None
+    if not isinstance(request, dict) or not isinstance(request.get("url"), str):
+        return None
+    return t.cast("dict[str, t.Any]", entry)
+
+
+def parse_har_entry(entry: dict[str, t.Any], lazy: bool = False) -> Request:
+    """
+    Converts a single decoded HAR entry into a `Request`
+    `lazy` returns a `LazyRequest` that builds the headers, params, and body when they're first accessed.
+    """
+    request = entry["request"]
+
+    url, query = split_url(request["url"])
+    method = request.get("method", "GET")
+
+    if lazy:
+        return LazyRequest(
+            method=method,
+            url=url,
+            load_headers=lambda: _har_headers(request),
+            load_params=lambda: parse_url_encoded(query) or None,
+            load_body=lambda: _har_body(request),
+        )
+
+    headers, cookies = _har_headers(request)
+    data, json_, files = _har_body(request)
+
+    return Request(
+        method=method,
+        url=url,
+        headers=headers,
+        cookies=cookies,
+        params=parse_url_encoded(query) or None,
+        data=data,
+        json=json_,
+        files=files,
+    )
+
+
+def _har_headers(request: dict[str, t.Any]) -> tuple[dict[str, str], dict[str, str]]:
+    captured: dict[str, str] = {}
+    for header in request.get("headers", ()):
+        name: str = header["name"]
+        # skip HTTP/2 pseudo headers (ex. ":authority")
+        if name.startswith(":"):
+            continue
+        # HTTP/1 captures use "Cookie"
+        if name.lower() == "cookie":
+            name = "cookie"
+            # HTTP/2 captures may split cookies across many headers
+            if name in captured:
+                captured[name] += "; " + header["value"]
+                continue
+        captured[name] = header["value"]
+
+    headers, cookies = split_cookies(captured)
+    if not cookies:
+        cookies = {cookie["name"]: cookie["value"] for cookie in request.get("cookies", ())}
+    return headers, cookies
+
+
+def _har_body(request: dict[str, t.Any]) -> ParsedBody:
+    post_data = request.get("postData") or {}
+    text = post_data.get("text")
+    if text and post_data.get("encoding") == "base64":
+        # binary bodies are captured base64 encoded
+        try:
+            return parse_body(base64.b64decode("".join(text.split()), validate=True), post_data.get("mimeType"))
+        except binascii.Error:
+            # a malformed capture, so the body is parsed as the text it is
+            pass
+    if text is None and post_data.get("params"):
+        # the body may be captured as its form fields instead (ex. by Firefox)
+        return _har_params(post_data["params"])
+    return parse_body(text, post_data.get("mimeType"))
+
+
+def _har_params(params: list[dict[str, t.Any]]) -> ParsedBody:
+    """(ex. `[{"name": "a", "value": "1"}, {"name": "f", "fileName": "a.txt"}]` -> {"a": "1"}, {"f": ("a.txt", b"")})"""
+    data: Data = {}
+    files: Files = {}
+    for param in params:
+        name: str = param["name"]
+        value: str = param.get("value", "")
+        if "fileName" not in param:
+            data[name] = value
+        elif param.get("contentType"):
+            files[name] = (param["fileName"], value.encode("utf-8", "surrogateescape"), param["contentType"])
+        else:
+            files[name] = (param["fileName"], value.encode("utf-8", "surrogateescape"))
+    return data if data or files else None, None, files or None
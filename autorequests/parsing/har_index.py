@@ -0,0 +1,181 @@
+"""Random access into large HAR archives through a sidecar index of entry byte offsets"""
+from __future__ import annotations
+
+import fnmatch
+import json
+import os
+import typing as t
+import urllib.parse
+from dataclasses import dataclass, field
+
+from .har import decode_har_entry, iter_har_entry_spans, parse_har_entry
+
+if t.TYPE_CHECKING:
+    from ..request import Request
+
+__all__ = (
+    "HarIndex",
+    "HarIndexEntry",
+    "build_har_index",
+    "load_har_index",
+    "index_path",
+    "select_har_entries",
+    "url_matches",
+)
+
+INDEX_VERSION = 1
+INDEX_SUFFIX = ".idx"
+
+
+@dataclass
+class HarIndexEntry:
+    offset: int
+    length: int
+    method: str
+    url: str
+    host: str
+
+
+@dataclass
+class HarIndex:
+    path: str
+    size: int
+    mtime_ns: int
+    entries: list[HarIndexEntry] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def is_valid(self) -> bool:
+        """the index is stale once the archive's size or modification time changes"""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return False
+        return stat.st_size == self.size and stat.st_mtime_ns == self.mtime_ns
+
+    def find(self, url: str | None = None, host: str | None = None, method: str | None = None) -> list[int]:
+        """
+        :returns: the position of every entry matching all the given filters
+        (`url` may contain shell-style wildcards, ex. "https://httpbin.org/*")
+        """
+        matches: list[int] = []
+        for n, entry in enumerate(self.entries):
+            if method and entry.method.upper() != method.upper():
+                continue
+            if host and entry.host != host:
+                continue
+            if url and not url_matches(entry.url, url):
+                continue
+            matches.append(n)
+        return matches
+
+    def read_entry(self, n: int) -> Request | None:
+        """seeks straight to entry `n` and parses only its bytes (:returns: None if the entry is malformed)"""
+        return next(self.read_entries([n]), None)
+
+    def read_entries(self, positions: t.Iterable[int]) -> t.Iterator[Request]:
+        """:raises IndexError: for a position that isn't in the archive"""
+        with open(self.path, "rb") as fp:
+            for n in positions:
+                if not 0 <= n < len(self.entries):
+                    raise IndexError(f"entry {n} is out of range (the archive has {len(self.entries)} entries)")
+                fp.seek(self.entries[n].offset)
+                entry = decode_har_entry(fp.read(self.entries[n].length))
+                # malformed entries are skipped
+                if entry is not None:
+                    yield parse_har_entry(entry)
+
+    def save(self, path: str | None = None) -> None:
+        data = {
+            "version": INDEX_VERSION,
+            "size": self.size,
+            "mtime_ns": self.mtime_ns,
+            "entries": [[e.offset, e.length, e.method, e.url, e.host] for e in self.entries],
+        }
+        with open(path or index_path(self.path), "w", encoding="utf-8") as fp:
+            json.dump(data, fp, separators=(",", ":"))
+
+    @classmethod
+    def load(cls, har_path: str, path: str | None = None) -> HarIndex | None:
+        """:returns: the saved index for `har_path`, or None if it is missing or stale"""
+        try:
+            with open(path or index_path(har_path), encoding="utf-8") as fp:
+                data = json.load(fp)
+        except (OSError, ValueError):
+            return None
+
+        if not isinstance(data, dict) or data.get("version") != INDEX_VERSION:
+            return None
+
+        index = cls(
+            path=har_path,
+            size=data["size"],
+            mtime_ns=data["mtime_ns"],
+            entries=[HarIndexEntry(*entry) for entry in data["entries"]],
+        )
+        return index if index.is_valid() else None
+
+
+def url_matches(url: str, pattern: str) -> bool:
+    """(ex. "https://httpbin.org/get", "https://httpbin.org/*" --> True)"""
+    return url == pattern or fnmatch.fnmatchcase(url, pattern)
+
+
+def select_har_entries(fp: t.BinaryIO, positions: t.Iterable[int] = (), url: str | None = None) -> t.Iterator[Request]:
+    """
+    Streams the entries at the given positions and/or matching the url pattern, in archive order.
+    For archives that can't be indexed (ex. compressed ones), since it scans the whole archive every time.
+    """
+    selected = set(positions)
+    for n, (_, raw) in enumerate(iter_har_entry_spans(fp)):
+        if selected and n not in selected:
+            continue
+        entry = decode_har_entry(raw)
+        if entry is None or (url and not url_matches(entry["request"]["url"], url)):
+            continue
+        yield parse_har_entry(entry)
+
+
+def index_path(har_path: str) -> str:
+    return har_path + INDEX_SUFFIX
+
+
+def build_har_index(har_path: str) -> HarIndex:
+    """scans the archive once and records where each entry starts and ends"""
+    with open(har_path, "rb") as fp:
+        stat = os.fstat(fp.fileno())
+        index = HarIndex(path=har_path, size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+
+        for offset, raw in iter_har_entry_spans(fp):
+            entry = decode_har_entry(raw)
+            # malformed entries keep their position, but never match a filter
+            request: dict[str, t.Any] = entry["request"] if entry is not None else {"url": "", "method": ""}
+            url: str = request["url"]
+            index.entries.append(
+                HarIndexEntry(
+                    offset=offset,
+                    length=len(raw),
+                    method=request.get("method", "GET"),
+                    url=url,
+                    host=urllib.parse.urlsplit(url).hostname or "",
+                )
+            )
+
+    return index
+
+
+def load_har_index(har_path: str, save: bool = True) -> HarIndex:
+    """
+    :returns: the saved index if it's still valid, otherwise a freshly built (and saved) one
+    (an index that can't be saved, ex. next to an archive in a read-only directory, is still returned)
+    """
+    index = HarIndex.load(har_path)
+    if index is None:
+        index = build_har_index(har_path)
+        if save:
+            try:
+                index.save()
+            except OSError:
+                pass
+    return index
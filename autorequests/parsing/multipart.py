@@ -0,0 +1,222 @@
+"""Streaming multipart/form-data parser that keeps text fields and small files, and only records metadata for the rest"""
+from __future__ import annotations
+
+import hashlib
+import re
+import typing as t
+from dataclasses import dataclass
+
+if t.TYPE_CHECKING:
+    from ..typings import Data, Files
+
+__all__ = ("FilePart", "parse_multipart", "parse_multipart_form_data", "get_boundary", "iter_text_chunks")
+
+CHUNK_SIZE = 1 << 16
+# a part's headers are never expected to be anywhere near this large
+MAX_HEADERS_SIZE = 1 << 16
+# files up to this size are kept, as bytes, so they can be sent as they were
+MAX_KEPT_FILE_SIZE = 1 << 16
+
+_PARAMETER = re.compile(r';\s*([\w*-]+)\s*=\s*("(?:[^"\\]|\\.)*"|[^;]*)')
+
+
+@dataclass(frozen=True)
+class FilePart:
+    """A file that was uploaded. Only its metadata is kept, never its contents."""
+
+    filename: str
+    content_type: str | None
+    size: int
+    sha256: str
+
+    def to_literal(self) -> tuple[str, bytes] | tuple[str, bytes, str]:
+        """the `(filename, content, content_type)` tuple libraries accept, with placeholder content"""
+        if self.content_type:
+            return self.filename, b"(binary)", self.content_type
+        return self.filename, b"(binary)"
+
+
+def get_boundary(content_type: str | None) -> str | None:
+    """(ex. "multipart/form-data; boundary=----WebKitFormBoundary123" -> "----WebKitFormBoundary123")"""
+    if not content_type:
+        return None
+    parameters = _parse_parameters(content_type)
+    return parameters.get("boundary") or None
+
+
+def iter_text_chunks(text: str, chunk_size: int = CHUNK_SIZE) -> t.Iterator[bytes]:
+    """encodes a decoded body a slice at a time"""
+    for start in range(0, len(text), chunk_size):
+        yield text[start : start + chunk_size].encode("utf-8", "surrogateescape")
+
+
+def parse_multipart_form_data(body: str, content_type: str) -> tuple[Data | None, Files | None]:
+    boundary = get_boundary(content_type)
+    if not boundary:
+        return None, None
+    return parse_multipart(iter_text_chunks(body), boundary)
+
+
+def parse_multipart(
+    chunks: t.Iterable[bytes | memoryview], boundary: str, keep_files: int = MAX_KEPT_FILE_SIZE
+) -> tuple[Data, Files]:
+    """
+    Parses a multipart/form-data body fed in as chunks of bytes.
+
+    Text fields are kept. Files up to `keep_files` bytes are kept as `(filename, content, content_type)` tuples.
+    For larger files only the filename, content type, size, and a hash are recorded,
+    so memory usage doesn't depend on the size of the uploads.
+    """
+    data: Data = {}
+    files: Files = {}
+
+    # parts are separated by CRLF--boundary, but be lenient about bare LFs
+    delimiter = b"\n--" + boundary.encode("latin-1")
+    buffer = bytearray(b"\n")  # lets the first boundary match the delimiter too
+    chunks = iter(chunks)
+    eof = False
+
+    def fill() -> bool:
+        nonlocal eof
+        if eof:
+            return False
+        chunk = next(chunks, None)
+        if chunk is None:
+            eof = True
+            return False
+        buffer.extend(chunk)
+        return True
+
+    # skip the preamble
+    while True:
+        index = buffer.find(delimiter)
+        if index != -1:
+            del buffer[: index + len(delimiter)]
+            break
+        # keep enough to match a delimiter split across chunks
+        del buffer[: max(0, len(buffer) - len(delimiter))]
+        if not fill():
+            return data, files
+
+    while True:
+        # after a delimiter comes either "--" (the end) or the end of the line
+        while len(buffer) < 2 and fill():
+            pass
+        if buffer.startswith(b"--"):
+            return data, files
+        line_end = buffer.find(b"\n")
+        while line_end == -1 and fill():
+            line_end = buffer.find(b"\n")
+        if line_end == -1:
+            return data, files
+        del buffer[: line_end + 1]
+
+        # part headers end at the first blank line
+        headers_end, separator_size = _find_blank_line(buffer)
+        while headers_end == -1 and len(buffer) < MAX_HEADERS_SIZE and fill():
+            headers_end, separator_size = _find_blank_line(buffer)
+        if headers_end == -1:
+            return data, files
+        headers = _parse_headers(bytes(buffer[:headers_end]).decode("utf-8", "replace"))
+        del buffer[: headers_end + separator_size]
+
+        disposition = _parse_parameters(headers.get("content-disposition", ""))
+        name = disposition.get("name")
+        filename = disposition.get("filename")
+
+        # stream the part's content until the next delimiter
+        # a field's text, or a file's content until it's too large to keep
+        text = bytearray()
+        digest = hashlib.sha256()
+        size = 0
+        is_file = filename is not None
+        while True:
+            index = buffer.find(delimiter)
+            if index != -1:
+                content = buffer[:index]
+                if content.endswith(b"\r"):
+                    content = content[:-1]
+                del buffer[: index + len(delimiter)]
+            else:
+                # hold back enough to match a delimiter (and the CR before it) split across chunks
+                keep = len(delimiter) + 1
+                content = buffer[: max(0, len(buffer) - keep)]
+                del buffer[: len(content)]
+
+            if is_file:
+                digest.update(content)
+                size += len(content)
+                if size <= keep_files:
+                    text += content
+                elif text:
+                    text.clear()
+            else:
+                text += content
+
+            if index != -1:
+                break
+            if not fill():
+                # truncated body -- keep what there is
+                if is_file:
+                    digest.update(buffer)
+                    size += len(buffer)
+                    if size <= keep_files:
+                        text += buffer
+                else:
+                    text += buffer
+                buffer.clear()
+                break
+
+        if not name:
+            pass
+        elif is_file and size <= keep_files:
+            content_type = headers.get("content-type")
+            files[name] = (
+                (t.cast(str, filename), bytes(text), content_type)
+                if content_type
+                else (t.cast(str, filename), bytes(text))
+            )
+        elif is_file:
+            files[name] = FilePart(
+                filename=t.cast(str, filename),
+                content_type=headers.get("content-type"),
+                size=size,
+                sha256=digest.hexdigest(),
+            )
+        else:
+            data[name] = text.decode("utf-8", "replace")
+
+        if eof and not buffer:
+            return data, files
+
+
+def _find_blank_line(buffer: bytearray) -> tuple[int, int]:
+    """:returns: where the first blank line starts and how long the line break is"""
+    crlf = buffer.find(b"\r\n\r\n")
+    lf = buffer.find(b"\n\n")
+    if lf != -1 and (crlf == -1 or lf < crlf):
+        return lf, 2
+    if crlf != -1:
+        return crlf, 4
+    return -1, 0
+
+
+def _parse_headers(block: str) -> dict[str, str]:
+    headers: dict[str, str] = {}
+    for line in block.splitlines():
+        name, _, value = line.partition(":")
+        if value:
+            headers[name.strip().lower()] = value.strip()
+    return headers
+
+
+def _parse_parameters(value: str) -> dict[str, str]:
+    """(ex. 'form-data; name="a"; filename="b.png"' -> {"name": "a", "filename": "b.png"})"""
+    parameters: dict[str, str] = {}
+    for match in _PARAMETER.finditer(value):
+        key, parameter = match.groups()
+        parameter = parameter.strip()
+        if parameter.startswith('"') and parameter.endswith('"') and len(parameter) >= 2:
+            parameter = re.sub(r"\\(.)", r"\1", parameter[1:-1])
+        parameters[key.lower()] = parameter
+    return parameters
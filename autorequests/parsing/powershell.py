@@ -2,14 +2,15 @@ from __future__ import annotations
 
 import re
 import typing as t
-from collections import defaultdict
 
-from ..commons import fix_escape_chars, parse_url
+from ..commons import parse_url_encoded, split_url
+from ..lazy import LazyRequest
 from ..request import Request
 from .body import parse_body
+from .escapes import decode_powershell_string
 
 if t.TYPE_CHECKING:
-    from ..typings import JSON, Data, Files
+    from ..typings import ParsedBody
 
 
 __all__ = ("parse_powershell", "is_powershell")
@@ -19,7 +20,7 @@ def is_powershell(text: str) -> bool:
     return text.startswith("$session = New-Object Microsoft.PowerShell.Commands.WebRequestSession")
 
 
-def parse_powershell(text: str) -> Request | None:
+def parse_powershell(text: str, lazy: bool = False) -> Request | None:
     """
     Parses a file that follows this format:
     (with some parts being optional)
@@ -32,153 +33,355 @@ def parse_powershell(text: str) -> Request | None:
     -Headers <HEADERS> `
     -ContentType <CONTENT-TYPE> `
     -Body <BODY>
+
+    `lazy` returns a `LazyRequest` that decodes the params and body when they're first accessed.
+    (headers are always decoded, since they may hold the method)
     """
     method: str
     url: str
     headers: dict[str, str] = {}
     cookies: dict[str, str] = {}
-    params: dict[str, str] | None
-    data: Data | None = None
-    json_: JSON | None = None
-    files: Files | None = None
-
-    text = parse_escape_chars(text)
-    lines: list[str] = [e.rstrip("\\") for e in text.splitlines()]
 
     # parse custom session
-    parse_session(lines, headers, cookies)
+    command_start = parse_session(text, headers, cookies)
 
     # parse arguments
-    args = parse_args("".join(lines))
+    args = tokenize_args(text, command_start)
 
-    if not args or ("Uri" not in args) or ("WebSession" not in args) or ("Headers" not in args):
+    if ("Uri" not in args) or ("WebSession" not in args) or ("Headers" not in args):
         return None
-    if not args["Headers"].startswith("@{") or not args["Headers"].endswith("}"):
+    if args["Headers"].kind != HASHTABLE:
         return None
 
-    url, params = parse_url(args["Uri"])
-    body = args.get("Body")
+    url, query = split_url(decode_arg(text, args["Uri"]))
 
-    if body:
-        body = fix_escape_chars(body)
-        body = pre_parse_body(body)
-        data, json_, files = parse_body(body, args.get("ContentType"))
+    parse_headers(text, args["Headers"], headers)
+    method = headers.pop("method", decode_arg(text, args["Method"]) if "Method" in args else "GET")
 
-    parse_headers(args, headers)
-    method = headers.pop("method", args.get("Method", "GET"))
+    if lazy:
+        return LazyRequest(
+            method=method,
+            url=url,
+            load_headers=lambda: (headers, cookies),
+            load_params=lambda: parse_url_encoded(query) or None,
+            load_body=lambda: parse_args_body(text, args),
+        )
+
+    data, json_, files = parse_args_body(text, args)
 
     return Request(
         method=method,
         url=url,
         headers=headers,
         cookies=cookies,
-        params=params,
+        params=parse_url_encoded(query) or None,
         data=data,
         json=json_,
         files=files,
     )
 
 
-def parse_session(lines: list[str], headers: dict[str, str], cookies: dict[str, str]) -> None:
-    while lines and lines[0].startswith("$session"):
-        line = lines.pop(0)
-        if line.startswith("$session.UserAgent"):
+def parse_args_body(text: str, args: dict[str, Span]) -> ParsedBody:
+    """decodes and parses the value of `-Body`, if there is one"""
+    body = args.get("Body")
+    if not body:
+        return None, None, None
+    decoded = decode_body(text, body)
+    if decoded is None:
+        return None, None, None
+    content_type = args.get("ContentType")
+    return parse_body(decoded, decode_arg(text, content_type) if content_type else None)
+
+
+def parse_session(text: str, headers: dict[str, str], cookies: dict[str, str]) -> int:
+    """
+    Parses the `$session` lines at the top of the text.
+    :returns: the position where the lines after the session begin
+    """
+    position = 0
+    while text.startswith("$session", position):
+        line_end = text.find("\n", position)
+        if line_end == -1:
+            line_end = len(text)
+        line_start = position
+        position = line_end + 1
+
+        if text.startswith("$session.UserAgent", line_start):
             # $session.UserAgent = "Mozilla/5.0 (Macintosh; U; Intel Mac OS X; en) AppleWebKit (KHTML, like Gecko)"
-            headers["user-agent"] = line.split('"')[1]
-        elif line.startswith("$session.Cookies.Add"):
+            strings = _line_strings(text, line_start, line_end)
+            if strings:
+                headers["user-agent"] = strings[0]
+        elif text.startswith("$session.Cookies.Add", line_start):
             # $session.Cookies.Add((New-Object System.Net.Cookie("hello-from", "autorequests", "/", "httpbin.org")))
             # System.Net.Cookie("hello-from", "autorequests", "/", "httpbin.org")
             #                       Name         Value       Path     Domain
             # reference: https://docs.microsoft.com/en-us/dotnet/api/system.net.cookie?view=net-5.0#constructors
             # path and domain will be ignored because that logic is handled elsewhere
-            left_paren = line.rfind("(")
-            right_paren = line.find(")")
             # ["hello-from", "autorequests", "/", "httpbin.org"]
-            strings = [x.strip('"') for x in line[left_paren + 1 : right_paren].split(", ")]
-            name, value = strings[:2]
-            cookies[name] = value
-
+            strings = _line_strings(text, line_start, line_end)
+            if len(strings) >= 2:
+                name, value = strings[:2]
+                cookies[name] = value
+    return min(position, len(text))
+
+
+def _line_strings(text: str, position: int, line_end: int) -> list[str]:
+    """decodes every double-quoted string between `position` and `line_end`"""
+    strings: list[str] = []
+    while True:
+        position = text.find('"', position, line_end)
+        if position == -1:
+            return strings
+        end = find_string_end(text, position)
+        strings.append(decode_powershell_string(text, position + 1, end))
+        position = end + 1
+
+
+class Span(t.NamedTuple):
+    """
+    Where an argument's value sits in the text.
+    For quoted strings the span excludes the quotes.
+    """
 
-def parse_args(text: str) -> dict[str, str]:
-    args: dict[str, str] = defaultdict(str)
-    text_split: list[str] = text.split()
+    start: int
+    end: int
+    kind: str
+
+
+# kinds of argument values
+SWITCH = "switch"  # -UseBasicParsing
+STRING = "string"  # "expandable string"
+VERBATIM = "verbatim"  # 'verbatim string'
+HASHTABLE = "hashtable"  # @{ ... }
+EXPRESSION = "expression"  # ( ... )
+BARE = "bare"  # $session
+
+_WHITESPACE = " \t\r\n"
+_PARAMETER = re.compile(r"-([A-Za-z]+)")
+_BARE_WORD_END = re.compile(r"\s")
+# `x is an escaped character and "" is an escaped quote (backslashes are literal, ex. "C:\")
+_DOUBLE_QUOTED = re.compile(r'"[^"`]*(?:(?:`[\s\S]|"")[^"`]*)*"')
+_NESTED_SPECIAL = re.compile(r"[(){}\"'`]")
+_QUOTE = re.compile(r"[\"']")
+_BYTE_ARRAY = re.compile(r"\(\s*\[byte\[\]\]\s*@?\(([\sx0-9a-fA-F,]*)\)\s*\)", re.IGNORECASE)
+# closing quotes that are followed by the end of the line or the next parameter
+_ARGUMENT_QUOTE_END = re.compile(r'"(?=[ \t]*(?:[`\\]?[ \t]*(?:\r?\n|$)|-[A-Za-z]))')
+_ENTRY_QUOTE_END = re.compile(r'"(?=[ \t]*(?:\r?\n|$))')
+
+
+def tokenize_args(text: str, position: int = 0) -> dict[str, Span]:
+    """
+    Tokenizes the arguments of an `Invoke-WebRequest` command in one pass.
 
-    # find all possible cli args
-    regex = re.compile(r"(?:[\n\r ]\-(?P<name>[a-zA-Z]+))")
-    keys: set[str] = set(x.group("name") for x in regex.finditer(text))
+    Understands quoting, backtick (and backslash) line continuations, and `@{...}` hashtables.
+    Values are returned as spans into `text` so large bodies are never copied.
+    """
+    args: dict[str, Span] = {}
+    key: str | None = None
+    length = len(text)
 
-    key: str = ""
+    while position < length:
+        char = text[position]
 
-    while text_split:
-        section = text_split.pop(0)
+        if char in _WHITESPACE:
+            position += 1
+            continue
 
-        if section.startswith("-"):
-            possible_key = section.lstrip("-")
-            if possible_key in keys:
-                key = possible_key
-        elif key and not section.isspace():
-            args[key] += f" {section}"
+        if char in "`\\" and _is_line_continuation(text, position + 1):
+            position += 1
+            continue
 
-    for key, value in args.items():
-        value = value.lstrip()
-        value = value.strip('"')
-        args[key] = value
+        span: Span
+        match = _PARAMETER.match(text, position) if char == "-" else None
+        if match is not None:
+            key = match.group(1)
+            # switches don't take a value
+            args[key] = Span(match.end(), match.end(), SWITCH)
+            position = match.end()
+            continue
+        elif char == '"':
+            end = find_quoted_end(text, position, _ARGUMENT_QUOTE_END)
+            span = Span(position + 1, end, STRING)
+            position = end + 1
+        elif char == "'":
+            end = find_verbatim_end(text, position)
+            span = Span(position + 1, end, VERBATIM)
+            position = end + 1
+        elif text.startswith("@{", position):
+            end = find_closing(text, position + 1)
+            span = Span(position, end + 1, HASHTABLE)
+            position = end + 1
+        elif char == "(":
+            end = find_closing(text, position)
+            span = Span(position, end + 1, EXPRESSION)
+            position = end + 1
+        else:
+            # bare words run until the next whitespace
+            match = _BARE_WORD_END.search(text, position)
+            end = length if match is None else match.start()
+            span = Span(position, end, BARE)
+            position = end
+
+        if key is not None:
+            args[key] = span
+            key = None
 
     return args
 
 
-def parse_headers(args: dict[str, str], headers: dict[str, str]) -> None:
-    headers_string = args["Headers"][3:-2]
-    for header in headers_string.split('" "'):
-        try:
-            key, value = header.split('"="', maxsplit=1)
-            headers[key] = fix_escape_chars(value)
-        except ValueError:
-            continue
+def _is_line_continuation(text: str, position: int) -> bool:
+    """checks if only spaces sit between `position` and the end of the line"""
+    while position < len(text) and text[position] in " \t":
+        position += 1
+    return position >= len(text) or text[position] in "\r\n"
 
 
-def parse_escape_chars(text: str) -> str:
-    """
-    Parses escape characters in powershell.
-    (ex. '`"' -> '"')
-    (ex. 'hi``123' -> 'hi`123')
-    """
-    match_single_escape_char = re.compile(r"(?<!`)`(?!`)")
-    text = match_single_escape_char.sub("", text)
-    text = text.replace("``", "`")
-    return text
+def find_string_end(text: str, position: int) -> int:
+    """:returns: the position of the quote that closes the double-quoted string starting at `position`"""
+    match = _DOUBLE_QUOTED.match(text, position)
+    if match is None:
+        # unterminated string
+        return len(text)
+    return match.end() - 1
 
 
-def pre_parse_body(body: str) -> str:
+def find_quoted_end(text: str, position: int, fallback: re.Pattern[str], line_end: int | None = None) -> int:
     """
-    Pre-parse the body to de-powershell the characters.
-    (ex. `$([char]13)` -> "\r")
+    Finds the end of a double-quoted value.
+
+    Some exports don't escape quotes inside values (ex. `"sec-ch-ua"=""Chromium";v="94""`),
+    so if the string closes in the middle of a word the value is taken to run until the `fallback` quote instead.
     """
+    end = find_string_end(text, position)
+    after = end + 1
+    if after >= len(text) or text[after] in _WHITESPACE:
+        return end
+    if text[after] in "`\\" and _is_line_continuation(text, after + 1):
+        return end
+    if line_end is not None and text[after] in ";}":
+        following = text[after + 1 : line_end].lstrip(" \t")
+        if not following or following.startswith('"'):
+            return end
+
+    match = fallback.search(text, after, len(text) if line_end is None else line_end)
+    if match is None:
+        return end
+    return match.start()
+
+
+def find_verbatim_end(text: str, position: int) -> int:
+    """:returns: the position of the quote that closes the single-quoted string starting at `position`"""
+    position += 1
+    while True:
+        index = text.find("'", position)
+        if index == -1:
+            return len(text)
+        if not text.startswith("'", index + 1):
+            return index
+        # '' is an escaped quote
+        position = index + 2
+
+
+def find_closing(text: str, position: int) -> int:
+    """:returns: the position of the bracket that closes the one at `position` (strings are skipped)"""
+    depth = 0
+    length = len(text)
+    while True:
+        match = _NESTED_SPECIAL.search(text, position)
+        if match is None:
+            return length
+        index = match.start()
+        char = text[index]
+        if char == '"':
+            position = find_string_end(text, index) + 1
+        elif char == "'":
+            position = find_verbatim_end(text, index) + 1
+        elif char == "`":
+            position = index + 2
+        else:
+            depth += 1 if char in "({" else -1
+            position = index + 1
+            if depth == 0:
+                return index
+
+
+def decode_arg(text: str, span: Span) -> str:
+    if span.kind == STRING:
+        return decode_powershell_string(text, span.start, span.end)
+    if span.kind == VERBATIM:
+        return decode_powershell_string(text, span.start, span.end, verbatim=True)
+    return text[span.start : span.end]
+
+
+def decode_body(text: str, span: Span) -> str | bytes | None:
+    """
+    Decodes the value of `-Body`, which is either a string literal, a string that gets encoded, or a byte array.
+    (ex. `([System.Text.Encoding]::UTF8.GetBytes("a$([char]13)$([char]10)b"))` -> "a\\r\\nb")
+    (ex. `([byte[]](0x08, 0x96, 0x01))` -> b"\\x08\\x96\\x01")
+    :returns: None for byte arrays that hold values that aren't bytes (ex. 300), which powershell can't send either
+    """
+    if span.kind != EXPRESSION:
+        return decode_arg(text, span)
 
-    if not body.startswith("([System.Text.Encoding]::UTF8.GetBytes("):
-        return body
+    byte_array = _BYTE_ARRAY.match(text, span.start, span.end)
+    if byte_array:
+        try:
+            return bytes(_parse_byte(number) for number in byte_array.group(1).replace(",", " ").split())
+        except ValueError:
+            return None
 
-    left_quote = body.find('"')
-    right_quote = body.rfind('"')
+    match = _QUOTE.search(text, span.start, span.end)
+    if not match:
+        return text[span.start : span.end]
 
-    if left_quote == -1 or right_quote == -1:
-        return body
+    start = match.start()
+    if match.group() == "'":
+        return decode_powershell_string(text, start + 1, find_verbatim_end(text, start), verbatim=True)
+    return decode_powershell_string(text, start + 1, find_string_end(text, start))
 
-    final_data: str = ""
-    quoted_data = body[left_quote + 1 : right_quote]
 
-    for part in quoted_data.split("$"):
-        if not part.startswith("([char]"):
-            final_data += part
+def _parse_byte(number: str) -> int:
+    """(ex. "0x1f" -> 31, "08" -> 8)"""
+    if number[:2].lower() == "0x":
+        return int(number[2:], 16)
+    # leading zeros don't make a number octal in powershell
+    return int(number, 10)
+
+
+def parse_headers(text: str, span: Span, headers: dict[str, str]) -> None:
+    """parses the `"name"="value"` pairs of a `-Headers @{...}` hashtable"""
+    # skip `@{` and `}`
+    position = span.start + 2
+    end = span.end - 1
+
+    while position < end:
+        char = text[position]
+
+        if char in _WHITESPACE or char == ";":
+            position += 1
             continue
 
-        right_paren = part.find(")")
-        ordinal, rest = part[0 : right_paren + 1], part[right_paren + 1 :]
+        if char in "`\\" and _is_line_continuation(text, position + 1):
+            position += 1
+            continue
+
+        if char != '"':
+            # not a quoted key -- skip to the next line
+            line_end = text.find("\n", position, end)
+            position = end if line_end == -1 else line_end + 1
+            continue
 
-        # remove the `$([char]` from beg and `)` from end
-        ordinal = ordinal[7:-1]
-        ordinal_int = int(ordinal)
+        key_end = find_string_end(text, position)
+        key = decode_powershell_string(text, position + 1, key_end)
 
-        final_data += chr(ordinal_int) + rest
+        position = key_end + 1
+        if not text.startswith('="', position):
+            continue
 
-    return final_data
+        line_end = text.find("\n", position, end)
+        if line_end == -1:
+            # the last entry may share its line with the closing brace
+            line_end = end
+        value_end = find_quoted_end(text, position + 1, _ENTRY_QUOTE_END, line_end)
+        headers[key] = decode_powershell_string(text, position + 2, value_end)
+        position = value_end + 1
@@ -0,0 +1,119 @@
+"""
+Reads a snippet pasted into a terminal, where there's no end of input to wait for.
+
+The snippet's structure tells when it's over: a `fetch(...)` call ends when its parentheses close,
+and an `Invoke-WebRequest` command ends on the first line that isn't continued.
+Blank lines inside strings, brackets, or a continued command don't end the snippet.
+"""
+from __future__ import annotations
+
+import re
+import typing as t
+
+__all__ = ("read_snippet", "SnippetTracker")
+
+FETCH = "fetch"
+POWERSHELL = "powershell"
+
+_OPENING = "([{"
+_CLOSING = ")]}"
+
+# quotes, brackets, and escapes, which are all that matter outside strings
+_JS_SPECIAL = re.compile(r"\\[\s\S]|[\"'`()\[\]{}]")
+_POWERSHELL_SPECIAL = re.compile(r"`[\s\S]|[\"'()\[\]{}]")
+
+# the rest of a string, through its closing quote
+_JS_STRING_END = {quote: re.compile(rf"[^{quote}\\]*(?:\\[\s\S][^{quote}\\]*)*{quote}") for quote in "\"'`"}
+_POWERSHELL_STRING_END = {
+    # `x is an escape ("" closes and reopens the string, which works out the same)
+    '"': re.compile(r'[^"`]*(?:`[\s\S][^"`]*)*"'),
+    "'": re.compile(r"[^']*'"),
+}
+
+
+class SnippetTracker:
+    """follows a snippet line by line, tracking open brackets and strings"""
+
+    def __init__(self) -> None:
+        self.kind: str | None = None
+        self.depth = 0
+        self.quote: str | None = None
+        self.opened = False
+        self.invoked = False
+        self.started = False
+
+    @property
+    def balanced(self) -> bool:
+        return not self.depth and self.quote is None
+
+    def feed(self, line: str) -> bool:
+        """:returns: whether the snippet is complete once this line is added"""
+        stripped = line.strip()
+        if not self.started:
+            if not stripped:
+                # nothing was entered
+                return True
+            self.started = True
+            if stripped.startswith("fetch("):
+                self.kind = FETCH
+            elif stripped.startswith(("$session", "Invoke-WebRequest")):
+                self.kind = POWERSHELL
+
+        was_balanced = self.balanced
+        if self.kind == POWERSHELL:
+            if was_balanced and stripped.startswith("Invoke-WebRequest"):
+                self.invoked = True
+            self._scan(line, _POWERSHELL_SPECIAL, _POWERSHELL_STRING_END)
+        else:
+            self._scan(line, _JS_SPECIAL, _JS_STRING_END)
+
+        if not self.balanced:
+            return False
+        if was_balanced and not stripped:
+            return True
+        if self.kind == FETCH:
+            return self.opened
+        if self.kind == POWERSHELL:
+            # a trailing backtick continues the command onto the next line
+            return self.invoked and not line.rstrip().endswith("`")
+        return False
+
+    def _scan(self, line: str, special: re.Pattern[str], string_ends: dict[str, re.Pattern[str]]) -> None:
+        position = 0
+        length = len(line)
+        while position < length:
+            if self.quote is not None:
+                match = string_ends[self.quote].match(line, position)
+                if match is None:
+                    # the string continues onto the next line
+                    return
+                self.quote = None
+                position = match.end()
+                continue
+
+            match = special.search(line, position)
+            if match is None:
+                return
+            char = match.group()
+            position = match.end()
+            if char in string_ends:
+                self.quote = char
+            elif char in _OPENING:
+                self.depth += 1
+                self.opened = True
+            elif char in _CLOSING:
+                self.depth = max(self.depth - 1, 0)
+
+
+def read_snippet(lines: t.Iterable[str]) -> str:
+    """
+    reads lines until the snippet they hold is complete, a blank line is entered outside of it, or the input ends
+    (ex. `read_snippet(sys.stdin)`)
+    """
+    tracker = SnippetTracker()
+    collected: list[str] = []
+    for line in lines:
+        collected.append(line)
+        if tracker.feed(line):
+            break
+    return "".join(collected).strip()
@@ -1,14 +1,22 @@
 """Handles code generation and interaction with the parsed input"""
 from __future__ import annotations
 
+import hashlib
+import io
+import itertools
+import json
+import os
 import sys
+import textwrap
 import typing as t
+import urllib.parse
 from dataclasses import dataclass
 
 if t.TYPE_CHECKING:
-    from .typings import JSON, Data, Files, RequestData
+    from .templates import URLTemplate
+    from .typings import JSON, Body, Files, RequestData, ResultCache
 
-from .commons import format_json_like, format_string
+from .commons import format_json_like, format_string, write_literal
 
 opts: dict[str, bool] = {}
 if sys.version_info >= (3, 10):
@@ -33,6 +41,13 @@ async with httpx.AsyncClient({pass_data}) as client:
     resp = await client.{method}({url})
 """
 
+# bodies that are spilled to a side file are streamed from it where the library can do so
+OPEN_BODY = """with open({path}, "rb") as body:
+"""
+READ_BODY = """with open({path}, "rb") as fp:
+    body = fp.read()
+"""
+
 
 @dataclass(**opts)
 class Request:
@@ -41,51 +56,327 @@ class Request:
     headers: dict[str, str] | None
     cookies: dict[str, str] | None
     params: dict[str, str] | None
-    data: Data | None
+    data: Body | None
     json: JSON | None
     files: Files | None
 
-    def generate_code(self, sync: bool, httpx: bool, no_headers: bool, no_cookies: bool) -> str:
+    def generate_code(
+        self,
+        sync: bool,
+        httpx: bool,
+        no_headers: bool,
+        no_cookies: bool,
+        spill_threshold: int | None = None,
+        spill_dir: str = ".",
+        url_template: URLTemplate | None = None,
+        cache: ResultCache | None = None,
+    ) -> str:
+        """
+        Bodies larger than `spill_threshold` bytes are written to a file in `spill_dir`
+        that the generated code reads at runtime, instead of being inlined.
+
+        `url_template` generates a function that takes the template's path and query params as arguments.
+
+        `cache` (a `Cache` or `Memo`) looks the code up by the request and options before generating it.
+        Code that spills its body or fills in a URL template depends on more than that, so it isn't cached.
+
+        Use `prepare` to render more than one variant of the same request.
+        """
+        key: str | None = None
+        if cache is not None and spill_threshold is None and url_template is None:
+            from .cache import code_key
+
+            key = code_key(self, sync, httpx, no_headers, no_cookies)
+            code = cache.get_code(key)
+            if code is not None:
+                return code
+
+        prepared = self.prepare(spill_threshold=spill_threshold, spill_dir=spill_dir, url_template=url_template)
+        code = prepared.render(sync, httpx, no_headers, no_cookies)
+        if key is not None and cache is not None:
+            cache.put_code(key, code)
+        return code
 
-        method = self.method.lower()
+    def write_code(
+        self,
+        fp: t.TextIO,
+        sync: bool,
+        httpx: bool,
+        no_headers: bool,
+        no_cookies: bool,
+        spill_threshold: int | None = None,
+        spill_dir: str = ".",
+        url_template: URLTemplate | None = None,
+    ) -> None:
+        """
+        Writes the same code as `generate_code` to a text stream, a piece at a time,
+        so the code is never held in memory all at once.
+        """
+        prepared = self.prepare(
+            spill_threshold=spill_threshold, spill_dir=spill_dir, url_template=url_template, streaming=True
+        )
+        prepared.write(fp.write, sync, httpx, no_headers, no_cookies)
+
+    def prepare(
+        self,
+        spill_threshold: int | None = None,
+        spill_dir: str = ".",
+        url_template: URLTemplate | None = None,
+        streaming: bool = False,
+    ) -> PreparedRequest:
+        """
+        Formats the request's data once, so any variant of the code can be rendered without formatting it again.
+        (ex. `request.prepare().render_all()`)
+
+        `streaming` leaves the data unformatted until it's written, straight to a stream, by `PreparedRequest.write`.
+        """
         url = format_string(self.url)
 
         request_data: RequestData = {
-            "headers": self.headers if not no_headers else None,
-            "cookies": self.cookies if not no_cookies else None,
+            "headers": self.headers,
+            "cookies": self.cookies,
             "params": self.params,
             "data": self.data,
             "json": self.json,
             "files": self.files,
         }
 
-        define_data = self.define_request_data(request_data)
-        pass_data = self.pass_request_data(request_data)
+        # code that defines a piece of request data in place of its literal value
+        definitions: dict[str, str] = {}
+        if url_template is not None:
+            url = url_template.format_url()
+            request_data["params"] = None
+            define_params = url_template.define_params()
+            if define_params:
+                definitions["params"] = define_params
 
-        if sync and httpx:
-            return SYNC_HTTPX.format(method=method, url=url, define_data=define_data, pass_data=pass_data)
-        elif sync:
-            return SYNC_REQUESTS.format(method=method, url=url, define_data=define_data, pass_data=pass_data)
-        elif not sync and httpx:
-            return ASYNC_HTTPX.format(method=method, url=url, define_data=define_data, pass_data=pass_data)
-        else:
-            return ASYNC_AIOHTTP.format(method=method, url=url, define_data=define_data, pass_data=pass_data)
+        spilled = self.spill_body(spill_threshold, spill_dir) if spill_threshold is not None else None
+        spill_path: str | None = None
+        # what's defined as headers when they're left out
+        bare_headers: str | None = None
+        if spilled:
+            spill_path, content_type = spilled
+            request_data["data"] = None
+            request_data["json"] = None
+            # json= and data= set the content type themselves, but raw bodies don't
+            headers = t.cast("dict[str, str]", request_data["headers"] or {})
+            if not any(key.lower() == "content-type" for key in headers):
+                request_data["headers"] = {**headers, "content-type": content_type}
+                bare_headers = f"headers = {format_json_like({'content-type': content_type})}"
 
-    def define_request_data(self, request_data: RequestData) -> str:
-        defined: str = ""
+        blocks: dict[str, str | LiteralBlock | None] = {}
         for key, value in request_data.items():
-            if not value:
-                continue
-            defined += f"{key} = {format_json_like(value)}\n"
-        defined = defined.rstrip("\n")
-        return defined
+            if key in definitions:
+                blocks[key] = definitions[key]
+            elif not value:
+                blocks[key] = None
+            elif streaming:
+                blocks[key] = LiteralBlock(key, value)
+            else:
+                blocks[key] = f"{key} = {format_json_like(value)}"
+
+        return PreparedRequest(
+            method=self.method.lower(),
+            url=url,
+            blocks=blocks,
+            bare_headers=bare_headers,
+            spill_path=spill_path,
+            url_template=url_template,
+            raw_data=isinstance(request_data["data"], bytes),
+        )
+
+    def define_request_data(self, request_data: RequestData) -> str:
+        """
+        :returns: the code that defines each piece of request data that's set (ex. `headers = {...}`)
+        (`request_data` is keyed by field name, ex. {"headers": ..., "json": ...})
+        """
+        blocks = self._prepare_request_data(request_data).blocks
+        return "\n".join(t.cast(str, block) for block in blocks.values() if block is not None)
 
     def pass_request_data(self, request_data: RequestData) -> str:
+        """:returns: the arguments that pass the defined request data along (ex. "headers=headers, json=json")"""
+        blocks = self._prepare_request_data(request_data).blocks
+        return ", ".join(f"{key}={key}" for key, block in blocks.items() if block is not None)
+
+    def _prepare_request_data(self, request_data: RequestData) -> PreparedRequest:
+        fields: dict[str, t.Any] = dict.fromkeys(("headers", "cookies", "params", "data", "json", "files"))
+        return Request(method=self.method, url=self.url, **{**fields, **request_data}).prepare()
+
+    def spill_body(self, threshold: int, directory: str) -> tuple[str, str] | None:
+        """
+        Writes the body to `directory` if it's larger than `threshold` bytes.
+        Files are named after their contents, so each body is only written once.
+        The path is absolute, so the generated code finds the file no matter where it's run from.
+        :returns: the path of the file and the body's content type
+        """
+        if self.json is not None:
+            body = json.dumps(self.json).encode("utf-8")
+            content_type = "application/json"
+            extension = ".json"
+        elif isinstance(self.data, bytes):
+            body = self.data
+            content_type = "application/octet-stream"
+            extension = ".bin"
+        elif self.data and not self.files:
+            # data sent alongside files is part of the multipart body
+            body = urllib.parse.urlencode(self.data).encode("utf-8")
+            content_type = "application/x-www-form-urlencoded"
+            extension = ".txt"
+        else:
+            return None
+
+        if len(body) <= threshold:
+            return None
+
+        digest = hashlib.sha256(body).hexdigest()[:16]
+        directory = os.path.abspath(directory)
+        path = os.path.join(directory, f"body-{digest}{extension}")
+        if not os.path.exists(path):
+            os.makedirs(directory, exist_ok=True)
+            # write then rename so a half written body is never mistaken for a complete one
+            temp_path = f"{path}.tmp"
+            with open(temp_path, "wb") as fp:
+                fp.write(body)
+            os.replace(temp_path, path)
+        return path, content_type
+
+    def fingerprint(self, ignore_headers: t.Iterable[str] | None = None, ignore_cookies: t.Iterable[str] = ()) -> str:
+        """
+        :returns: a hash shared by requests that only differ in header case and order, param order,
+        or ignored headers and cookies (volatile headers like tracing ids are ignored by default)
+        """
+        from .fingerprint import DEFAULT_IGNORED_HEADERS, fingerprint
+
+        if ignore_headers is None:
+            ignore_headers = DEFAULT_IGNORED_HEADERS
+        return fingerprint(self, ignore_headers, ignore_cookies)
+
+
+class LiteralBlock(t.NamedTuple):
+    """A piece of request data that's formatted as it's written"""
+
+    key: str
+    value: t.Any
+
+    def write(self, write: t.Callable[[str], t.Any]) -> None:
+        write(f"{self.key} = ")
+        write_literal(self.value, write)
+
+
+@dataclass(**opts)
+class PreparedRequest:
+    """
+    The pieces of a request's generated code, with every literal already formatted (unless prepared for streaming).
+    Rendering a variant only fills in a template.
+    """
+
+    method: str
+    url: str
+    # "headers", "cookies", "params", "data", "json", and "files" in order, each defined in code (or None)
+    blocks: dict[str, str | LiteralBlock | None]
+    bare_headers: str | None
+    spill_path: str | None
+    url_template: URLTemplate | None
+    # whether `data` is a raw body (bytes) rather than form data
+    raw_data: bool = False
+
+    def render(self, sync: bool, httpx: bool, no_headers: bool, no_cookies: bool) -> str:
+        buffer = io.StringIO()
+        self.write(buffer.write, sync, httpx, no_headers, no_cookies)
+        return buffer.getvalue()
+
+    def render_all(self) -> dict[tuple[bool, bool, bool, bool], str]:
+        """:returns: every variant, keyed by (sync, httpx, no_headers, no_cookies)"""
+        return {
+            (sync, httpx, no_headers, no_cookies): self.render(sync, httpx, no_headers, no_cookies)
+            for sync, httpx, no_headers, no_cookies in itertools.product((True, False), repeat=4)
+        }
+
+    def write(
+        self, write: t.Callable[[str], t.Any], sync: bool, httpx: bool, no_headers: bool, no_cookies: bool
+    ) -> None:
+        """writes a variant of the code a piece at a time (ex. to `sys.stdout.write`)"""
+        blocks: list[str | LiteralBlock] = []
         pass_list: list[str] = []
-        for key, value in request_data.items():
-            if not value:
+        url = self.url
+        for key, block in self.blocks.items():
+            if key == "headers" and no_headers:
+                block = self.bare_headers
+            elif key == "cookies" and no_cookies:
+                continue
+            if block is None:
+                continue
+            blocks.append(block)
+            if key == "data" and self.raw_data and httpx:
+                # httpx takes raw bodies as content=, which the async client takes per request
+                if sync:
+                    pass_list.append("content=data")
+                else:
+                    url = f"{url}, content=data"
                 continue
             pass_list.append(f"{key}={key}")
-        if not pass_list:
-            return ""
-        return ", ".join(pass_list)
+
+        if sync and httpx:
+            template = SYNC_HTTPX
+        elif sync:
+            template = SYNC_REQUESTS
+        elif not sync and httpx:
+            template = ASYNC_HTTPX
+        else:
+            template = ASYNC_AIOHTTP
+
+        send = self._send(template, url, sync, httpx, ", ".join(pass_list))
+
+        if self.url_template is not None:
+            write(self.url_template.function_signature(sync))
+            indented = _indent(write)
+            indented("    ")
+            self._write_blocks(indented, blocks)
+            if blocks:
+                indented("\n")
+            indented(send.rstrip("\n"))
+            write("\n    return resp\n")
+            return
+
+        self._write_blocks(write, blocks)
+        write("\n")
+        write(send)
+
+    @staticmethod
+    def _write_blocks(write: t.Callable[[str], t.Any], blocks: list[str | LiteralBlock]) -> None:
+        for n, block in enumerate(blocks):
+            if n:
+                write("\n")
+            if isinstance(block, LiteralBlock):
+                block.write(write)
+            else:
+                write(block)
+
+    def _send(self, template: str, url: str, sync: bool, httpx: bool, pass_data: str) -> str:
+        """the code that follows the request data's definitions"""
+        method = self.method
+        if self.spill_path is None:
+            # every template starts with the definitions and a newline
+            return template.format(method=method, url=url, define_data="", pass_data=pass_data)[1:]
+
+        path = format_string(self.spill_path)
+        if not sync and httpx:
+            # the async client can't stream from a regular file, so the body is read up front
+            # (and it's passed to the request, not the client)
+            send = template.format(method=method, url=f"{url}, content=body", define_data="", pass_data=pass_data)
+            return f"{READ_BODY.format(path=path)}{send.lstrip()}"
+
+        # httpx takes raw bodies as content=
+        pass_body = "content=body" if httpx else "data=body"
+        pass_data = f"{pass_data}, {pass_body}" if pass_data else pass_body
+        send = template.format(method=method, url=url, define_data="", pass_data=pass_data).lstrip("\n")
+        return f"{OPEN_BODY.format(path=path)}{textwrap.indent(send, '    ')}"
+
+
+def _indent(write: t.Callable[[str], t.Any]) -> t.Callable[[str], t.Any]:
+    """indents everything written after a newline (literals never hold raw newlines, so nothing else is touched)"""
+
+    def write_indented(text: str) -> t.Any:
+        return write(text.replace("\n", "\n    "))
+
+    return write_indented
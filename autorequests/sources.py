@@ -0,0 +1,142 @@
+"""Reads request input without making more copies of it than needed"""
+from __future__ import annotations
+
+import codecs
+import contextlib
+import io
+import mmap
+import typing as t
+
+if t.TYPE_CHECKING:
+    from .typings import Source
+
+__all__ = (
+    "mapped_file",
+    "read_stream",
+    "iter_text",
+    "compression",
+    "decompressed",
+    "decompress",
+    "source_text",
+    "source_head",
+)
+
+# pipes hand over at most a page or so at a time, so reads are gathered into large chunks
+CHUNK_SIZE = 1 << 20
+
+GZIP = "gzip"
+BZ2 = "bz2"
+XZ = "xz"
+
+# compressed captures are recognized by their first bytes, not their extension
+_MAGIC = ((b"\x1f\x8b", GZIP), (b"BZh", BZ2), (b"\xfd7zXZ\x00", XZ))
+
+
+@contextlib.contextmanager
+def mapped_file(file: t.BinaryIO) -> t.Iterator[Source]:
+    """
+    memory maps a file so parsers can scan it in place
+    (falls back to reading it for empty files, pipes, and stdin, which can't be mapped)
+    """
+    try:
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError, io.UnsupportedOperation):
+        yield read_stream(file)
+        return
+
+    try:
+        yield mapped
+    finally:
+        mapped.close()
+
+
+def read_stream(file: t.BinaryIO, chunk_size: int = CHUNK_SIZE) -> bytes:
+    """reads a stream that can't be mapped (ex. piped stdin) to its end, a chunk at a time"""
+    chunks: list[bytes] = []
+    while True:
+        chunk = file.read(chunk_size)
+        if not chunk:
+            return b"".join(chunks)
+        chunks.append(chunk)
+
+
+def source_text(source: Source) -> str:
+    """
+    decodes the whole source
+    (bytes that aren't utf-8 are escaped as lone surrogates, so binary bodies can be turned back into their bytes)
+    """
+    if isinstance(source, str):
+        return source
+    with memoryview(source) as view:
+        return str(view, "utf-8", "surrogateescape")
+
+
+def source_head(source: Source, size: int = 1024) -> str:
+    """decodes just the start of the source, for detecting its format"""
+    if isinstance(source, str):
+        return source[:size]
+    with memoryview(source) as view:
+        return str(view[:size], "utf-8", "ignore")
+
+
+def iter_text(file: t.BinaryIO, chunk_size: int = CHUNK_SIZE) -> t.Iterator[str]:
+    """decodes a stream a chunk at a time, like `source_text` (characters split between chunks are carried over)"""
+    decoder = codecs.getincrementaldecoder("utf-8")("surrogateescape")
+    while True:
+        chunk = file.read(chunk_size)
+        text = decoder.decode(chunk, final=not chunk)
+        if text:
+            yield text
+        if not chunk:
+            return
+
+
+def compression(head: bytes) -> str | None:
+    """:returns: the compression format the data starts with (ex. b"\\x1f\\x8b..." --> "gzip"), if any"""
+    for magic, name in _MAGIC:
+        if head.startswith(magic):
+            return name
+    return None
+
+
+def decompressed(file: t.BinaryIO) -> t.BinaryIO:
+    """
+    :returns: a stream that decompresses the file as it's read, if it's compressed, otherwise the file itself
+    (the file has to support `peek`, ex. files opened in "rb" mode and `sys.stdin.buffer`)
+    """
+    peek: t.Callable[[int], bytes] | None = getattr(file, "peek", None)
+    kind = compression(peek(8)) if peek else None
+    if kind == GZIP:
+        import gzip
+
+        return t.cast(t.BinaryIO, gzip.GzipFile(fileobj=file, mode="rb"))
+    if kind == BZ2:
+        import bz2
+
+        return t.cast(t.BinaryIO, bz2.BZ2File(file))
+    if kind == XZ:
+        import lzma
+
+        return t.cast(t.BinaryIO, lzma.LZMAFile(file))
+    return file
+
+
+def decompress(source: Source) -> Source:
+    """decompresses compressed bytes in memory; anything else is returned as is"""
+    if isinstance(source, str):
+        return source
+    with memoryview(source) as view:
+        kind = compression(bytes(view[:8]))
+    if kind == GZIP:
+        import gzip
+
+        return gzip.decompress(source)
+    if kind == BZ2:
+        import bz2
+
+        return bz2.decompress(source)
+    if kind == XZ:
+        import lzma
+
+        return lzma.decompress(source)
+    return source
@@ -0,0 +1,256 @@
+"""
+Infers URL templates across many requests (ex. `/users/1` ... `/users/50000` -> `/users/{user_id}`),
+so each template can be generated as one function.
+"""
+from __future__ import annotations
+
+import dataclasses
+import keyword
+import re
+import typing as t
+import urllib.parse
+
+from .commons import format_json_like, format_string, parse_url
+
+if t.TYPE_CHECKING:
+    from .request import Request
+
+__all__ = ("URLTemplate", "PathParam", "QueryArg", "infer_templates", "segment_kind")
+
+NUMERIC = "numeric"
+UUID = "uuid"
+HASH = "hash"
+
+_NUMERIC = re.compile(r"\d+")
+_UUID = re.compile(r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}")
+# hex digests (ex. md5, sha1, object ids) and long random tokens that mix letters and digits
+_HASH = re.compile(r"[0-9a-fA-F]{16,}|(?=[A-Za-z_-]*\d)(?=\d*[A-Za-z])[A-Za-z0-9_-]{24,}")
+
+# every parameterized segment of a path shares this key in the trie
+_PARAM = ""
+# locals and modules used by the generated code, which arguments can't shadow
+_GENERATED_NAMES = frozenset(
+    ("headers", "cookies", "params", "data", "json", "files", "body", "fp", "resp", "session", "client", "open")
+)
+_GENERATED_MODULES = frozenset(("requests", "httpx", "aiohttp"))
+
+
+def segment_kind(segment: str) -> str | None:
+    """
+    :returns: the kind of value a path segment holds, or None if it's a regular name
+    (ex. "123" -> "numeric")
+    (ex. "users" -> None)
+    """
+    if _NUMERIC.fullmatch(segment):
+        return NUMERIC
+    if _UUID.fullmatch(segment):
+        return UUID
+    if _HASH.fullmatch(segment):
+        return HASH
+    return None
+
+
+@dataclasses.dataclass
+class PathParam:
+    name: str
+    kind: str
+
+
+@dataclasses.dataclass
+class QueryArg:
+    """a query param whose value varies between the requests of a template"""
+
+    name: str
+    key: str
+    required: bool
+
+
+@dataclasses.dataclass
+class URLTemplate:
+    method: str
+    origin: str
+    segments: list[str | PathParam]
+    requests: list[Request] = dataclasses.field(default_factory=list)
+    name: str = ""
+    constant_params: dict[str, str] = dataclasses.field(default_factory=dict)
+    query_args: list[QueryArg] = dataclasses.field(default_factory=list)
+
+    @property
+    def path(self) -> str:
+        """(ex. "/users/{user_id}/posts")"""
+        return "/" + "/".join(f"{{{s.name}}}" if isinstance(s, PathParam) else s for s in self.segments)
+
+    @property
+    def path_params(self) -> list[PathParam]:
+        return [segment for segment in self.segments if isinstance(segment, PathParam)]
+
+    @property
+    def arguments(self) -> list[str]:
+        """the function's arguments; optional query params come last and default to None"""
+        arguments = [param.name for param in self.path_params]
+        arguments += [arg.name for arg in self.query_args if arg.required]
+        arguments += [f"{arg.name}=None" for arg in self.query_args if not arg.required]
+        return arguments
+
+    def format_url(self) -> str:
+        """the url as an f-string that fills in the path params"""
+        if not self.path_params:
+            return format_string(self.origin + self.path)
+        parts = (
+            f"{{{s.name}}}" if isinstance(s, PathParam) else s.replace("{", "{{").replace("}", "}}")
+            for s in self.segments
+        )
+        return "f" + format_string(self.origin.replace("{", "{{").replace("}", "}}") + "/" + "/".join(parts))
+
+    def define_params(self) -> str | None:
+        """defines `params`, filling in the query args"""
+        if not self.constant_params and not self.query_args:
+            return None
+        lines = [f"params = {format_json_like(self.constant_params) if self.constant_params else '{}'}"]
+        for arg in self.query_args:
+            if arg.required:
+                lines.append(f"params[{format_string(arg.key)}] = {arg.name}")
+            else:
+                lines.append(f"if {arg.name} is not None:\n    params[{format_string(arg.key)}] = {arg.name}")
+        return "\n".join(lines)
+
+    def function_signature(self, sync: bool) -> str:
+        """(ex. "def get_users_by_user_id(user_id, page=None):\n")"""
+        define = "def" if sync else "async def"
+        return f"{define} {self.name}({', '.join(self.arguments)}):\n"
+
+    def generate_code(self, sync: bool, httpx: bool, no_headers: bool, no_cookies: bool, **kwargs: t.Any) -> str:
+        """generates the function using the first request as the example for headers, cookies, and the body"""
+        return self.requests[0].generate_code(sync, httpx, no_headers, no_cookies, url_template=self, **kwargs)
+
+    def write_code(
+        self, fp: t.TextIO, sync: bool, httpx: bool, no_headers: bool, no_cookies: bool, **kwargs: t.Any
+    ) -> None:
+        """see `Request.write_code`"""
+        self.requests[0].write_code(fp, sync, httpx, no_headers, no_cookies, url_template=self, **kwargs)
+
+
+class _Node:
+    __slots__ = ("children", "template")
+
+    def __init__(self) -> None:
+        self.children: dict[str, _Node] = {}
+        self.template: URLTemplate | None = None
+
+
+def infer_templates(requests: t.Iterable[Request]) -> list[URLTemplate]:
+    """
+    Groups requests by method, origin, and path template,
+    treating numeric, UUID, and hash-like path segments as parameters.
+
+    Each request is inserted into a trie of path segments once, so this runs in time linear to the number of requests.
+    Templates are returned in the order they're first seen.
+    """
+    roots: dict[tuple[str, str], _Node] = {}
+    templates: list[URLTemplate] = []
+
+    for request in requests:
+        parts = urllib.parse.urlsplit(request.url)
+        origin = f"{parts.scheme}://{parts.netloc}"
+        method = request.method.upper()
+
+        node = roots.setdefault((method, origin), _Node())
+        segments: list[tuple[str, str | None]] = []
+        for segment in parts.path.split("/")[1:]:
+            kind = segment_kind(segment)
+            segments.append((segment, kind))
+            key = _PARAM if kind else segment
+            child = node.children.get(key)
+            if child is None:
+                child = node.children[key] = _Node()
+            node = child
+
+        if node.template is None:
+            node.template = URLTemplate(method=method, origin=origin, segments=_name_segments(segments))
+            templates.append(node.template)
+        node.template.requests.append(request)
+
+    taken: set[str] = set()
+    for template in templates:
+        template.name = _unique(_function_name(template), taken)
+        _split_params(template)
+    return templates
+
+
+def _name_segments(segments: list[tuple[str, str | None]]) -> list[str | PathParam]:
+    """names each parameter after the segment before it (ex. "/users/1" -> "/users/{user_id}")"""
+    named: list[str | PathParam] = []
+    taken: set[str] = set()
+    previous: str | None = None
+    for segment, kind in segments:
+        if kind is None:
+            named.append(segment)
+            previous = segment
+            continue
+        base = f"{_singular(_identifier(previous))}_id" if previous else "id"
+        named.append(PathParam(_unique(base, taken), kind))
+    return named
+
+
+def _split_params(template: URLTemplate) -> None:
+    """query params with the same value in every request are kept as is, the others become arguments"""
+    values: dict[str, set[str]] = {}
+    counts: dict[str, int] = {}
+    for request in template.requests:
+        # parsed urls have their query split off already, but urls built by hand may not
+        _, url_params = parse_url(request.url)
+        for key, value in {**(url_params or {}), **(request.params or {})}.items():
+            values.setdefault(key, set()).add(value)
+            counts[key] = counts.get(key, 0) + 1
+
+    taken = {param.name for param in template.path_params}
+    total = len(template.requests)
+    for key, seen in values.items():
+        required = counts[key] == total
+        if required and len(seen) == 1:
+            template.constant_params[key] = next(iter(seen))
+        else:
+            template.query_args.append(QueryArg(_unique(_argument_name(key), taken), key, required))
+
+
+def _function_name(template: URLTemplate) -> str:
+    """(ex. GET /users/{user_id}/posts -> "get_users_posts", GET /users/{user_id} -> "get_users_by_user_id")"""
+    names = [_identifier(segment) for segment in template.segments if isinstance(segment, str) and segment]
+    name = "_".join([template.method.lower(), *names]) if names else f"{template.method.lower()}_root"
+    last = template.segments[-1] if template.segments else None
+    if isinstance(last, PathParam):
+        name += f"_by_{last.name}"
+    return name
+
+
+def _identifier(text: str | None) -> str:
+    identifier = re.sub(r"\W+", "_", text or "").strip("_").lower() or "param"
+    if identifier[0].isdigit():
+        identifier = f"_{identifier}"
+    if keyword.iskeyword(identifier):
+        identifier += "_"
+    return identifier
+
+
+def _argument_name(key: str) -> str:
+    """(ex. "headers" -> "headers_", so the argument doesn't shadow the generated code's `headers`)"""
+    name = _identifier(key)
+    return f"{name}_" if name in _GENERATED_NAMES or name in _GENERATED_MODULES else name
+
+
+def _singular(name: str) -> str:
+    if name.endswith("ies"):
+        return name[:-3] + "y"
+    if name.endswith("s") and not name.endswith("ss"):
+        return name[:-1]
+    return name
+
+
+def _unique(name: str, taken: set[str]) -> str:
+    unique = name
+    n = 1
+    while unique in taken:
+        n += 1
+        unique = f"{name}_{n}"
+    taken.add(unique)
+    return unique
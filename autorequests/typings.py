@@ -2,7 +2,20 @@ from __future__ import annotations
 
 import typing as t
 
+if t.TYPE_CHECKING:
+    import mmap
+
+    from .cache import Cache
+    from .memo import Memo
+    from .parsing.multipart import FilePart
+
 Data: t.TypeAlias = "dict[str, str]"  # type: ignore[name-defined]
 JSON: t.TypeAlias = "dict[t.Any, t.Any] | list[t.Any]"  # type: ignore[name-defined]
-Files: t.TypeAlias = "dict[str, bytes | tuple[str, bytes] | tuple[str, bytes, str]]"  # type: ignore[name-defined]
-RequestData: t.TypeAlias = "dict[str, Data | JSON | Files | None]"  # type: ignore[name-defined]
+Files: t.TypeAlias = "dict[str, bytes | tuple[str, bytes] | tuple[str, bytes, str] | FilePart]"  # type: ignore[name-defined]
+# raw bodies (ex. protobuf) are kept as bytes, in place of form data
+Body: t.TypeAlias = "Data | bytes"  # type: ignore[name-defined]
+ParsedBody: t.TypeAlias = "tuple[Body | None, JSON | None, Files | None]"  # type: ignore[name-defined]
+RequestData: t.TypeAlias = "dict[str, Body | JSON | Files | None]"  # type: ignore[name-defined]
+Source: t.TypeAlias = "str | bytes | bytearray | memoryview | mmap.mmap"  # type: ignore[name-defined]
+# where parsed requests and generated code are looked up before they're made again
+ResultCache: t.TypeAlias = "Cache | Memo"  # type: ignore[name-defined]
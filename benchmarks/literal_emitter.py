@@ -0,0 +1,60 @@
+"""
+Compares writing python literals in a single pass with the old `json.dumps` + `str.replace` approach,
+on JSON bodies of a few MB.
+
+usage: python -m benchmarks.literal_emitter
+"""
+from __future__ import annotations
+
+import json
+import timeit
+import tracemalloc
+import typing as t
+
+from autorequests.commons import format_json_like
+
+SIZES = (1, 2, 4, 8)  # MB
+
+
+def format_with_replace(data: t.Any, indent: int | None = 4) -> str:
+    """how `format_json_like` used to work"""
+    formatted = json.dumps(data, indent=indent)
+    formatted = formatted.replace(" null", " None")
+    formatted = formatted.replace(" true", " True")
+    formatted = formatted.replace(" false", " False")
+    formatted = formatted.replace("[", "(")
+    formatted = formatted.replace("]", ")")
+    formatted = formatted.replace('"(binary)"', 'b"(binary)"')
+    return formatted
+
+
+def make_body(megabytes: int) -> t.Any:
+    item = {"id": 1, "name": "autorequests", "active": True, "score": 1.5, "tags": ["a", "b"], "parent": None}
+    count = megabytes * 1024 * 1024 // len(json.dumps(item, indent=4))
+    return {"items": [dict(item, id=n) for n in range(count)]}
+
+
+def peak_memory(func: t.Callable[[], t.Any]) -> int:
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def main() -> None:
+    print(f"{'size':>6} {'replace':>10} {'emitter':>10} {'replace peak':>14} {'emitter peak':>14}")
+    for megabytes in SIZES:
+        body = make_body(megabytes)
+        replace = min(timeit.repeat(lambda: format_with_replace(body), number=1, repeat=3))
+        emitter = min(timeit.repeat(lambda: format_json_like(body), number=1, repeat=3))
+        replace_peak = peak_memory(lambda: format_with_replace(body))
+        emitter_peak = peak_memory(lambda: format_json_like(body))
+        print(
+            f"{megabytes:>4}MB {replace * 1000:>8.0f}ms {emitter * 1000:>8.0f}ms "
+            f"{replace_peak / 1024 / 1024:>12.1f}MB {emitter_peak / 1024 / 1024:>12.1f}MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Compares the memory held by many parsed `Request`s with the same requests stored as `CompactRequest`s.
+
+usage: python -m benchmarks.memory [COUNT]
+"""
+from __future__ import annotations
+
+import gc
+import sys
+import tracemalloc
+import typing as t
+
+from autorequests.compact import CompactRequest, RequestPool
+from autorequests.parsing import parse_fetch
+
+TEMPLATE = """fetch("https://httpbin.org/anything/{n}?page={n}", {
+  "headers": {
+    "accept": "application/json",
+    "accept-language": "en-US,en;q=0.9",
+    "sec-ch-ua": "\\"Chromium\\";v=\\"94\\", \\" Not A;Brand\\";v=\\"99\\", \\"Opera GX\\";v=\\"80\\"",
+    "sec-ch-ua-mobile": "?0",
+    "sec-ch-ua-platform": "\\"Windows\\"",
+    "sec-fetch-dest": "empty",
+    "sec-fetch-mode": "cors",
+    "sec-fetch-site": "same-origin",
+    "cookie": "session={session}; theme=dark"
+  },
+  "referrer": "https://httpbin.org/",
+  "referrerPolicy": "strict-origin-when-cross-origin",
+  "body": null,
+  "method": "GET",
+  "mode": "cors",
+  "credentials": "include"
+});"""
+
+# requests are spread across this many sessions, like a capture of a few users browsing
+SESSIONS = 10
+
+
+def measure(build: t.Callable[[], list[t.Any]]) -> tuple[int, list[t.Any]]:
+    gc.collect()
+    tracemalloc.start()
+    objects = build()
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size, objects
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    samples = [TEMPLATE.replace("{n}", str(n)).replace("{session}", f"s{n % SESSIONS:04}") for n in range(count)]
+
+    def parse() -> list[t.Any]:
+        return [parse_fetch(sample) for sample in samples]
+
+    def parse_compact() -> list[t.Any]:
+        pool = RequestPool()
+        requests = []
+        for sample in samples:
+            request = parse_fetch(sample)
+            assert request is not None
+            requests.append(CompactRequest.from_request(request, pool=pool))
+        return requests
+
+    regular, requests = measure(parse)
+    del requests
+    compact, requests = measure(parse_compact)
+    del requests
+
+    print(f"{count} requests")
+    print(f"{'Request':>15} {regular / 1024 / 1024:>8.2f}MB {regular / count:>8.0f}B each")
+    print(f"{'CompactRequest':>15} {compact / 1024 / 1024:>8.2f}MB {compact / count:>8.0f}B each")
+    print(f"{'saved':>15} {1 - compact / regular:>9.0%}")
+
+
+if __name__ == "__main__":
+    main()
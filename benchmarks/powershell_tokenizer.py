@@ -0,0 +1,47 @@
+"""
+Shows that tokenizing `Invoke-WebRequest` arguments scales linearly with the size of the body.
+
+usage: python -m benchmarks.powershell_tokenizer
+"""
+from __future__ import annotations
+
+import timeit
+
+from autorequests.parsing.powershell import parse_powershell, parse_session, tokenize_args
+
+SIZES = (1, 2, 4, 8, 16)  # MB
+
+TEMPLATE = """$session = New-Object Microsoft.PowerShell.Commands.WebRequestSession
+$session.UserAgent = "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"
+Invoke-WebRequest -UseBasicParsing -Uri "https://httpbin.org/post" `
+-Method "POST" `
+-WebSession $session `
+-Headers @{
+"accept"="application/json"
+  "accept-language"="en-US,en;q=0.9"
+} `
+-ContentType "application/json" `
+-Body "{`"items`":[{body}]}\""""
+
+
+def make_command(megabytes: int) -> str:
+    item = '{`"id`":1,`"name`":`"autorequests`",`"tags`":[`"a`",`"b`"]},'
+    count = megabytes * 1024 * 1024 // len(item)
+    return TEMPLATE.replace("{body}", (item * count).rstrip(","))
+
+
+def main() -> None:
+    print(f"{'size':>6} {'tokenize':>12} {'per MB':>10} {'parse':>12} {'per MB':>10}")
+    for megabytes in SIZES:
+        text = make_command(megabytes)
+        start = parse_session(text, {}, {})
+        tokenize = min(timeit.repeat(lambda: tokenize_args(text, start), number=1, repeat=5))
+        parse = min(timeit.repeat(lambda: parse_powershell(text), number=1, repeat=3))
+        print(
+            f"{megabytes:>4}MB {tokenize * 1000:>10.2f}ms {tokenize * 1000 / megabytes:>8.2f}ms "
+            f"{parse * 1000:>10.2f}ms {parse * 1000 / megabytes:>8.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
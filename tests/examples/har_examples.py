@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+from autorequests.request import Request
+
+har_examples: dict[str, list[Request]] = {}
+
+har_example_one = """{
+  "log": {
+    "version": "1.2",
+    "creator": {"name": "WebInspector", "version": "537.36"},
+    "pages": [{"id": "page_1", "title": "https://httpbin.org/ \\"entries\\" [{}]"}],
+    "entries": [
+      {
+        "_initiator": {"type": "script"},
+        "request": {
+          "method": "GET",
+          "url": "https://httpbin.org/cookies?a=1",
+          "httpVersion": "http/2.0",
+          "headers": [
+            {"name": ":authority", "value": "httpbin.org"},
+            {"name": "accept", "value": "application/json"},
+            {"name": "cookie", "value": "hello=world"}
+          ],
+          "queryString": [{"name": "a", "value": "1"}],
+          "cookies": [{"name": "hello", "value": "world"}]
+        },
+        "response": {"status": 200, "content": {"text": "{\\"cookies\\": {\\"hello\\": \\"world\\"}}"}}
+      },
+      {
+        "request": {
+          "method": "POST",
+          "url": "https://httpbin.org/post",
+          "httpVersion": "HTTP/1.1",
+          "headers": [
+            {"name": "Content-Type", "value": "application/json"},
+            {"name": "Cookie", "value": "a=b; c=d"}
+          ],
+          "cookies": [],
+          "postData": {"mimeType": "application/json", "text": "{\\"brackets\\": \\"]}{[\\", \\"n\\": 1}"}
+        },
+        "response": {"status": 200}
+      }
+    ]
+  }
+}"""
+
+har_examples[har_example_one] = [
+    Request(
+        method="GET",
+        url="https://httpbin.org/cookies",
+        headers={"accept": "application/json"},
+        cookies={"hello": "world"},
+        params={"a": "1"},
+        data=None,
+        json=None,
+        files=None,
+    ),
+    Request(
+        method="POST",
+        url="https://httpbin.org/post",
+        headers={"Content-Type": "application/json"},
+        cookies={"a": "b", "c": "d"},
+        params=None,
+        data=None,
+        json={"brackets": "]}{[", "n": 1},
+        files=None,
+    ),
+]
@@ -116,3 +116,31 @@ powershell_examples[powershell_example_two] = Request(
     },
     files=None,
 )
+
+powershell_example_three = """$session = New-Object Microsoft.PowerShell.Commands.WebRequestSession
+$session.UserAgent = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/104.0.5112.102 Safari/537.36"
+$session.Cookies.Add((New-Object System.Net.Cookie("quote", "say `"hi`"", "/", "httpbin.org")))
+Invoke-WebRequest -UseBasicParsing -Uri "https://httpbin.org/post?a=1" `
+-Method "POST" `
+-WebSession $session `
+-Headers @{
+"accept"="application/json"
+  "x-literal"="back``tick"
+} `
+-ContentType "application/json" `
+-Body ([System.Text.Encoding]::UTF8.GetBytes("{`"text`":`"line one$([char]10)line \\`"two\\`"`",`"path`":`"C:\\\\`"}"))"""
+
+powershell_examples[powershell_example_three] = Request(
+    method="POST",
+    url="https://httpbin.org/post",
+    headers={
+        "accept": "application/json",
+        "x-literal": "back`tick",
+        "user-agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/104.0.5112.102 Safari/537.36",
+    },
+    cookies={"quote": 'say "hi"'},
+    params={"a": "1"},
+    data=None,
+    json={"text": 'line one\nline "two"', "path": "C:\\"},
+    files=None,
+)
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import itertools
+import typing as t
+
+import pytest
+
+from autorequests.cache import Cache, code_key, input_key
+from autorequests.convert import convert_files
+from autorequests.parsing import parse_input
+from autorequests.request import Request
+
+from .examples import fetch_examples, powershell_examples
+
+if t.TYPE_CHECKING:
+    import pathlib
+
+OPTIONS: dict[str, t.Any] = {"sync": True, "httpx": False, "no_headers": False, "no_cookies": False}
+
+
+@pytest.mark.parametrize("sample,expected", [*fetch_examples.items(), *powershell_examples.items()])
+def test_cache_round_trip(sample: str, expected: Request, tmp_path: pathlib.Path) -> None:
+    path = str(tmp_path / "cache.sqlite")
+    with Cache(path) as cache:
+        assert parse_input(sample, cache=cache) == expected
+        code = expected.generate_code(**OPTIONS, cache=cache)
+        assert len(cache) == 2
+
+    # a new connection (ex. the next CI run) finds both without parsing or generating again
+    with Cache(path) as cache:
+        found, request = cache.get_request(input_key(sample))
+        assert found and request == expected
+        assert type(parse_input(sample, lazy=True, cache=cache)) is Request
+        assert cache.get_code(code_key(expected, **OPTIONS)) == code
+        assert expected.generate_code(**OPTIONS, cache=cache) == code
+        assert len(cache) == 2
+
+
+def test_cache_keys() -> None:
+    request = next(iter(fetch_examples.values()))
+    assert input_key("a") == input_key(b"a")
+    assert input_key("a") != input_key("b")
+    # every option is part of the key
+    keys = {code_key(request, *flags) for flags in itertools.product([True, False], repeat=4)}
+    assert len(keys) == 16
+
+
+def test_cache_invalid_input(tmp_path: pathlib.Path) -> None:
+    with Cache(str(tmp_path / "cache.sqlite")) as cache:
+        assert parse_input("not a request", cache=cache) is None
+        # the failure is remembered too
+        assert cache.get_request(input_key("not a request")) == (True, None)
+
+
+def test_cache_eviction(tmp_path: pathlib.Path) -> None:
+    with Cache(str(tmp_path / "cache.sqlite"), max_bytes=300) as cache:
+        for key in "abc":
+            cache.put(key, b"x" * 100)
+        # reading "a" makes "b" the least recently used entry
+        assert cache.get("a") is not None
+        cache.put("d", b"x" * 100)
+        assert cache.get("b") is None
+        assert {key: cache.get(key) is not None for key in "acd"} == {"a": True, "c": True, "d": True}
+        assert cache.size == 300
+
+        # values that could never fit aren't stored
+        cache.put("e", b"x" * 301)
+        assert cache.get("e") is None
+
+        # replacing an entry keeps the running total right
+        cache.put("a", b"x" * 50)
+        assert cache.size == 250
+
+
+def test_convert_files_cache(tmp_path: pathlib.Path) -> None:
+    captures = tmp_path / "captures"
+    captures.mkdir()
+    (captures / "fetch.txt").write_text(next(iter(fetch_examples)))
+    cache_path = str(tmp_path / "cache.sqlite")
+
+    # fresh output directories (ex. CI checkouts) still hit the cache
+    for run in ("first", "second"):
+        result = convert_files([str(captures / "fetch.txt")], str(tmp_path / run), OPTIONS, cache_path=cache_path)
+        assert len(result.converted) == 1
+
+    assert (tmp_path / "first" / "fetch.py").read_text() == (tmp_path / "second" / "fetch.py").read_text()
+    with Cache(cache_path) as cache:
+        assert len(cache) == 2
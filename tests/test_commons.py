@@ -23,7 +23,24 @@ def test_parse_url_encoded() -> None:
     assert commons.parse_url_encoded("a=1&b=2") == {"a": "1", "b": "2"}
 
 
-def test_fix_escape_chars() -> None:
-    assert commons.fix_escape_chars("\\t") == "\t"
-    assert commons.fix_escape_chars("\\n") == "\n"
-    assert commons.fix_escape_chars("\\r\\n") == "\r\n"
+def test_split_cookies() -> None:
+    headers = {"a": "a", "cookie": "a=1; b=1"}
+    assert commons.split_cookies(headers) == ({"a": "a"}, {"a": "1", "b": "1"})
+    assert headers == {"a": "a", "cookie": "a=1; b=1"}
+
+
+def test_format_literal() -> None:
+    # strings are never rewritten
+    assert commons.format_json_like({"a": "[ true, null ]"}) == '{\n    "a": "[ true, null ]"\n}'
+    assert commons.format_json_like([1]) == "(\n    1,\n)"
+    assert commons.format_json_like({"a": [1, None], "b": {}}, indent=None) == '{"a": (1, None), "b": {}}'
+    assert commons.format_json_like({"a": b"(binary)"}, indent=None) == '{"a": b"(binary)"}'
+    # non-ascii characters are escaped like json.dumps does, except astral ones, which python can't read as pairs
+    assert (
+        commons.format_json_like(["é", "\U0001f600", "\udcff"], indent=None) == '("\\u00e9", "\\U0001f600", "\\udcff")'
+    )
+
+    value = {"a": [1, 2.5, True, {"b": ["é\U0001f600", 'q"\\\n']}], "c": ("file.txt", b"'\"")}
+    expected = {"a": (1, 2.5, True, {"b": ("é\U0001f600", 'q"\\\n')}), "c": ("file.txt", b"'\"")}
+    for indent in (None, 2, 4):
+        assert eval(commons.format_json_like(value, indent=indent)) == expected
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import gzip
+import typing as t
+
+from autorequests.convert import MANIFEST_NAME, convert_files, expand_patterns
+from autorequests.parsing import parse_input
+
+from .examples import fetch_examples, powershell_examples
+
+if t.TYPE_CHECKING:
+    import pathlib
+
+OPTIONS = {"sync": True, "httpx": False, "no_headers": False, "no_cookies": False}
+
+
+def test_convert_files_incremental(tmp_path: pathlib.Path) -> None:
+    captures = tmp_path / "captures"
+    captures.mkdir()
+    (captures / "fetch.txt").write_text(next(iter(fetch_examples)))
+    (captures / "powershell.txt").write_text(next(iter(powershell_examples)))
+    (captures / "invalid.txt").write_text("not a request")
+    output = tmp_path / "output"
+
+    paths = expand_patterns([str(captures / "*.txt")])
+    assert len(paths) == 3
+
+    result = convert_files(paths, str(output), OPTIONS, processes=2)
+    assert len(result.converted) == 2
+    assert result.failed == [str(captures / "invalid.txt")]
+    assert (output / "fetch.py").exists()
+    assert (output / "powershell.py").exists()
+    assert (output / MANIFEST_NAME).exists()
+
+    # unchanged inputs and options are skipped
+    result = convert_files(paths, str(output), OPTIONS, processes=2)
+    assert len(result.skipped) == 2
+
+    # only the changed input is regenerated
+    (captures / "fetch.txt").write_text(list(fetch_examples)[-1] + "\n")
+    result = convert_files(paths, str(output), OPTIONS, processes=2)
+    assert result.converted == [str(captures / "fetch.txt")]
+
+    # every file is regenerated when the options change
+    result = convert_files(paths, str(output), {**OPTIONS, "httpx": True}, processes=2)
+    assert len(result.converted) == 2
+
+
+def test_convert_files_stale(tmp_path: pathlib.Path) -> None:
+    captures = tmp_path / "captures"
+    captures.mkdir()
+    (captures / "fetch.txt").write_text(next(iter(fetch_examples)))
+    (captures / "powershell.txt").write_text(next(iter(powershell_examples)))
+    output = tmp_path / "output"
+
+    # a single process converts in place, without starting a pool
+    result = convert_files(expand_patterns([str(captures / "*.txt")]), str(output), OPTIONS, processes=1)
+    assert len(result.converted) == 2
+
+    # modules of inputs that stop parsing, or are deleted, are removed along with their manifest entries
+    (captures / "fetch.txt").write_text("not a request")
+    (captures / "powershell.txt").unlink()
+    result = convert_files(expand_patterns([str(captures / "*.txt")]), str(output), OPTIONS, processes=1)
+    assert result.failed == [str(captures / "fetch.txt")]
+    assert sorted(result.removed) == [str(output / "fetch.py"), str(output / "powershell.py")]
+    assert sorted(path.name for path in output.iterdir()) == [MANIFEST_NAME]
+
+
+def test_convert_files_binary_body(tmp_path: pathlib.Path) -> None:
+    captures = tmp_path / "captures"
+    captures.mkdir()
+    sample = b"""fetch("https://httpbin.org/post", {
+  "headers": {"content-type": "application/x-protobuf"},
+  "body": "\x08\x96\x01\xff",
+  "method": "POST"
+});"""
+    (captures / "binary.txt").write_bytes(sample)
+    output = tmp_path / "output"
+
+    # bytes that aren't utf-8 come through the same as with --file
+    result = convert_files([str(captures / "binary.txt")], str(output), OPTIONS, processes=1)
+    assert len(result.converted) == 1
+    request = parse_input(sample)
+    assert request is not None and request.data == b"\x08\x96\x01\xff"
+    assert (output / "binary.py").read_text() == request.generate_code(
+        sync=True, httpx=False, no_headers=False, no_cookies=False
+    ) + "\n"
+
+
+def test_convert_files_compressed(tmp_path: pathlib.Path) -> None:
+    captures = tmp_path / "captures"
+    captures.mkdir()
+    sample, expected = next(iter(fetch_examples.items()))
+    (captures / "fetch.txt.gz").write_bytes(gzip.compress(sample.encode()))
+    output = tmp_path / "output"
+
+    result = convert_files([str(captures / "fetch.txt.gz")], str(output), OPTIONS, processes=1)
+    assert len(result.converted) == 1
+    code = expected.generate_code(sync=True, httpx=False, no_headers=False, no_cookies=False)
+    assert (output / "fetch.py").read_text() == code + "\n"
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+import typing as t
+
+import pytest
+
+if t.TYPE_CHECKING:
+    import pathlib
+
+# modules that are slow to import, and only needed for some inputs or for interactive output
+HEAVY_MODULES = ("rich", "rich_click", "pygments", "concurrent.futures", "multiprocessing")
+
+# generous, so only real regressions fail (the best of a few runs is taken to smooth out noise)
+BUDGETS_MS = {"autorequests.parsing": 100, "autorequests.__main__": 150}
+
+
+def import_times(*args: str) -> dict[str, int]:
+    """:returns: the cumulative import time (in microseconds) of every module imported, from `python -X importtime`"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *args], stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True
+    )
+    times: dict[str, int] = {}
+    for line in result.stderr.decode().splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def imported_heavy_modules(times: dict[str, int]) -> list[str]:
+    return [name for name in times if name.split(".")[0] in HEAVY_MODULES or name in HEAVY_MODULES]
+
+
+@pytest.mark.parametrize("module", list(BUDGETS_MS))
+def test_import_time(module: str) -> None:
+    runs = [import_times("-c", f"import {module}") for _ in range(3)]
+    assert imported_heavy_modules(runs[0]) == []
+    best = min(times[module] for times in runs) / 1000
+    assert best < BUDGETS_MS[module], f"importing {module} took {best:.1f}ms"
+
+
+def test_cli_plain_imports(tmp_path: pathlib.Path) -> None:
+    path = tmp_path / "input.txt"
+    path.write_text('fetch("https://httpbin.org/get", {"method": "GET"});')
+    times = import_times("-m", "autorequests", "--file", str(path))
+    assert imported_heavy_modules(times) == []
+
+
+def test_cli_help(tmp_path: pathlib.Path) -> None:
+    from click.testing import CliRunner
+
+    from autorequests.__main__ import cli
+
+    runner = CliRunner()
+    for args in (["--help"], ["convert", "--help"]):
+        result = runner.invoke(cli, args)
+        assert result.exit_code == 0
+        assert "╭─ Options" in result.output
+
+    # an option's value that happens to be "--help" doesn't show help
+    path = tmp_path / "input.txt"
+    path.write_text("not a request")
+    result = runner.invoke(cli, ["--file", str(path), "--url", "--help"])
+    assert "Invalid input" in result.output
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import concurrent.futures
+import typing as t
+
+import pytest
+
+from autorequests.memo import Memo, MemoStats
+from autorequests.parsing import parse_input
+
+from .examples import fetch_examples, powershell_examples
+
+if t.TYPE_CHECKING:
+    from autorequests.request import Request
+
+OPTIONS: dict[str, t.Any] = {"sync": True, "httpx": False, "no_headers": False, "no_cookies": False}
+
+
+@pytest.mark.parametrize("sample,expected", [*fetch_examples.items(), *powershell_examples.items()])
+def test_memo(sample: str, expected: Request) -> None:
+    memo = Memo()
+    assert parse_input(sample, cache=memo) == expected
+    request = parse_input(sample, cache=memo)
+    assert request == expected
+    assert memo.stats == MemoStats(hits=1, misses=1, entries=1, size=memo.size)
+
+    # requests are handed out as copies
+    assert request is not None and request.headers is not None
+    request.headers["changed"] = "1"
+    assert parse_input(sample, cache=memo) == expected
+
+    code = expected.generate_code(**OPTIONS, cache=memo)
+    assert expected.generate_code(**OPTIONS, cache=memo) == code
+    assert expected.generate_code(**{**OPTIONS, "httpx": True}, cache=memo) != code
+    assert memo.stats[:3] == (3, 3, 3)
+
+
+def test_memo_bounds() -> None:
+    memo = Memo(max_entries=2, max_bytes=250)
+    for key in "abc":
+        memo.put_code(key, "x" * 100)
+    # bounded by entries
+    assert memo.get_code("a") is None
+    assert len(memo) == 2 and memo.size == 200
+
+    # reading "b" makes "c" the least recently used entry, which is evicted to stay under the size limit
+    assert memo.get_code("b") is not None
+    memo.put_code("d", "x" * 100)
+    assert memo.get_code("c") is None
+    assert memo.get_code("d") is not None
+    assert memo.size == 200
+
+    memo.put_code("e", "x" * 251)
+    assert memo.get_code("e") is None
+
+    memo.clear()
+    assert memo.stats == MemoStats(0, 0, 0, 0)
+
+
+def test_memo_disabled() -> None:
+    sample, expected = next(iter(fetch_examples.items()))
+    memo = Memo(enabled=False)
+    for _ in range(2):
+        assert parse_input(sample, cache=memo) == expected
+    assert memo.stats == MemoStats(0, 0, 0, 0)
+
+
+def test_memo_threads() -> None:
+    memo = Memo(max_entries=8)
+    samples = [*fetch_examples, *powershell_examples]
+
+    def convert(sample: str) -> str | None:
+        request = parse_input(sample, cache=memo)
+        return request.generate_code(**OPTIONS, cache=memo) if request else None
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(convert, samples * 20))
+    assert results == [convert(sample) for sample in samples] * 20
+    hits, misses, entries, _ = memo.stats
+    assert hits + misses == len(samples) * 2 * 21
+    assert entries <= 8
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import io
+import sys
+
+import pytest
+from rich.console import Console
+
+from autorequests import output
+
+
+def test_iter_pages() -> None:
+    assert list(output.iter_pages("a\nb\nc", 2)) == [("a\nb\n", 1), ("c", 0)]
+    assert list(output.iter_pages("a\nb\n", 1)) == [("a\n", 2), ("b\n", 0)]
+    assert list(output.iter_pages("", 1)) == []
+
+
+def test_print_code(monkeypatch: pytest.MonkeyPatch) -> None:
+    code = "".join(f"x{n} = {n}\n" for n in range(30))
+
+    def printed(
+        terminal: bool, plain: bool = False, limit: int = output.HIGHLIGHT_LIMIT, interactive: bool = False
+    ) -> str:
+        file = io.StringIO()
+        console = Console(
+            file=file, width=40, height=10, color_system=None, force_terminal=terminal, force_interactive=interactive
+        )
+        output.print_code(console, code, plain=plain, limit=limit)
+        return "\n".join(line.rstrip() for line in file.getvalue().split("\n"))
+
+    # written as is
+    assert printed(terminal=False) == code
+    assert printed(terminal=True, plain=True) == code
+    # the first page is highlighted, and the rest is written as is since no one can page through it
+    monkeypatch.setattr(sys, "stdin", io.StringIO())
+    assert printed(terminal=True, limit=10) == code
+    # paged until skipped
+    monkeypatch.setattr(sys.stdin, "isatty", lambda: True)
+    answers = iter(["", "q"])
+    monkeypatch.setattr("builtins.input", lambda *_: next(answers))
+    paged = printed(terminal=True, limit=10, interactive=True)
+    assert "x17 = 17" in paged and "x18" not in paged
+    assert next(answers, None) is None
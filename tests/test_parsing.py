@@ -1,14 +1,52 @@
 from __future__ import annotations
 
+import bz2
+import gzip
+import hashlib
+import io
+import json
+import lzma
+import mmap
+import os
+import subprocess
+import sys
 import typing as t
 
 import pytest
 
-from autorequests.parsing import parse_fetch, parse_powershell
+from autorequests.lazy import LazyRequest
+from autorequests.parsing import (
+    BodyKind,
+    HarIndex,
+    batch,
+    classify_body,
+    iter_har,
+    iter_snippets,
+    load_har_index,
+    parse_batch,
+    parse_body,
+    parse_fetch,
+    parse_har,
+    parse_input,
+    parse_powershell,
+    parse_stream,
+    read_snippet,
+    register_body_kind,
+    select_har_entries,
+    split_snippets,
+)
+from autorequests.parsing.body import BODY_KINDS
+from autorequests.parsing.escapes import decode_js_string, decode_powershell_string
+from autorequests.parsing.har import parse_har_entry
+from autorequests.parsing.multipart import FilePart, get_boundary, parse_multipart
+from autorequests.parsing.powershell import BARE, HASHTABLE, STRING, SWITCH, find_string_end, tokenize_args
+from autorequests.sources import decompressed, iter_text
 
-from .examples import fetch_examples, powershell_examples
+from .examples import fetch_examples, har_examples, powershell_examples
 
 if t.TYPE_CHECKING:
+    import pathlib
+
     from autorequests.request import Request
 
 
@@ -20,3 +58,423 @@ def test_parse_powershell_to_method(sample: str, expected: Request) -> None:
 @pytest.mark.parametrize("sample,expected", list(fetch_examples.items()))
 def test_parse_fetch_to_method(sample: str, expected: Request) -> None:
     assert parse_fetch(sample) == expected
+
+
+@pytest.mark.parametrize("sample,expected", list(fetch_examples.items()))
+def test_parse_fetch_from_buffer(sample: str, expected: Request, tmp_path: pathlib.Path) -> None:
+    assert parse_fetch(sample.encode()) == expected
+    assert parse_fetch(memoryview(sample.encode())) == expected
+
+    path = tmp_path / "fetch.txt"
+    path.write_text(sample)
+    with open(path, "rb") as fp, mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        assert parse_input(mapped) == expected
+
+
+def test_parse_fetch_invalid_headers() -> None:
+    sample = 'fetch("https://httpbin.org/get", {"headers": [], "method": "GET"});'
+    assert parse_fetch(sample) is None
+    assert parse_fetch(sample.encode()) is None
+    assert parse_fetch(sample, lazy=True) is None
+
+
+@pytest.mark.parametrize("sample,expected", list(har_examples.items()))
+def test_parse_har_to_method(sample: str, expected: list[Request]) -> None:
+    assert list(parse_har(sample)) == expected
+    assert parse_input(sample) == expected[0]
+
+
+def test_parse_har_split_cookies() -> None:
+    # HTTP/2 captures may send each cookie as its own header
+    headers = [{"name": "cookie", "value": "a=1"}, {"name": "cookie", "value": "b=2; c=3"}]
+    entry = {"request": {"method": "GET", "url": "https://httpbin.org/cookies", "headers": headers}}
+    request = parse_har_entry(entry)
+    assert request.cookies == {"a": "1", "b": "2", "c": "3"}
+    assert request.headers == {}
+
+
+def test_parse_har_malformed(tmp_path: pathlib.Path) -> None:
+    post_data = {"mimeType": "application/octet-stream", "text": "BODY"}
+    entries = [
+        {"response": {}},
+        {"request": {"method": "POST", "url": "https://httpbin.org/post", "postData": post_data}},
+    ]
+    # bytes that aren't utf-8 are kept as they are
+    sample = json.dumps({"log": {"entries": entries}}).encode().replace(b"BODY", b"\x96\xff")
+    path = tmp_path / "capture.har"
+    path.write_bytes(sample)
+
+    # entries without a request are skipped
+    request = parse_input(sample)
+    assert request is not None and request.data == b"\x96\xff"
+    assert [request.data for request in iter_har(io.BytesIO(sample))] == [b"\x96\xff"]
+    index = load_har_index(str(path))
+    assert len(index) == 2
+    assert index.read_entry(0) is None
+    assert index.read_entry(1) == request
+    assert list(select_har_entries(io.BytesIO(sample), [0, 1])) == [request]
+
+
+def test_parse_har_params() -> None:
+    # Firefox may capture form bodies as their fields, without the text
+    params = [
+        {"name": "a", "value": "1"},
+        {"name": "f", "fileName": "a.txt", "contentType": "text/plain", "value": "hi"},
+    ]
+    post_data = {"mimeType": "multipart/form-data", "params": params}
+    request = parse_har_entry({"request": {"method": "POST", "url": "https://httpbin.org/post", "postData": post_data}})
+    assert request.data == {"a": "1"}
+    assert request.files == {"f": ("a.txt", b"hi", "text/plain")}
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64])
+@pytest.mark.parametrize("sample,expected", list(har_examples.items()))
+def test_iter_har_chunked(sample: str, expected: list[Request], chunk_size: int) -> None:
+    # small chunks make entries, strings, and escapes straddle reads
+    assert list(iter_har(io.BytesIO(sample.encode()), chunk_size=chunk_size)) == expected
+
+
+@pytest.mark.parametrize("sample,expected", list(har_examples.items()))
+def test_har_index(sample: str, expected: list[Request], tmp_path: pathlib.Path) -> None:
+    path = tmp_path / "capture.har"
+    path.write_text(sample)
+
+    index = load_har_index(str(path))
+    assert [index.read_entry(n) for n in range(len(index.entries))] == expected
+    assert index.find(url="https://httpbin.org/post") == [1]
+    assert index.find(url="https://httpbin.org/*", method="GET") == [0]
+    assert index.find(host="httpbin.org") == [0, 1]
+
+    # the saved index is reused until the archive changes
+    assert HarIndex.load(str(path)) == index
+    path.write_text(sample + "\n")
+    assert HarIndex.load(str(path)) is None
+    assert load_har_index(str(path)) != index
+    assert os.path.exists(str(path) + ".idx")
+
+    with pytest.raises(IndexError):
+        next(index.read_entries([len(index)]))
+
+
+def test_har_index_unsaved(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    path = tmp_path / "capture.har"
+    path.write_text(next(iter(har_examples)))
+
+    def save(self: HarIndex, path: str | None = None) -> None:
+        raise PermissionError("read-only directory")
+
+    # archives in read-only directories are still indexed, the index just isn't saved
+    monkeypatch.setattr(HarIndex, "save", save)
+    assert len(load_har_index(str(path))) == 2
+    assert not os.path.exists(str(path) + ".idx")
+
+
+def test_cli_har_entries(tmp_path: pathlib.Path) -> None:
+    path = tmp_path / "capture.har"
+    path.write_text(next(iter(har_examples)))
+
+    def run(*args: str, stdin: bytes | None = None) -> subprocess.CompletedProcess[bytes]:
+        command = [sys.executable, "-m", "autorequests", *args]
+        return subprocess.run(command, input=stdin, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+    result = run("--file", str(path), "--entry", "5")
+    assert result.returncode == 2
+    assert b"the archive has 2 entries" in result.stderr
+
+    # piped archives can't be indexed, but their entries are still selected
+    result = run("--entry", "1", stdin=path.read_bytes())
+    assert result.stdout.count(b"resp = ") == 1
+    assert b"requests.post" in result.stdout
+
+
+def test_parse_batch(monkeypatch: pytest.MonkeyPatch) -> None:
+    samples = list(fetch_examples) + list(powershell_examples)
+    expected = list(fetch_examples.values()) + list(powershell_examples.values())
+    # mirrors the `;` separated output of Chrome's "Copy all as ..."
+    text = ";\n".join(samples) + ";\n"
+
+    assert split_snippets(text) == [sample.rstrip(";") for sample in samples]
+    # results are streamed, so the first is ready before the rest are parsed
+    results = parse_batch(text, processes=2)
+    assert next(results) == expected[0]
+    assert list(results) == expected[1:]
+    assert list(parse_batch(text, processes=1)) == expected
+
+    # only large inputs are fanned out to worker processes
+    monkeypatch.setattr(batch, "PARALLEL_MIN_SIZE", 0)
+    assert list(parse_batch(text, processes=2)) == expected
+
+
+def test_split_snippets_shared_session() -> None:
+    session, command = next(iter(powershell_examples)).split("Invoke-WebRequest", maxsplit=1)
+    command = "Invoke-WebRequest" + command
+    text = f"{session}{command};\n{command}"
+
+    assert split_snippets(text) == [session + command] * 2
+
+
+@pytest.mark.parametrize("sample", [*fetch_examples, *powershell_examples])
+def test_read_snippet(sample: str) -> None:
+    lines = io.StringIO(f"{sample.strip()}\nnot part of it\n")
+    assert read_snippet(lines) == sample.strip()
+    assert lines.read() == "not part of it\n"
+
+
+def test_read_snippet_blank_lines() -> None:
+    powershell = 'Invoke-WebRequest -Uri "https://httpbin.org/post" `\n-Headers @{\n\n"a"="b"\n} `\n-Body "a\n\nb"'
+    fetch = 'fetch("https://httpbin.org/post", {\n  "body": "a\\n\\nb",\n\n  "method": "POST"\n});'
+    for snippet in (powershell, fetch):
+        lines = io.StringIO(f"{snippet}\nafter")
+        assert read_snippet(lines) == snippet
+        assert lines.read() == "after"
+    # anything else ends at a blank line, like it always has
+    lines = io.StringIO("a\nb\n\nafter")
+    assert read_snippet(lines) == "a\nb"
+    assert read_snippet(io.StringIO("\nafter")) == ""
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 1 << 20])
+def test_iter_snippets_chunked(chunk_size: int) -> None:
+    session, command = next(iter(powershell_examples)).split("Invoke-WebRequest", maxsplit=1)
+    command = "Invoke-WebRequest" + command
+    text = ";\n".join([*fetch_examples, *powershell_examples, f"{session}{command}", command, *fetch_examples])
+    chunks = [text[n : n + chunk_size] for n in range(0, len(text), chunk_size)]
+
+    assert list(iter_snippets(chunks)) == split_snippets(text)
+    assert list(parse_stream(chunks)) == [parse_input(snippet) for snippet in split_snippets(text)]
+
+
+def test_iter_text() -> None:
+    text = "héllo wörld " * 100
+    file = decompressed(io.BufferedReader(io.BytesIO(lzma.compress(text.encode("utf-8")))))  # type: ignore[arg-type]
+    # multi-byte characters are split between chunks
+    assert "".join(iter_text(file, chunk_size=3)) == text
+
+
+@pytest.mark.parametrize("compress", [gzip.compress, bz2.compress, lzma.compress])
+def test_parse_compressed(compress: t.Callable[[bytes], bytes]) -> None:
+    for sample, expected in [*fetch_examples.items(), *powershell_examples.items()]:
+        assert parse_input(compress(sample.encode("utf-8"))) == expected
+
+
+@pytest.mark.parametrize("sample,expected", list(har_examples.items()))
+def test_select_har_entries(sample: str, expected: list[Request]) -> None:
+    compressed = decompressed(io.BufferedReader(io.BytesIO(gzip.compress(sample.encode("utf-8")))))  # type: ignore[arg-type]
+    assert list(select_har_entries(compressed, [len(expected) - 1])) == expected[-1:]
+    assert list(select_har_entries(io.BytesIO(sample.encode("utf-8")), url="*://nowhere/*")) == []
+
+
+def test_tokenize_powershell_args() -> None:
+    text = (
+        'Invoke-WebRequest -UseBasicParsing -Uri "https://httpbin.org/post?a=`"1`"" `\n'
+        "-WebSession $session `\n"
+        '-Headers @{"a"="b"; "c"="}"} `\n'
+        '-Body "-Uri ""quoted"""'
+    )
+    args = tokenize_args(text)
+
+    assert [(key, span.kind) for key, span in args.items()] == [
+        ("UseBasicParsing", SWITCH),
+        ("Uri", STRING),
+        ("WebSession", BARE),
+        ("Headers", HASHTABLE),
+        ("Body", STRING),
+    ]
+    assert text[args["Uri"].start : args["Uri"].end] == 'https://httpbin.org/post?a=`"1`"'
+    assert text[args["Headers"].start : args["Headers"].end] == '@{"a"="b"; "c"="}"}'
+    assert text[args["Body"].start : args["Body"].end] == '-Uri ""quoted""'
+
+    # a backslash doesn't escape the closing quote
+    text = '-InFile "C:\\dir\\" -Headers @{"a"="b"}'
+    assert find_string_end(text, text.index('"')) == text.index(" -Headers") - 1
+    args = tokenize_args(text)
+    assert text[args["InFile"].start : args["InFile"].end] == "C:\\dir\\"
+
+
+def test_decode_powershell_string() -> None:
+    assert decode_powershell_string('`"hi`"') == '"hi"'
+    assert decode_powershell_string("hi``123") == "hi`123"
+    assert decode_powershell_string("a$([char]13)$([char]10)b`t") == "a\r\nb\t"
+    assert decode_powershell_string('say ""hi""') == 'say "hi"'
+    assert decode_powershell_string("`u{1F600}") == "\U0001F600"
+    # characters that don't exist are kept as they're written
+    assert decode_powershell_string("`u{FFFFFF}$([char]99999999)") == "`u{FFFFFF}$([char]99999999)"
+    assert decode_powershell_string("it''s", verbatim=True) == "it's"
+    # backslashes aren't escapes in powershell
+    assert decode_powershell_string('C:\\dir\\""') == 'C:\\dir\\"'
+    # only the given span is decoded
+    assert decode_powershell_string('x"`"y`""x', 2, 7) == '"y"'
+
+
+def test_decode_js_string() -> None:
+    assert decode_js_string('\\"hi\\"') == '"hi"'
+    assert decode_js_string("\\n\\t\\\\") == "\n\t\\"
+    assert decode_js_string("\\u00e9\\x41\\u{1F600}") == "\u00e9A\U0001F600"
+    assert decode_js_string("\\ud83d\\ude00") == "\U0001F600"
+    assert decode_js_string("\\u{FFFFFF}") == "\\u{FFFFFF}"
+    sample = """fetch("https://httpbin.org/post", {
+  "headers": {"content-type": "application/x-www-form-urlencoded"},
+  "body": "a=\\u{FFFFFF}",
+  "method": "POST"
+});"""
+    request = parse_fetch(sample)
+    assert request is not None and request.data == {"a": "\\u{FFFFFF}"}
+    assert decode_js_string("no escapes") == "no escapes"
+
+
+def test_parse_body() -> None:
+    # the content type is trusted first
+    assert parse_body('{"a": "b=c"}', "application/json; charset=utf-8") == (None, {"a": "b=c"}, None)
+    assert parse_body('{"a": 1}', "application/vnd.api+json") == (None, {"a": 1}, None)
+    assert parse_body("a=1&b=2", "application/x-www-form-urlencoded") == ({"a": "1", "b": "2"}, None, None)
+    # and sniffing takes over when it's missing or wrong
+    assert parse_body('{"a": "b=c"}', None) == (None, {"a": "b=c"}, None)
+    assert parse_body('["a"]', "text/plain;charset=UTF-8") == (None, ["a"], None)
+    assert parse_body("a=1&b=2", "application/json") == ({"a": "1", "b": "2"}, None, None)
+    assert parse_body("not a body", None) == (None, None, None)
+
+    multipart = '--abc\r\nContent-Disposition: form-data; name="a"\r\n\r\n1\r\n--abc--\r\n'
+    assert parse_body(multipart, None) == ({"a": "1"}, None, {})
+
+
+def test_parse_multipart() -> None:
+    assert get_boundary("multipart/form-data; boundary=----WebKitFormBoundaryabc") == "----WebKitFormBoundaryabc"
+    assert get_boundary('multipart/form-data; charset=utf-8; boundary="quoted boundary"') == "quoted boundary"
+    assert get_boundary("multipart/form-data") is None
+
+    upload = os.urandom(256 * 1024)
+    body = b"".join(
+        (
+            b"preamble\r\n",
+            b"--xyz\r\n",
+            b'Content-Disposition: form-data; name="field"\r\n\r\n',
+            b"line one\r\nline two\r\n",
+            b"--xyz\r\n",
+            b'Content-Disposition: form-data; name="upload"; filename="data.bin"\r\n',
+            b"Content-Type: application/octet-stream\r\n\r\n",
+            upload,
+            b"\r\n--xyz--\r\n",
+        )
+    )
+    # small chunks make delimiters and headers straddle chunk boundaries
+    for chunk_size in (1, 7, 4096, len(body)):
+        chunks = (body[i : i + chunk_size] for i in range(0, len(body), chunk_size))
+        data, files = parse_multipart(chunks, "xyz")
+        assert data == {"field": "line one\r\nline two"}
+        assert files == {
+            "upload": FilePart(
+                filename="data.bin",
+                content_type="application/octet-stream",
+                size=len(upload),
+                sha256=hashlib.sha256(upload).hexdigest(),
+            )
+        }
+
+    # bare LF line endings
+    data, files = parse_multipart([b'--b\nContent-Disposition: form-data; name="a"\n\n1\n--b--\n'], "b")
+    assert data == {"a": "1"}
+    assert files == {}
+
+
+def test_parse_binary_body() -> None:
+    protobuf = b"\x08\x96\x01\x12\x07testing\xff\xfe"
+    assert parse_body(protobuf, "application/x-protobuf") == (protobuf, None, None)
+    # bytes that aren't utf-8 are kept, whatever the content type says
+    assert parse_body(protobuf, None) == (protobuf, None, None)
+    assert parse_body(protobuf.decode("utf-8", "surrogateescape"), None) == (protobuf, None, None)
+    # text that happens to be valid utf-8 is only kept when the content type says it's binary
+    assert parse_body(b"\x08\x01", "application/octet-stream") == (b"\x08\x01", None, None)
+    assert parse_body(b"not a body", None) == (None, None, None)
+    # surrogates that don't stand for bytes can't be turned back into them
+    assert parse_body("\ud800", "application/octet-stream") == (None, None, None)
+
+    # small files are kept as is, so they can be sent again
+    body = (
+        b'--b\r\nContent-Disposition: form-data; name="f"; filename="a.bin"\r\n'
+        b"Content-Type: application/octet-stream\r\n\r\n" + protobuf + b"\r\n--b--\r\n"
+    )
+    assert parse_body(body, "multipart/form-data; boundary=b") == (
+        {},
+        None,
+        {"f": ("a.bin", protobuf, "application/octet-stream")},
+    )
+
+    # raw bytes in a fetch body come through untouched
+    sample = b"""fetch("https://httpbin.org/post", {
+  "headers": {"content-type": "application/x-protobuf"},
+  "body": "\x08\x96\x01\xff",
+  "method": "POST"
+});"""
+    request = parse_fetch(sample)
+    assert request is not None and request.data == b"\x08\x96\x01\xff"
+
+    sample = b"""$session = New-Object Microsoft.PowerShell.Commands.WebRequestSession
+Invoke-WebRequest -UseBasicParsing -Uri "https://httpbin.org/post" `
+-Method "POST" `
+-WebSession $session `
+-Headers @{"accept"="*/*"} `
+-ContentType "application/x-protobuf" `
+-Body ([byte[]](0x08, 0x96, 0x01, 0xff))"""
+    request = parse_powershell(sample.decode())
+    assert request is not None and request.data == b"\x08\x96\x01\xff"
+
+    # leading zeros are decimal, and arrays with values that aren't bytes aren't sent as a body
+    request = parse_powershell(sample.decode().replace("0x08, 0x96", "08, 010"))
+    assert request is not None and request.data == b"\x08\x0a\x01\xff"
+    request = parse_powershell(sample.decode().replace("0x08", "300"))
+    assert request is not None and request.data is None
+
+    # base64 bodies that don't decode are kept as text
+    def har_entry(text: str) -> dict[str, t.Any]:
+        post_data = {"encoding": "base64", "text": text}
+        return {"request": {"method": "POST", "url": "https://httpbin.org/post", "postData": post_data}}
+
+    assert parse_har_entry(har_entry("CJYB/w==")).data == b"\x08\x96\x01\xff"
+    assert parse_har_entry(har_entry("a=1&b=%")).data == {"a": "1", "b": "%"}
+
+
+def test_register_body_kind() -> None:
+    kind = BodyKind(
+        name="csv",
+        media_types=("text/csv",),
+        sniff=lambda head, truncated: head.startswith("a,b"),
+        decode=lambda body, content_type: (None, [line.split(",") for line in body.splitlines()], None),
+    )
+    register_body_kind(kind, first=True)
+    try:
+        assert classify_body("a,b\n1,2", None) is kind
+        assert parse_body("x,y", "text/csv") == (None, [["x", "y"]], None)
+    finally:
+        BODY_KINDS.remove(kind)
+
+
+LAZY_EXAMPLES = [*fetch_examples.items(), *powershell_examples.items()]
+LAZY_EXAMPLES += [(sample, requests[0]) for sample, requests in har_examples.items()]
+
+
+@pytest.mark.parametrize("sample,expected", LAZY_EXAMPLES)
+def test_parse_input_lazy(sample: str, expected: Request) -> None:
+    request = parse_input(sample, lazy=True)
+    assert isinstance(request, LazyRequest)
+    assert request.method == expected.method
+    assert request.url == expected.url
+    # powershell headers are decoded up front, since they may hold the method
+    assert not request.loaded - {"headers"}
+
+    assert request.data == expected.data
+    assert request.loaded >= {"body"}
+    assert request == expected
+    assert expected == request
+    eager = parse_input(sample)
+    assert eager is not None
+    assert request.generate_code(True, False, False, False) == eager.generate_code(True, False, False, False)
+
+
+def test_lazy_request_from_buffer(tmp_path: pathlib.Path) -> None:
+    sample, expected = next(iter(fetch_examples.items()))
+    path = tmp_path / "fetch.txt"
+    path.write_text(sample)
+    with open(path, "rb") as fp, mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        request = parse_input(mapped, lazy=True)
+    # decoded after the mmap is closed
+    assert request == expected
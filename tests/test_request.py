@@ -2,7 +2,12 @@ from __future__ import annotations
 
 import ast
 import asyncio
+import copy
+import dataclasses
+import io
 import itertools
+import json
+import types
 import typing as t
 
 import aiohttp
@@ -10,13 +15,22 @@ import httpx
 import pytest
 import requests
 
+from autorequests.commons import format_json_like, format_string
+from autorequests.compact import MAX_INTERNED_LENGTH, CompactRequest, RequestPool
+from autorequests.fingerprint import dedup, fingerprint
+from autorequests.frozen import FrozenDict, FrozenList, FrozenRequest, freeze, thaw
 from autorequests.parsing import parse_input
+from autorequests.request import Request
+from autorequests.templates import infer_templates
 
 from .examples import fetch_examples, powershell_examples
 from .examples.httpbin import httpbin_examples
 
 if t.TYPE_CHECKING:
-    from autorequests.request import Request
+    import pathlib
+
+    from autorequests.templates import URLTemplate
+    from autorequests.typings import RequestData
 
 
 @pytest.mark.parametrize("req", list(fetch_examples.values()) + list(powershell_examples.values()))
@@ -29,6 +43,38 @@ def test_request_generate_code(req: Request) -> None:
         ast.parse(code)
 
 
+@pytest.mark.parametrize("req", list(fetch_examples.values()) + list(powershell_examples.values()))
+def test_request_prepare(req: Request) -> None:
+    variants = req.prepare().render_all()
+    assert len(variants) == 16
+    for (sync, use_httpx, no_headers, no_cookies), code in variants.items():
+        assert code == req.generate_code(sync, use_httpx, no_headers, no_cookies)
+
+
+@pytest.mark.parametrize("req", list(fetch_examples.values()) + list(powershell_examples.values()))
+def test_request_data_helpers(req: Request) -> None:
+    request_data: RequestData = {"headers": req.headers, "cookies": None, "json": req.json, "data": req.data}
+    defined = [f"{key} = {format_json_like(value)}" for key, value in request_data.items() if value]
+    passed = [f"{key}={key}" for key, value in request_data.items() if value]
+    assert req.define_request_data(request_data) == "\n".join(defined)
+    assert req.pass_request_data(request_data) == ", ".join(passed)
+
+
+@pytest.mark.parametrize("req", list(fetch_examples.values()) + list(powershell_examples.values()))
+def test_request_write_code(req: Request, tmp_path: pathlib.Path) -> None:
+    (template,) = infer_templates([req])
+    for sync, use_httpx, no_headers, no_cookies in itertools.product((True, False), repeat=4):
+        generators: tuple[tuple[Request | URLTemplate, dict[str, t.Any]], ...] = (
+            (req, {}),
+            (req, {"spill_threshold": 0, "spill_dir": str(tmp_path)}),
+            (template, {}),
+        )
+        for generator, options in generators:
+            buffer = io.StringIO()
+            generator.write_code(buffer, sync, use_httpx, no_headers, no_cookies, **options)
+            assert buffer.getvalue() == generator.generate_code(sync, use_httpx, no_headers, no_cookies, **options)
+
+
 async def aexec_code(code: str) -> httpx.Response | aiohttp.ClientResponse:  # type: ignore[return]
     """
     References:
@@ -93,3 +139,246 @@ def test_request_httpbin(sample: str) -> None:
 
     for response in responses:
         response.raise_for_status()
+
+
+def test_request_spill_body(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    request = Request(
+        method="POST",
+        url="https://httpbin.org/post",
+        headers={"accept": "*/*"},
+        cookies=None,
+        params=None,
+        data=None,
+        json={"items": list(range(100))},
+        files=None,
+    )
+
+    # requests under the threshold render exactly as before
+    inline = request.generate_code(True, False, False, False)
+    assert request.generate_code(True, False, False, False, spill_threshold=10_000, spill_dir=str(tmp_path)) == inline
+    assert not list(tmp_path.iterdir())
+
+    for sync, use_httpx in itertools.product([False, True], repeat=2):
+        code = request.generate_code(sync, use_httpx, False, False, spill_threshold=100, spill_dir=str(tmp_path))
+        ast.parse(code)
+        assert "json = " not in code
+
+    # each body is only written once
+    (body_path,) = tmp_path.iterdir()
+    assert json.loads(body_path.read_bytes()) == request.json
+
+    sent: dict[str, t.Any] = {}
+
+    def post(url: str, **kwargs: t.Any) -> None:
+        sent.update(kwargs, body=kwargs["data"].read())
+
+    code = request.generate_code(True, False, False, False, spill_threshold=100, spill_dir=str(tmp_path))
+    exec(code, {"requests": types.SimpleNamespace(post=post)})
+    assert json.loads(sent["body"]) == request.json
+    assert sent["headers"]["content-type"] == "application/json"
+
+    # relative spill dirs are written out absolute, so the code can be run from anywhere
+    monkeypatch.chdir(tmp_path)
+    code = request.generate_code(True, False, False, False, spill_threshold=100, spill_dir="bodies")
+    assert format_string(str(tmp_path / "bodies" / body_path.name)) in code
+
+
+def test_request_binary_body(tmp_path: pathlib.Path) -> None:
+    body = bytes(range(256))
+    request = Request(
+        method="POST",
+        url="https://httpbin.org/post",
+        headers={"content-type": "application/x-protobuf"},
+        cookies=None,
+        params=None,
+        data=body,
+        json=None,
+        files=None,
+    )
+
+    for sync, use_httpx in itertools.product([False, True], repeat=2):
+        code = request.generate_code(sync, use_httpx, False, False)
+        ast.parse(code)
+        # httpx only takes raw bytes as `content`
+        assert ("content=data" in code) == use_httpx
+
+    sent: dict[str, t.Any] = {}
+
+    def post(url: str, **kwargs: t.Any) -> None:
+        sent.update(kwargs)
+
+    exec(request.generate_code(True, False, False, False), {"requests": types.SimpleNamespace(post=post)})
+    assert sent["data"] == body
+    exec(request.generate_code(True, True, False, False), {"httpx": types.SimpleNamespace(post=post)})
+    assert sent["content"] == body
+
+    code = request.generate_code(True, False, False, False, spill_threshold=100, spill_dir=str(tmp_path))
+    ast.parse(code)
+    (body_path,) = tmp_path.iterdir()
+    assert body_path.suffix == ".bin"
+    assert body_path.read_bytes() == body
+
+
+@pytest.mark.parametrize("req", list(fetch_examples.values()) + list(powershell_examples.values()))
+def test_compact_request(req: Request) -> None:
+    pool = RequestPool()
+    compact = CompactRequest.from_request(req, pool=pool)
+    assert compact == req
+    assert req == compact
+    assert compact.to_request() == req
+    assert compact.generate_code(True, False, False, False) == req.generate_code(True, False, False, False)
+
+    # identical headers and cookies are shared
+    other = CompactRequest.from_request(dataclasses.replace(req, url="https://httpbin.org/other"), pool=pool)
+    assert other._headers is compact._headers
+    assert other._cookies is compact._cookies
+    assert len(pool) <= 2
+
+    # and read-only, so they're changed by assigning new ones
+    assert other.headers is not None
+    with pytest.raises(TypeError):
+        other.headers["x-changed"] = "1"  # type: ignore[index]
+    headers = {**other.headers, "x-changed": "1"}
+    other.headers = headers
+    assert other.headers == headers
+    assert compact.headers == req.headers
+
+    # long values aren't pooled
+    long_headers = {"authorization": "x" * (MAX_INTERNED_LENGTH + 1)}
+    first = CompactRequest.from_request(dataclasses.replace(req, headers=long_headers), pool=pool)
+    second = CompactRequest.from_request(dataclasses.replace(req, headers=long_headers), pool=pool)
+    assert first._headers is not second._headers
+    assert first.headers == second.headers == long_headers
+
+
+@pytest.mark.parametrize("req", list(fetch_examples.values()) + list(powershell_examples.values()))
+def test_frozen_request(req: Request) -> None:
+    frozen = FrozenRequest.from_request(req)
+    assert frozen == req
+    assert req == frozen
+    assert frozen.to_request() == req
+    assert frozen.generate_code(True, False, False, False) == req.generate_code(True, False, False, False)
+
+    # structurally equal requests hash the same, so they can be used as keys
+    assert {frozen: 1}[FrozenRequest.from_request(copy.deepcopy(req))] == 1
+
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        frozen.url = "https://httpbin.org/other"  # type: ignore[misc]
+    if frozen.headers:
+        with pytest.raises(TypeError):
+            frozen.headers["x-changed"] = "1"  # type: ignore[index]
+
+
+def test_freeze() -> None:
+    value = {"a": [1, {"b": [2]}], "c": ("file.txt", b"")}
+    frozen = freeze(value)
+    assert isinstance(frozen["a"], FrozenList)
+    assert isinstance(frozen["a"][1], FrozenDict)
+    assert hash(frozen) == hash(freeze(copy.deepcopy(value)))
+    # tuples stay tuples
+    assert thaw(frozen) == value
+
+
+def test_request_fingerprint() -> None:
+    request = Request(
+        method="get",
+        url="HTTPS://HttpBin.org:443/get?b=2&a=1",
+        headers={"Accept": "*/*", "X-Request-Id": "1", "Accept-Language": "en"},
+        cookies={"session": "abc", "_ga": "1"},
+        params=None,
+        data=None,
+        json=None,
+        files=None,
+    )
+    reordered = Request(
+        method="GET",
+        url="https://httpbin.org/get",
+        headers={"accept-language": "en", "accept": "*/*", "x-request-id": "2"},
+        cookies={"_ga": "2", "session": "abc"},
+        params={"a": "1", "b": "2"},
+        data=None,
+        json=None,
+        files=None,
+    )
+    assert request.fingerprint(ignore_cookies=["_ga"]) == reordered.fingerprint(ignore_cookies=["_ga"])
+    assert request.fingerprint() != reordered.fingerprint()
+    assert request.fingerprint(ignore_headers=()) != reordered.fingerprint(ignore_headers=(), ignore_cookies=["_ga"])
+
+    # lazy, frozen, and compact requests fingerprint the same
+    assert fingerprint(FrozenRequest.from_request(request)) == fingerprint(request)  # type: ignore[arg-type]
+    assert fingerprint(CompactRequest.from_request(request, RequestPool())) == fingerprint(request)  # type: ignore[arg-type]
+
+    changed = dataclasses.replace(reordered, json={"a": 1})
+    unique = list(dedup([request, reordered, changed, request], ignore_cookies=["_ga"]))
+    assert unique == [request, changed]
+
+
+def test_infer_templates() -> None:
+    def get(url: str, params: dict[str, str] | None = None) -> Request:
+        return Request("GET", url, {"accept": "*/*"}, None, params, None, None, None)
+
+    uuid = "3fa85f64-5717-4562-b3fc-2c963f66afa6"
+    requests_ = [get(f"https://httpbin.org/users/{n}", {"sort": "asc", "page": str(n)}) for n in range(50)]
+    requests_ += [
+        get("https://httpbin.org/users/me"),
+        get(f"https://httpbin.org/users/{uuid}/posts/5d41402abc4b2a76b9719d911017c592?draft=1"),
+        get("https://httpbin.org/users/1", {"sort": "asc"}),
+    ]
+
+    users, me, posts = infer_templates(requests_)
+    assert users.path == "/users/{user_id}"
+    assert len(users.requests) == 51
+    assert users.constant_params == {"sort": "asc"}
+    assert users.arguments == ["user_id", "page=None"]
+    assert me.path == "/users/me"
+    assert posts.path == "/users/{user_id}/posts/{post_id}"
+    assert [param.kind for param in posts.path_params] == ["uuid", "hash"]
+    assert posts.constant_params == {"draft": "1"}
+
+    for sync, use_httpx in itertools.product([False, True], repeat=2):
+        for template in (users, me, posts):
+            ast.parse(template.generate_code(sync, use_httpx, False, False))
+
+    sent: dict[str, t.Any] = {}
+
+    def send(url: str, **kwargs: t.Any) -> str:
+        sent.update(kwargs, url=url)
+        return "response"
+
+    namespace: dict[str, t.Any] = {"requests": types.SimpleNamespace(get=send)}
+    exec(users.generate_code(True, False, False, False), namespace)
+    assert namespace[users.name](7, page="2") == "response"
+    assert sent["url"] == "https://httpbin.org/users/7"
+    assert sent["params"] == {"sort": "asc", "page": "2"}
+
+
+def test_infer_templates_reserved_names() -> None:
+    names = ("headers", "params", "json", "data", "cookies", "files", "resp", "requests", "httpx", "session")
+    requests_ = [
+        Request(
+            "GET",
+            f"https://httpbin.org/users/{n}",
+            {"accept": "*/*"},
+            None,
+            dict.fromkeys(names, str(n)),
+            None,
+            None,
+            None,
+        )
+        for n in range(2)
+    ]
+    (template,) = infer_templates(requests_)
+    # arguments never shadow the generated code's locals or modules
+    assert template.arguments == ["user_id", *(f"{name}_" for name in names)]
+
+    sent: dict[str, t.Any] = {}
+
+    def send(url: str, **kwargs: t.Any) -> str:
+        sent.update(kwargs, url=url)
+        return "response"
+
+    namespace: dict[str, t.Any] = {"requests": types.SimpleNamespace(get=send)}
+    exec(template.generate_code(True, False, False, False), namespace)
+    assert namespace[template.name](7, *names) == "response"
+    assert sent["params"] == {name: name for name in names}
+    assert sent["headers"] == {"accept": "*/*"}